@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Shared cloud SDK clients for the job management tools.
+Clients are created once per process (and region or subscription) so repeated
+calls reuse loaded service models, credentials and pooled connections.
+
+Each SDK is imported by the first client that needs it, so a run that only
+touches one provider never loads the others.
+"""
+import re
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from botocore.config import Config
+    from google.cloud import compute_v1
+    from azure.mgmt.compute import ComputeManagementClient
+    from azure.identity import DefaultAzureCredential
+
+# How long instance lookups are buffered before one DescribeInstances call,
+# and the most IDs one call carries (the instance-id filter's value limit)
+EC2_DESCRIBE_BATCH_WINDOW_SECONDS = 0.3
+EC2_DESCRIBE_BATCH_SIZE = 200
+
+# How long instance details that don't change while an instance lives
+# (type, zone, addresses) are reused between status checks
+INSTANCE_META_TTL_SECONDS = 900
+_instance_meta_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+_instance_meta_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def aws_client_config() -> 'Config':
+    """Return the botocore config shared by the AWS clients."""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=16,
+        retries={'mode': 'adaptive'}
+    )
+
+
+@lru_cache(maxsize=None)
+def ec2_client(region: str):
+    """Return the shared EC2 client for a region."""
+    import boto3
+    return boto3.client('ec2', region_name=region, config=aws_client_config())
+
+
+@lru_cache(maxsize=None)
+def s3_client():
+    """Return the shared S3 client."""
+    import boto3
+    return boto3.client('s3', config=aws_client_config())
+
+
+@lru_cache(maxsize=None)
+def gcp_instances_client() -> 'compute_v1.InstancesClient':
+    """Return the shared GCP Compute Engine instances client."""
+    from google.cloud import compute_v1
+    return compute_v1.InstancesClient()
+
+
+@lru_cache(maxsize=1)
+def azure_credential() -> 'DefaultAzureCredential':
+    """Return the shared Azure credential.
+    
+    Sources that need a person at the machine are left out of the chain, so
+    a non-interactive run never waits on them.
+    """
+    from azure.identity import DefaultAzureCredential
+    return DefaultAzureCredential(
+        exclude_interactive_browser_credential=True,
+        exclude_visual_studio_code_credential=True
+    )
+
+
+@lru_cache(maxsize=None)
+def azure_compute_client(subscription_id: str) -> 'ComputeManagementClient':
+    """Return the shared Azure compute client for a subscription."""
+    from azure.mgmt.compute import ComputeManagementClient
+    return ComputeManagementClient(azure_credential(), subscription_id)
+
+
+def describe_ec2_instances(region: str, instance_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Describe EC2 instances by ID, keyed by ID; IDs EC2 no longer knows are absent.
+    
+    Uses the paginated instance-id filter rather than InstanceIds, so a
+    missing instance comes back as an empty result instead of an error and
+    each page stays bounded by MaxResults.
+    """
+    paginator = ec2_client(region).get_paginator('describe_instances')
+    pages = paginator.paginate(
+        Filters=[{'Name': 'instance-id', 'Values': list(instance_ids)}],
+        PaginationConfig={'PageSize': 1000}
+    )
+    return {
+        instance['InstanceId']: instance
+        for page in pages
+        for reservation in page['Reservations']
+        for instance in reservation['Instances']
+    }
+
+
+def find_ec2_instance(region: str, instance_id: str) -> Optional[Dict[str, Any]]:
+    """Describe one EC2 instance, or return None if EC2 no longer knows it."""
+    return describe_ec2_instances(region, [instance_id]).get(instance_id)
+
+
+def ec2_instance_state(region: str, instance_id: str) -> Optional[str]:
+    """Return just the state name of an EC2 instance, or None if it can't be read."""
+    try:
+        response = ec2_client(region).describe_instance_status(
+            InstanceIds=[instance_id], IncludeAllInstances=True
+        )
+    except Exception:
+        return None
+    statuses = response.get('InstanceStatuses', [])
+    return statuses[0]['InstanceState']['Name'] if statuses else None
+
+
+def list_gcp_instances(project_id: str, instance_names: List[str]) -> Dict[str, 'compute_v1.Instance']:
+    """Look up GCP instances by name across all zones, keyed by name.
+    
+    One paginated aggregated_list call with a name filter replaces a get per
+    instance, and needs no zone. Names GCP doesn't know are absent.
+    """
+    pattern = '|'.join(re.escape(name) for name in instance_names)
+    pager = gcp_instances_client().aggregated_list(
+        project=project_id,
+        filter=f'name eq "({pattern})"',
+        return_partial_success=True
+    )
+    return {
+        instance.name: instance
+        for _, scoped_list in pager
+        for instance in scoped_list.instances
+    }
+
+
+def find_gcp_instance(project_id: str, instance_name: str) -> Optional['compute_v1.Instance']:
+    """Look up one GCP instance in any zone, or return None if GCP doesn't know it."""
+    return list_gcp_instances(project_id, [instance_name]).get(instance_name)
+
+
+def cached_instance_meta(provider: str, instance_id: str) -> Optional[Dict[str, Any]]:
+    """Return cached details for an instance if they are younger than the TTL."""
+    with _instance_meta_lock:
+        entry = _instance_meta_cache.get((provider, instance_id))
+    if entry and time.monotonic() - entry[0] < INSTANCE_META_TTL_SECONDS:
+        return dict(entry[1])
+    return None
+
+
+def cache_instance_meta(provider: str, instance_id: str, meta: Dict[str, Any]):
+    """Remember details for an instance for INSTANCE_META_TTL_SECONDS."""
+    with _instance_meta_lock:
+        _instance_meta_cache[(provider, instance_id)] = (time.monotonic(), dict(meta))
+
+
+def invalidate_instance_cache(instance_id: str):
+    """Forget cached details for an instance, e.g. once it has been terminated."""
+    with _instance_meta_lock:
+        for key in [key for key in _instance_meta_cache if key[1] == instance_id]:
+            del _instance_meta_cache[key]
+
+
+class BatchedEC2Describe:
+    """Coalesce single-instance lookups into one DescribeInstances call per region.
+    
+    get() buffers the ID and returns a Future. Each region's buffer is sent
+    window seconds after its first ID arrives, or as soon as it holds
+    max_batch IDs. The Future resolves to the instance dict, or None if the
+    instance is unknown.
+    """
+    
+    def __init__(self, window: float = EC2_DESCRIBE_BATCH_WINDOW_SECONDS,
+                 max_batch: int = EC2_DESCRIBE_BATCH_SIZE):
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, List[Future]]] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+    
+    def get(self, instance_id: str, region: str) -> Future:
+        """Queue a lookup of instance_id in region."""
+        future = Future()
+        full_batch = None
+        
+        with self._lock:
+            batch = self._pending.setdefault(region, {})
+            batch.setdefault(instance_id, []).append(future)
+            
+            if len(batch) >= self.max_batch:
+                full_batch = self._take(region)
+            elif region not in self._timers:
+                timer = threading.Timer(self.window, self._flush, (region,))
+                timer.daemon = True
+                self._timers[region] = timer
+                timer.start()
+        
+        if full_batch:
+            self._describe(region, full_batch)
+        return future
+    
+    def _take(self, region: str) -> Dict[str, List[Future]]:
+        """Remove and return a region's pending batch; caller holds the lock."""
+        timer = self._timers.pop(region, None)
+        if timer:
+            timer.cancel()
+        return self._pending.pop(region, {})
+    
+    def _flush(self, region: str):
+        with self._lock:
+            batch = self._take(region)
+        if batch:
+            self._describe(region, batch)
+    
+    def _describe(self, region: str, batch: Dict[str, List[Future]]):
+        try:
+            instances = describe_ec2_instances(region, list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        
+        for instance_id, futures in batch.items():
+            for future in futures:
+                future.set_result(instances.get(instance_id))
+
+
+ec2_describe_batcher = BatchedEC2Describe()
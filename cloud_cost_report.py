@@ -4,25 +4,163 @@ Cloud Cost Report - Generate cost reports and analysis for cloud jobs.
 Provides various reporting views including job summaries, cost trends, and budget analysis.
 """
 import argparse
+import hashlib
+import inspect
 import json
 import logging
+import os
 import sys
+import time
 from datetime import datetime, timedelta
+from functools import wraps
 from typing import Dict, Any, List, Optional
 from job_manager import get_job_manager
 from cost_tracker import CloudCostTracker
 import sqlite3
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Applied to every report connection; the jobs DB is read-heavy and small
+REPORT_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-200000',
+    'PRAGMA mmap_size=268435456',
+)
+
+# On-disk cache for report results used by the CLI
+DEFAULT_CACHE_DIR = os.path.expanduser('~/.cache/cloud_cost_report')
+CACHE_TTL_SECONDS = 300
+
+# Concurrent billing API lookups for retrieve-costs
+DEFAULT_RETRIEVE_WORKERS = 4
+
+# Row templates for the printed report tables, parsed once at import
+_PROVIDER_BREAKDOWN_ROW = "{provider:<10} | {job_count:<6} | ${total_cost:<11.2f} | ${avg_cost:<9.4f}".format
+_DAILY_COST_ROW = "{date:<12} | {provider:<8} | {job_count:<6} | ${total_cost:<9.2f}".format_map
+_OVER_BUDGET_ROW = ("{job_id:<10} | {provider:<8} | ${budget_limit:<7.2f} | "
+                    "${current_cost:<7.2f} | ${over_budget_amount:<7.2f}").format_map
+_PROVIDER_STATS_ROW = ("{provider:<8} | {job_count:<6} | ${total_cost:<11.2f} | "
+                       "${avg_cost:<9.4f} | {success_rate:<8.1f}% | ${avg_price_per_hour:<7.4f}").format_map
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a report as indented JSON, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def _accuracy_percent(actual: float, estimated: float) -> float:
+    """Return how close an actual cost came to its estimate, as a percentage (0 if no estimate)."""
+    if not estimated:
+        return 0.0
+    return (1 - abs(actual - estimated) / estimated) * 100
+
+
+def _cached_report(method):
+    """Cache a report method's result on disk, keyed by its arguments and the jobs DB state.
+    
+    Entries expire after the reporter's cache_ttl and are implicitly invalidated
+    whenever the database (or its WAL file) changes. Error results are never cached.
+    """
+    signature = inspect.signature(method)
+    
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.cache_dir:
+            return method(self, *args, **kwargs)
+        
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        call_args = {name: value for name, value in bound.arguments.items() if name != 'self'}
+        # Fingerprint the DB only once it is open in WAL mode, which may touch the files
+        self._connect()
+        cache_path = os.path.join(self.cache_dir, f"{self._cache_key(method.__name__, call_args)}.json")
+        
+        try:
+            if time.time() - os.stat(cache_path).st_mtime < self.cache_ttl:
+                with open(cache_path, 'r') as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
+        
+        result = method(self, *args, **kwargs)
+        
+        if 'error' not in result:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(result, f)
+                os.replace(tmp_path, cache_path)
+            except (OSError, TypeError, ValueError) as e:
+                logger.debug(f"Could not cache {method.__name__} result: {e}")
+        
+        return result
+    
+    return wrapper
+
 
 class CostReporter:
     """Generate cost reports and analysis."""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None, cache_ttl: int = CACHE_TTL_SECONDS):
         self.job_manager = get_job_manager()
         self.cost_tracker = CloudCostTracker()
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Return the reporter's shared jobs-database connection, opening it on first use.
+        
+        The connection stays open across report calls so SQLite's page cache
+        stays warm; using it as a context manager only scopes a transaction.
+        """
+        if self._conn is None:
+            conn = sqlite3.connect(self.job_manager.db_path)
+            conn.row_factory = sqlite3.Row
+            for pragma in REPORT_PRAGMAS:
+                conn.execute(pragma)
+            self._conn = conn
+        return self._conn
+    
+    def close(self):
+        """Close the shared database connection, if open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def _cache_key(self, report_name: str, call_args: Dict[str, Any]) -> str:
+        """Build a cache key from the report, its arguments and the jobs DB state."""
+        db_path = os.path.abspath(self.job_manager.db_path)
+        db_state = []
+        for path in (db_path, f"{db_path}-wal"):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stat = None
+            # An empty WAL (created lazily by readers) holds no changes
+            if stat is not None and stat.st_size > 0:
+                db_state.append((stat.st_mtime_ns, stat.st_size))
+            else:
+                db_state.append(None)
+        
+        key_source = json.dumps([report_name, sorted(call_args.items()), db_path, db_state], default=str)
+        return hashlib.sha1(key_source.encode()).hexdigest()
+    
+    def retrieve_costs_parallel(self, max_jobs: int = 10, days_back: int = 7,
+                                workers: int = DEFAULT_RETRIEVE_WORKERS) -> Dict[str, Any]:
+        """Retrieve missing actual costs, querying billing APIs for several jobs at once."""
+        return self.cost_tracker.batch_retrieve_costs(max_jobs, days_back, max_workers=workers)
     
     def generate_job_summary(self, job_id: str) -> Dict[str, Any]:
         """Generate detailed cost summary for a specific job."""
@@ -31,25 +169,26 @@ class CostReporter:
             return {'error': f'Job {job_id} not found'}
         
         # Add additional calculations
-        if summary.get('actual_cost') and summary.get('estimated_cost'):
+        actual = summary.get('actual_cost')
+        estimated = summary.get('estimated_cost')
+        if actual and estimated:
             summary['cost_accuracy'] = {
-                'estimated': summary['estimated_cost'],
-                'actual': summary['actual_cost'],
-                'difference': summary['actual_cost'] - summary['estimated_cost'],
-                'accuracy_percent': (1 - abs(summary['actual_cost'] - summary['estimated_cost']) / summary['estimated_cost']) * 100
+                'estimated': estimated,
+                'actual': actual,
+                'difference': actual - estimated,
+                'accuracy_percent': _accuracy_percent(actual, estimated)
             }
         
         return summary
     
+    @_cached_report
     def generate_cost_trends(self, days: int = 30, provider: Optional[str] = None) -> Dict[str, Any]:
         """Generate cost trends over time."""
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            with sqlite3.connect(self.job_manager.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                
+            with self._connect() as conn:
                 # Build query based on filters
                 where_clause = "WHERE created_at >= ?"
                 params = [start_date.isoformat()]
@@ -61,46 +200,59 @@ class CostReporter:
                 # Get jobs with costs
                 cursor = conn.execute(f'''
                     SELECT 
-                        DATE(created_at) as date,
+                        substr(created_at, 1, 10) as date,
                         provider,
                         COUNT(*) as job_count,
-                        SUM(COALESCE(actual_cost, estimated_cost, 0)) as total_cost,
-                        AVG(COALESCE(actual_cost, estimated_cost, 0)) as avg_cost,
+                        SUM(effective_cost) as total_cost,
+                        AVG(effective_cost) as avg_cost,
                         SUM(CASE WHEN actual_cost IS NOT NULL THEN actual_cost ELSE 0 END) as confirmed_cost,
                         SUM(CASE WHEN actual_cost IS NULL THEN COALESCE(estimated_cost, 0) ELSE 0 END) as estimated_cost
                     FROM jobs 
                     {where_clause}
-                    GROUP BY DATE(created_at), provider
+                    GROUP BY substr(created_at, 1, 10), provider
                     ORDER BY date DESC, provider
                 ''', params)
                 
-                daily_costs = []
-                for row in cursor.fetchall():
-                    daily_costs.append(dict(row))
+                daily_costs = [dict(row) for row in cursor]
                 
-                # Calculate totals
-                total_jobs = sum(row['job_count'] for row in daily_costs)
-                total_cost = sum(row['total_cost'] for row in daily_costs)
-                total_confirmed = sum(row['confirmed_cost'] for row in daily_costs)
-                total_estimated = sum(row['estimated_cost'] for row in daily_costs)
-                
-                # Group by provider
+                # Let SQLite do the provider and grand-total reductions too
+                cursor = conn.execute(f'''
+                    SELECT
+                        provider,
+                        COUNT(*) as job_count,
+                        SUM(effective_cost) as total_cost,
+                        SUM(CASE WHEN actual_cost IS NOT NULL THEN actual_cost ELSE 0 END) as confirmed_cost,
+                        SUM(CASE WHEN actual_cost IS NULL THEN COALESCE(estimated_cost, 0) ELSE 0 END) as estimated_cost
+                    FROM jobs
+                    {where_clause}
+                    GROUP BY provider
+                    ORDER BY provider
+                ''', params)
+
                 provider_summary = {}
-                for row in daily_costs:
-                    provider_name = row['provider']
-                    if provider_name not in provider_summary:
-                        provider_summary[provider_name] = {
-                            'job_count': 0,
-                            'total_cost': 0,
-                            'confirmed_cost': 0,
-                            'estimated_cost': 0
-                        }
-                    
-                    provider_summary[provider_name]['job_count'] += row['job_count']
-                    provider_summary[provider_name]['total_cost'] += row['total_cost']
-                    provider_summary[provider_name]['confirmed_cost'] += row['confirmed_cost']
-                    provider_summary[provider_name]['estimated_cost'] += row['estimated_cost']
-                
+                for row in cursor:
+                    provider_summary[row['provider']] = {
+                        'job_count': row['job_count'],
+                        'total_cost': row['total_cost'],
+                        'confirmed_cost': row['confirmed_cost'],
+                        'estimated_cost': row['estimated_cost']
+                    }
+
+                totals_row = conn.execute(f'''
+                    SELECT
+                        COUNT(*) as job_count,
+                        COALESCE(SUM(effective_cost), 0) as total_cost,
+                        COALESCE(SUM(CASE WHEN actual_cost IS NOT NULL THEN actual_cost ELSE 0 END), 0) as confirmed_cost,
+                        COALESCE(SUM(CASE WHEN actual_cost IS NULL THEN COALESCE(estimated_cost, 0) ELSE 0 END), 0) as estimated_cost
+                    FROM jobs
+                    {where_clause}
+                ''', params).fetchone()
+
+                total_jobs = totals_row['job_count']
+                total_cost = totals_row['total_cost']
+                total_confirmed = totals_row['confirmed_cost']
+                total_estimated = totals_row['estimated_cost']
+
                 return {
                     'period': {
                         'start_date': start_date.isoformat(),
@@ -122,12 +274,11 @@ class CostReporter:
             logger.error(f"Failed to generate cost trends: {e}")
             return {'error': str(e)}
     
+    @_cached_report
     def generate_budget_analysis(self) -> Dict[str, Any]:
         """Analyze budget performance across all jobs."""
         try:
-            with sqlite3.connect(self.job_manager.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                
+            with self._connect() as conn:
                 # Get jobs with budget limits
                 cursor = conn.execute('''
                     SELECT 
@@ -136,7 +287,7 @@ class CostReporter:
                         instance_type,
                         status,
                         budget_limit,
-                        COALESCE(actual_cost, estimated_cost, 0) as current_cost,
+                        effective_cost as current_cost,
                         actual_cost IS NOT NULL as has_actual_cost,
                         created_at
                     FROM jobs 
@@ -144,37 +295,57 @@ class CostReporter:
                     ORDER BY created_at DESC
                 ''')
                 
-                budget_jobs = []
-                for row in cursor.fetchall():
+                # Single pass: accumulate totals per row and only build dicts
+                # for the jobs that are actually returned
+                total_jobs = 0
+                total_budget_allocated = 0.0
+                total_spent = 0.0
+                total_savings = 0.0
+                total_overrun = 0.0
+                over_budget_jobs = []
+                recent_budget_jobs = []
+
+                for row in cursor:
+                    budget_limit = row['budget_limit']
+                    current_cost = row['current_cost']
+                    over_budget = budget_limit > 0 and current_cost > budget_limit
+
+                    total_jobs += 1
+                    total_budget_allocated += budget_limit
+                    total_spent += current_cost
+                    if over_budget:
+                        total_overrun += current_cost - budget_limit
+                    elif budget_limit > 0:
+                        total_savings += budget_limit - current_cost
+
+                    if not over_budget and len(recent_budget_jobs) >= 10:
+                        continue
+
                     job = dict(row)
-                    
-                    if job['budget_limit'] > 0:
-                        job['budget_usage_percent'] = (job['current_cost'] / job['budget_limit']) * 100
-                        job['over_budget'] = job['current_cost'] > job['budget_limit']
-                        job['remaining_budget'] = job['budget_limit'] - job['current_cost']
+                    if budget_limit > 0:
+                        job['budget_usage_percent'] = (current_cost / budget_limit) * 100
+                        job['over_budget'] = over_budget
+                        job['remaining_budget'] = budget_limit - current_cost
                     else:
                         job['budget_usage_percent'] = 0
                         job['over_budget'] = False
                         job['remaining_budget'] = 0
-                    
-                    budget_jobs.append(job)
-                
-                # Calculate statistics
-                total_jobs = len(budget_jobs)
-                over_budget_jobs = [job for job in budget_jobs if job['over_budget']]
-                within_budget_jobs = [job for job in budget_jobs if not job['over_budget']]
-                
-                total_budget_allocated = sum(job['budget_limit'] for job in budget_jobs)
-                total_spent = sum(job['current_cost'] for job in budget_jobs)
-                total_savings = sum(job['remaining_budget'] for job in within_budget_jobs)
-                total_overrun = sum(job['current_cost'] - job['budget_limit'] for job in over_budget_jobs)
-                
+
+                    if over_budget:
+                        job['over_budget_amount'] = current_cost - budget_limit
+                        over_budget_jobs.append(job)
+                    if len(recent_budget_jobs) < 10:
+                        recent_budget_jobs.append(job)
+
+                jobs_over_budget = len(over_budget_jobs)
+                jobs_within_budget = total_jobs - jobs_over_budget
+
                 return {
                     'summary': {
                         'total_jobs_with_budget': total_jobs,
-                        'jobs_within_budget': len(within_budget_jobs),
-                        'jobs_over_budget': len(over_budget_jobs),
-                        'budget_success_rate': (len(within_budget_jobs) / total_jobs * 100) if total_jobs > 0 else 0,
+                        'jobs_within_budget': jobs_within_budget,
+                        'jobs_over_budget': jobs_over_budget,
+                        'budget_success_rate': (jobs_within_budget / total_jobs * 100) if total_jobs > 0 else 0,
                         'total_budget_allocated': total_budget_allocated,
                         'total_spent': total_spent,
                         'total_savings': total_savings,
@@ -182,30 +353,29 @@ class CostReporter:
                         'budget_utilization_percent': (total_spent / total_budget_allocated * 100) if total_budget_allocated > 0 else 0
                     },
                     'over_budget_jobs': over_budget_jobs,
-                    'recent_budget_jobs': budget_jobs[:10]  # Last 10 jobs with budgets
+                    'recent_budget_jobs': recent_budget_jobs  # Last 10 jobs with budgets
                 }
         
         except Exception as e:
             logger.error(f"Failed to generate budget analysis: {e}")
             return {'error': str(e)}
     
+    @_cached_report
     def generate_provider_comparison(self, days: int = 30) -> Dict[str, Any]:
         """Compare costs across cloud providers."""
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            with sqlite3.connect(self.job_manager.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                
+            with self._connect() as conn:
                 cursor = conn.execute('''
                     SELECT 
                         provider,
                         COUNT(*) as job_count,
-                        AVG(COALESCE(actual_cost, estimated_cost, 0)) as avg_cost,
-                        MIN(COALESCE(actual_cost, estimated_cost, 0)) as min_cost,
-                        MAX(COALESCE(actual_cost, estimated_cost, 0)) as max_cost,
-                        SUM(COALESCE(actual_cost, estimated_cost, 0)) as total_cost,
+                        AVG(effective_cost) as avg_cost,
+                        MIN(effective_cost) as min_cost,
+                        MAX(effective_cost) as max_cost,
+                        SUM(effective_cost) as total_cost,
                         AVG(price_per_hour) as avg_price_per_hour,
                         COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_jobs,
                         COUNT(CASE WHEN status = 'failed' THEN 1 END) as failed_jobs
@@ -216,7 +386,7 @@ class CostReporter:
                 ''', (start_date.isoformat(),))
                 
                 provider_stats = []
-                for row in cursor.fetchall():
+                for row in cursor:
                     stats = dict(row)
                     
                     # Calculate success rate
@@ -227,13 +397,15 @@ class CostReporter:
                     
                     provider_stats.append(stats)
                 
-                # Find best and worst providers
-                if provider_stats:
-                    cheapest_provider = min(provider_stats, key=lambda x: x['avg_cost'])
-                    most_reliable = max(provider_stats, key=lambda x: x['success_rate'])
-                    most_used = max(provider_stats, key=lambda x: x['job_count'])
-                else:
-                    cheapest_provider = most_reliable = most_used = None
+                # Find best providers in a single scan (first one wins on ties)
+                cheapest_provider = most_reliable = most_used = None
+                for stats in provider_stats:
+                    if cheapest_provider is None or stats['avg_cost'] < cheapest_provider['avg_cost']:
+                        cheapest_provider = stats
+                    if most_reliable is None or stats['success_rate'] > most_reliable['success_rate']:
+                        most_reliable = stats
+                    if most_used is None or stats['job_count'] > most_used['job_count']:
+                        most_used = stats
                 
                 return {
                     'period': {
@@ -331,9 +503,16 @@ class CostReporter:
         print(f"{'Provider':<10} | {'Jobs':<6} | {'Total Cost':<12} | {'Avg Cost':<10}")
         print(f"{'-'*50}")
         
-        for provider_name, stats in trends['provider_breakdown'].items():
-            avg_cost = stats['total_cost'] / stats['job_count'] if stats['job_count'] > 0 else 0
-            print(f"{provider_name:<10} | {stats['job_count']:<6} | ${stats['total_cost']:<11.2f} | ${avg_cost:<9.4f}")
+        if trends['provider_breakdown']:
+            print("\n".join(
+                _PROVIDER_BREAKDOWN_ROW(
+                    provider=provider_name,
+                    job_count=stats['job_count'],
+                    total_cost=stats['total_cost'],
+                    avg_cost=stats['total_cost'] / stats['job_count'] if stats['job_count'] > 0 else 0
+                )
+                for provider_name, stats in trends['provider_breakdown'].items()
+            ))
         
         if trends['daily_costs']:
             print(f"\n{'Recent Daily Costs':<20}")
@@ -341,8 +520,8 @@ class CostReporter:
             print(f"{'Date':<12} | {'Provider':<8} | {'Jobs':<6} | {'Cost':<10}")
             print(f"{'-'*60}")
             
-            for day in trends['daily_costs'][:10]:  # Show last 10 days
-                print(f"{day['date']:<12} | {day['provider']:<8} | {day['job_count']:<6} | ${day['total_cost']:<9.2f}")
+            # Show last 10 days
+            print("\n".join(map(_DAILY_COST_ROW, trends['daily_costs'][:10])))
     
     def print_budget_analysis(self):
         """Print formatted budget analysis report."""
@@ -374,9 +553,8 @@ class CostReporter:
             print(f"{'Job ID':<10} | {'Provider':<8} | {'Budget':<8} | {'Spent':<8} | {'Over By':<8}")
             print(f"{'-'*80}")
             
-            for job in analysis['over_budget_jobs'][:10]:  # Show first 10
-                over_amount = job['current_cost'] - job['budget_limit']
-                print(f"{job['job_id']:<10} | {job['provider']:<8} | ${job['budget_limit']:<7.2f} | ${job['current_cost']:<7.2f} | ${over_amount:<7.2f}")
+            # Show first 10
+            print("\n".join(map(_OVER_BUDGET_ROW, analysis['over_budget_jobs'][:10])))
     
     def print_provider_comparison(self, days: int = 30):
         """Print formatted provider comparison report."""
@@ -397,9 +575,7 @@ class CostReporter:
         print(f"{'Provider':<8} | {'Jobs':<6} | {'Total Cost':<12} | {'Avg Cost':<10} | {'Success %':<9} | {'Avg $/hr':<8}")
         print(f"{'-'*90}")
         
-        for stats in comparison['provider_stats']:
-            print(f"{stats['provider']:<8} | {stats['job_count']:<6} | ${stats['total_cost']:<11.2f} | "
-                  f"${stats['avg_cost']:<9.4f} | {stats['success_rate']:<8.1f}% | ${stats['avg_price_per_hour']:<7.4f}")
+        print("\n".join(map(_PROVIDER_STATS_ROW, comparison['provider_stats'])))
         
         recommendations = comparison['recommendations']
         print(f"\n{'Recommendations':<20}")
@@ -421,6 +597,8 @@ class CostReporter:
 def main():
     """Main function for cost reporting."""
     parser = argparse.ArgumentParser(description="Generate cost reports for cloud jobs")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Bypass the report cache ({DEFAULT_CACHE_DIR}, {CACHE_TTL_SECONDS}s TTL)')
     
     # Report type selection
     subparsers = parser.add_subparsers(dest='command', help='Report type')
@@ -449,6 +627,8 @@ def main():
     retrieve_parser.add_argument('--job-id', help='Specific job ID to process')
     retrieve_parser.add_argument('--max-jobs', type=int, default=10, help='Maximum jobs to process')
     retrieve_parser.add_argument('--days-back', type=int, default=7, help='How many days back to look')
+    retrieve_parser.add_argument('--workers', type=int, default=DEFAULT_RETRIEVE_WORKERS,
+                                 help=f'Jobs to query concurrently (default: {DEFAULT_RETRIEVE_WORKERS})')
     
     args = parser.parse_args()
     
@@ -456,34 +636,34 @@ def main():
         parser.print_help()
         return
     
-    reporter = CostReporter()
+    reporter = CostReporter(cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
     
     try:
         if args.command == 'job':
             if hasattr(args, 'json') and args.json:
                 summary = reporter.generate_job_summary(args.job_id)
-                print(json.dumps(summary, indent=2))
+                print(_dumps(summary))
             else:
                 reporter.print_job_summary(args.job_id)
         
         elif args.command == 'trends':
             if args.json:
                 trends = reporter.generate_cost_trends(args.days, args.provider)
-                print(json.dumps(trends, indent=2))
+                print(_dumps(trends))
             else:
                 reporter.print_cost_trends(args.days, args.provider)
         
         elif args.command == 'budget':
             if args.json:
                 analysis = reporter.generate_budget_analysis()
-                print(json.dumps(analysis, indent=2))
+                print(_dumps(analysis))
             else:
                 reporter.print_budget_analysis()
         
         elif args.command == 'compare':
             if args.json:
                 comparison = reporter.generate_provider_comparison(args.days)
-                print(json.dumps(comparison, indent=2))
+                print(_dumps(comparison))
             else:
                 reporter.print_provider_comparison(args.days)
         
@@ -496,7 +676,7 @@ def main():
                     print(f"Failed to retrieve cost for job {args.job_id}")
                     sys.exit(1)
             else:
-                results = reporter.cost_tracker.batch_retrieve_costs(args.max_jobs, args.days_back)
+                results = reporter.retrieve_costs_parallel(args.max_jobs, args.days_back, args.workers)
                 print(f"Processed {results['processed']} jobs: {results['successful']} successful, {results['failed']} failed")
     
     except KeyboardInterrupt:
@@ -505,6 +685,8 @@ def main():
     except Exception as e:
         logger.error(f"Error generating report: {e}")
         sys.exit(1)
+    finally:
+        reporter.close()
 
 
 if __name__ == "__main__":
@@ -3,32 +3,101 @@
 List and manage cloud jobs.
 """
 import argparse
-import json
+import io
 import sys
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from job_manager import get_job_manager
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 
-def format_duration(start_time: str, end_time: str = None) -> str:
-    """Format duration between two timestamps."""
+# job_manager is imported where it is used so --help and argument errors stay fast
+if TYPE_CHECKING:
+    from job_manager import JobManager
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Basic table row template and the job fields it reads, bound once at import
+_TABLE_ROW = "{:<12} | {:<11} | {:<8} | {:<15} | {:<15} | {:<10} | {:<8}\n".format
+_TABLE_FIELDS = itemgetter('job_id', 'status', 'provider', 'instance_type', 'region')
+
+# Optional lines of the detailed view as (job key, label, value prefix), in display order
+_DETAIL_INSTANCE_FIELDS = (('instance_id', 'Instance ID', ''), ('public_ip', 'Public IP', ''))
+_DETAIL_TIME_FIELDS = (('started_at', 'Started', ''), ('completed_at', 'Completed', ''))
+_DETAIL_PATH_FIELDS = (('s3_input_path', 'Input', ''), ('gdrive_path', 'Results', 'gdrive:'),
+                       ('basis_set', 'Basis', ''))
+
+
+def _fast_iso(s: str) -> Tuple[int, int, int, int, int, int]:
+    """Split a 'YYYY-MM-DDTHH:MM:SS' prefix into integer fields."""
+    return int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19])
+
+
+def _days_from_civil(year: int, month: int, day: int) -> int:
+    """Days since 0000-03-01 in the proleptic Gregorian calendar."""
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(timestamp: str) -> int:
+    """Convert an ISO timestamp to integer microseconds on a fixed epoch.
+    
+    Timestamps written by JobManager take a slicing fast path; anything else
+    goes through datetime.fromisoformat.
+    """
+    length = len(timestamp)
+    if ((length == 19 or (length == 26 and timestamp[19] == '.'))
+            and timestamp[10] == 'T' and timestamp[4] == timestamp[7] == '-'
+            and timestamp[13] == timestamp[16] == ':'):
+        year, month, day, hour, minute, second = _fast_iso(timestamp)
+        micro = int(timestamp[20:26]) if length == 26 else 0
+    else:
+        dt = datetime.fromisoformat(timestamp)
+        year, month, day = dt.year, dt.month, dt.day
+        hour, minute, second, micro = dt.hour, dt.minute, dt.second, dt.microsecond
+    
+    seconds = ((_days_from_civil(year, month, day) * 24 + hour) * 60 + minute) * 60 + second
+    return seconds * 1_000_000 + micro
+
+
+@lru_cache(maxsize=4096)
+def _format_duration_cached(start_time: str, end_time: str) -> str:
     try:
-        start = datetime.fromisoformat(start_time)
-        end = datetime.fromisoformat(end_time) if end_time else datetime.now()
-        
-        duration = end - start
-        
-        if duration.days > 0:
-            return f"{duration.days}d {duration.seconds//3600}h"
-        elif duration.seconds >= 3600:
-            return f"{duration.seconds//3600}h {(duration.seconds%3600)//60}m"
-        elif duration.seconds >= 60:
-            return f"{duration.seconds//60}m"
-        else:
-            return f"{duration.seconds}s"
-    except:
+        elapsed = (_parse_iso(end_time) - _parse_iso(start_time)) // 1_000_000
+    except ValueError:
         return "unknown"
+    
+    days, seconds = divmod(elapsed, 86400)
+    if days > 0:
+        return f"{days}d {seconds//3600}h"
+    elif seconds >= 3600:
+        return f"{seconds//3600}h {(seconds%3600)//60}m"
+    elif seconds >= 60:
+        return f"{seconds//60}m"
+    else:
+        return f"{seconds}s"
 
 
+def format_duration(start_time: str, end_time: str = None, now: str = None) -> str:
+    """Format duration between two timestamps.
+    
+    Unfinished durations run until `now`, which callers formatting many rows
+    should compute once and pass in so repeated values hit the cache.
+    """
+    return _format_duration_cached(start_time, end_time or now or datetime.now().isoformat())
+
+
+@lru_cache(maxsize=1024)
 def format_cost(cost: float) -> str:
     """Format cost with appropriate precision."""
     if cost == 0:
@@ -39,93 +108,105 @@ def format_cost(cost: float) -> str:
         return f"${cost:.2f}"
 
 
-def display_jobs_table(jobs: List[Dict[str, Any]], detailed: bool = False):
+def fill_current_costs(jobs: List[Dict[str, Any]], jm: Optional['JobManager'] = None):
+    """Set `current_cost` on jobs that were listed without include_cost.
+    
+    Finished jobs use the final_cost already on their row; only the rest
+    are priced, in one batched lookup.
+    """
+    from job_manager import TERMINAL_STATUSES, get_job_manager
+    
+    missing = []
+    for job in jobs:
+        if 'current_cost' in job:
+            continue
+        if job.get('status') in TERMINAL_STATUSES and job.get('final_cost') is not None:
+            job['current_cost'] = job['final_cost']
+        else:
+            missing.append(job['job_id'])
+    
+    if missing:
+        costs = (jm or get_job_manager()).calculate_job_costs(missing)
+        for job in jobs:
+            if 'current_cost' not in job:
+                job['current_cost'] = costs.get(job['job_id'], 0.0)
+
+
+def display_jobs_table(jobs: List[Dict[str, Any]], detailed: bool = False,
+                       jm: Optional['JobManager'] = None):
     """Display jobs in a formatted table."""
     if not jobs:
         print("No jobs found.")
         return
     
-    # Calculate current costs for running jobs
-    jm = get_job_manager()
-    for job in jobs:
-        job['current_cost'] = jm.calculate_job_cost(job['job_id'])
+    fill_current_costs(jobs, jm)
+    
+    now = datetime.now().isoformat()
+    
+    # Buffer the whole table and write it once rather than printing per line
+    buf = io.StringIO()
+    write = buf.write
     
     # Basic table
     if not detailed:
-        print("=" * 120)
-        print(f"{'Job ID':<12} | {'Status':<11} | {'Provider':<8} | {'Instance':<15} | {'Region':<15} | {'Duration':<10} | {'Cost':<8}")
-        print("=" * 120)
+        row_fmt = _TABLE_ROW
+        get_fields = _TABLE_FIELDS
+        rule = "=" * 120 + "\n"
+        
+        write(rule)
+        write(row_fmt('Job ID', 'Status', 'Provider', 'Instance', 'Region', 'Duration', 'Cost'))
+        write(rule)
         
         for job in jobs:
-            duration = format_duration(job['created_at'], job.get('completed_at'))
-            cost = format_cost(job['current_cost'])
-            
-            print(f"{job['job_id']:<12} | {job['status']:<11} | {job['provider']:<8} | "
-                  f"{job['instance_type']:<15} | {job['region']:<15} | {duration:<10} | {cost:<8}")
+            job_id, status, provider, instance_type, region = get_fields(job)
+            write(row_fmt(job_id, status, provider, instance_type, region,
+                          format_duration(job['created_at'], job.get('completed_at'), now),
+                          format_cost(job['current_cost'])))
     
-    # Detailed table
+    # Detailed table, one joined block per job
     else:
+        rule = "=" * 80
+        
         for i, job in enumerate(jobs):
-            if i > 0:
-                print()
-            
-            print("=" * 80)
-            print(f"Job: {job['job_id']} ({job['status'].upper()})")
-            print("=" * 80)
-            
-            print(f"Provider: {job['provider']}")
-            print(f"Instance: {job['instance_type']} in {job['region']}")
-            
-            if job.get('instance_id'):
-                print(f"Instance ID: {job['instance_id']}")
-            
-            if job.get('public_ip'):
-                print(f"Public IP: {job['public_ip']}")
-            
-            print(f"Created: {job['created_at']}")
-            
-            if job.get('started_at'):
-                print(f"Started: {job['started_at']}")
-            
-            if job.get('completed_at'):
-                print(f"Completed: {job['completed_at']}")
-            
-            duration = format_duration(job['created_at'], job.get('completed_at'))
-            print(f"Duration: {duration}")
-            
-            cost = format_cost(job['current_cost'])
-            print(f"Cost: {cost}")
-            
-            if job.get('s3_input_path'):
-                print(f"Input: {job['s3_input_path']}")
+            lines = [
+                rule,
+                f"Job: {job['job_id']} ({job['status'].upper()})",
+                rule,
+                f"Provider: {job['provider']}",
+                f"Instance: {job['instance_type']} in {job['region']}",
+            ]
+            lines += [f"{label}: {prefix}{job[key]}" for key, label, prefix in _DETAIL_INSTANCE_FIELDS if job.get(key)]
+            lines.append(f"Created: {job['created_at']}")
+            lines += [f"{label}: {prefix}{job[key]}" for key, label, prefix in _DETAIL_TIME_FIELDS if job.get(key)]
+            lines.append(f"Duration: {format_duration(job['created_at'], job.get('completed_at'), now)}")
+            lines.append(f"Cost: {format_cost(job['current_cost'])}")
+            lines += [f"{label}: {prefix}{job[key]}" for key, label, prefix in _DETAIL_PATH_FIELDS if job.get(key)]
             
-            if job.get('gdrive_path'):
-                print(f"Results: gdrive:{job['gdrive_path']}")
-            
-            if job.get('basis_set'):
-                print(f"Basis: {job['basis_set']}")
+            write(("\n" if i > 0 else "") + "\n".join(lines) + "\n")
+    
+    sys.stdout.write(buf.getvalue())
 
 
-def display_jobs_summary(jobs: List[Dict[str, Any]]):
+def display_jobs_summary(jobs: List[Dict[str, Any]], jm: Optional['JobManager'] = None):
     """Display summary statistics."""
     if not jobs:
         return
     
-    # Calculate totals
-    jm = get_job_manager()
-    
-    total_jobs = len(jobs)
-    running_jobs = len([j for j in jobs if j['status'] in ['launched', 'running']])
-    completed_jobs = len([j for j in jobs if j['status'] == 'completed'])
-    failed_jobs = len([j for j in jobs if j['status'] == 'failed'])
-    
-    total_cost = sum(jm.calculate_job_cost(j['job_id']) for j in jobs)
+    fill_current_costs(jobs, jm)
     
-    # Provider breakdown
-    providers = {}
+    # Calculate totals and provider breakdown in one pass
+    status_counts = Counter()
+    providers = Counter()
+    total_cost = 0.0
     for job in jobs:
-        provider = job['provider']
-        providers[provider] = providers.get(provider, 0) + 1
+        status_counts[job['status']] += 1
+        providers[job['provider']] += 1
+        total_cost += job['current_cost']
+    
+    total_jobs = len(jobs)
+    running_jobs = status_counts['launched'] + status_counts['running']
+    completed_jobs = status_counts['completed']
+    failed_jobs = status_counts['failed']
     
     print("\n" + "=" * 50)
     print("SUMMARY")
@@ -137,46 +218,70 @@ def display_jobs_summary(jobs: List[Dict[str, Any]]):
     print(f"Total cost: {format_cost(total_cost)}")
     
     print("\nProviders:")
-    for provider, count in sorted(providers.items()):
+    for provider, count in providers.most_common():
         print(f"  {provider}: {count}")
 
 
-def cleanup_old_jobs(days: int, dry_run: bool = False) -> int:
+def write_jobs_json(jobs: List[Dict[str, Any]]):
+    """Write jobs to stdout as indented JSON without building one big string.
+    
+    orjson, when installed, encodes straight to bytes; otherwise json.dump
+    streams the encoder's chunks to stdout.
+    """
+    if ORJSON_AVAILABLE:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(jobs, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        sys.stdout.buffer.flush()
+    else:
+        import json
+        json.dump(jobs, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+def cleanup_old_jobs(days: int, dry_run: bool = False,
+                     jm: Optional['JobManager'] = None) -> int:
     """Clean up old completed jobs."""
-    jm = get_job_manager()
+    if jm is None:
+        from job_manager import get_job_manager
+        jm = get_job_manager()
     
     if dry_run:
         # Show what would be deleted
-        cutoff_date = datetime.now() - timedelta(days=days)
-        old_jobs = []
+        cutoff_iso = (datetime.now() - timedelta(days=days)).isoformat()
+        old_jobs = jm.iter_old_jobs(cutoff_iso)
         
-        all_jobs = jm.list_jobs(limit=1000)  # Get more jobs for cleanup
-        for job in all_jobs:
-            if job['status'] in ['completed', 'failed', 'terminated']:
-                job_date = datetime.fromisoformat(job['created_at'])
-                if job_date < cutoff_date:
-                    old_jobs.append(job)
+        preview = list(islice(old_jobs, 10))  # Show first 10
+        remaining = sum(1 for _ in old_jobs)
+        total = len(preview) + remaining
         
-        print(f"Would delete {len(old_jobs)} jobs older than {days} days:")
-        for job in old_jobs[:10]:  # Show first 10
+        print(f"Would delete {total} jobs older than {days} days:")
+        for job in preview:
             print(f"  {job['job_id']} ({job['status']}) - {job['created_at']}")
         
-        if len(old_jobs) > 10:
-            print(f"  ... and {len(old_jobs) - 10} more")
+        if remaining:
+            print(f"  ... and {remaining} more")
         
-        return len(old_jobs)
+        return total
     else:
         return jm.cleanup_completed_jobs(days)
 
 
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
 def main():
     """Main function for cloud_list.py"""
     parser = argparse.ArgumentParser(description="List and manage cloud jobs")
-    parser.add_argument("--status", choices=['launched', 'running', 'completed', 'failed', 'terminated'],
-                       help="Filter by job status")
+    parser.add_argument("--status", nargs='+', choices=['launched', 'running', 'completed', 'failed', 'terminated'],
+                       help="Filter by job status (one or more)")
     parser.add_argument("--provider", choices=['AWS', 'GCP', 'Azure'],
                        help="Filter by cloud provider")
-    parser.add_argument("--limit", type=int, default=20,
+    parser.add_argument("--limit", type=positive_int, default=20,
                        help="Maximum number of jobs to show (default: 20)")
     parser.add_argument("--detailed", "-d", action="store_true",
                        help="Show detailed information")
@@ -191,11 +296,17 @@ def main():
     
     args = parser.parse_args()
     
+    # Start each invocation with fresh formatting caches
+    format_cost.cache_clear()
+    _parse_iso.cache_clear()
+    _format_duration_cached.cache_clear()
+    
+    from job_manager import get_job_manager
     jm = get_job_manager()
     
     # Handle cleanup
     if args.cleanup is not None:
-        deleted_count = cleanup_old_jobs(args.cleanup, args.dry_run)
+        deleted_count = cleanup_old_jobs(args.cleanup, args.dry_run, jm)
         
         if args.dry_run:
             print(f"\nUse --cleanup {args.cleanup} without --dry-run to actually delete these jobs")
@@ -205,7 +316,7 @@ def main():
         sys.exit(0)
     
     # Get jobs
-    jobs = jm.list_jobs(status=args.status, limit=args.limit)
+    jobs = jm.list_jobs(statuses=args.status, limit=args.limit, include_cost=True)
     
     # Filter by provider if specified
     if args.provider:
@@ -213,12 +324,12 @@ def main():
     
     # Output format
     if args.json:
-        print(json.dumps(jobs, indent=2))
+        write_jobs_json(jobs)
     else:
-        display_jobs_table(jobs, args.detailed)
+        display_jobs_table(jobs, args.detailed, jm)
         
         if args.summary:
-            display_jobs_summary(jobs)
+            display_jobs_summary(jobs, jm)
 
 
 if __name__ == "__main__":
@@ -4,27 +4,237 @@ Cloud Run - Unified interface for running cloud jobs with S3 staging.
 Uploads local files to S3, launches spot instance, and manages the job lifecycle.
 """
 import argparse
+import asyncio
 import boto3
+import fnmatch
+import hashlib
 import json
 import logging
+import mmap
 import os
+import re
+import shutil
+import subprocess
 import sys
 import time
 import uuid
-from pathlib import Path
-from typing import Dict, Any, List
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 from job_manager import get_job_manager
 
+try:
+    import aioboto3
+    AIOBOTO3_AVAILABLE = True
+except ImportError:
+    AIOBOTO3_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import pathspec
+    PATHSPEC_AVAILABLE = True
+except ImportError:
+    PATHSPEC_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Concurrent file uploads per job; the client's pool must cover them all
+UPLOAD_WORKERS = 32
+# In-flight uploads for the optional asyncio path (matches the client pool)
+ASYNC_UPLOAD_CONCURRENCY = 64
+# Files between upload progress log lines (per-file lines are DEBUG only)
+UPLOAD_PROGRESS_EVERY = 500
+# launch_job.py prints its JSON result on a line with this prefix
+LAUNCH_RESULT_PREFIX = 'RESULT: '
+# Launcher output lines kept for the error message of a failed launch
+LAUNCH_OUTPUT_TAIL_LINES = 50
+# How long instance discovery results are reused for the same requirements
+SPOT_PRICES_CACHE_TTL_SECONDS = 3600
+S3_CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 10}
+)
+# Small files get their parallelism from uploading many at once, not threads within a file
+FILE_TRANSFER_CONFIG = TransferConfig(use_threads=False)
+# Large inputs are split into parts that upload concurrently
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+LARGE_FILE_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=16,
+    max_io_queue=1000,
+    use_threads=True
+)
+
+# Added to the bootstrap before the code checkout so job inputs are in place
+_S3_DOWNLOAD_SECTION = '''
+# --- Download Input Files from S3 ---
+echo "Downloading input files from S3..."
+cd $HOME_DIR
+mkdir -p job_input
+cd job_input
+aws s3 sync "${S3_INPUT_PATH}" . --exclude "*.log"
+cd $HOME_DIR
+
+# Copy run_calculation.py if it exists in job input
+if [ -f job_input/run_calculation.py ]; then
+    cp job_input/run_calculation.py $HOME_DIR/
+fi
+'''
+# Bootstrap rewrites: S3 download before the build, rclone excludes for large
+# files, and GDRIVE_PATH in place of GDRIVE_DEST_DIR
+_BOOTSTRAP_REWRITES = {
+    'rclone sync "$OUTPUT_DIR" "${GDRIVE_REMOTE}:${GDRIVE_DEST_DIR}"':
+        'rclone sync "$OUTPUT_DIR" "${GDRIVE_REMOTE}:${GDRIVE_PATH}" --exclude "*.large" --exclude "*.tmp"',
+    '# --- Get and Build Code ---': _S3_DOWNLOAD_SECTION + "\n# --- Get and Build Code ---",
+    'GDRIVE_DEST_DIR': 'GDRIVE_PATH',
+}
+# Longest first, so the full rclone line wins over its GDRIVE_DEST_DIR substring
+_BOOTSTRAP_REWRITE_RE = re.compile(
+    '|'.join(re.escape(old) for old in sorted(_BOOTSTRAP_REWRITES, key=len, reverse=True))
+)
+# First line that is neither blank nor a comment
+_FIRST_COMMAND_RE = re.compile(r'^(?!#)[^\n]*\S', re.MULTILINE)
+
+
+def _file_etag(path: str, multipart: bool = False) -> str:
+    """The ETag S3 reports for this file when uploaded as we upload it.
+    
+    Single-part uploads get the file's MD5, hashed by hashlib.file_digest
+    with the GIL released. Multipart uploads get the MD5 of the concatenated
+    part MD5s plus '-<parts>', computed over an mmap of the file in
+    LARGE_FILE_TRANSFER_CONFIG chunk-size slices.
+    """
+    with open(path, 'rb') as f:
+        if not multipart:
+            return hashlib.file_digest(f, 'md5').hexdigest()
+        
+        chunk_size = LARGE_FILE_TRANSFER_CONFIG.multipart_chunksize
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                part_digests = [hashlib.md5(view[offset:offset + chunk_size]).digest()
+                                for offset in range(0, len(mapped), chunk_size)]
+            finally:
+                view.release()
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+
+def _json_bytes(obj: Any) -> bytes:
+    """Serialize obj as compact JSON bytes, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def _select_spot_price(path: str, index: int) -> Tuple[Optional[Dict[str, Any]], int]:
+    """Return the entry at index in a spot_prices.json file and the entries read.
+    
+    With ijson the file is streamed and parsing stops at index; otherwise the
+    whole list is parsed (with orjson when available). The entry is None
+    when index is out of range, in which case the count is the file's length.
+    """
+    if IJSON_AVAILABLE:
+        count = 0
+        with open(path, 'rb') as f:
+            for count, item in enumerate(ijson.items(f, 'item', use_float=True), 1):
+                if count > index:
+                    return item, count
+        return None, count
+    
+    with open(path, 'rb') as f:
+        spot_prices = orjson.loads(f.read()) if ORJSON_AVAILABLE else json.load(f)
+    if index >= len(spot_prices):
+        return None, len(spot_prices)
+    return spot_prices[index], len(spot_prices)
+
+
+def _spot_prices_cache_path(requirements: Tuple) -> str:
+    """Cache file for discovery results under the given hardware/budget requirements."""
+    key = hashlib.sha1(':'.join(map(str, requirements)).encode()).hexdigest()[:10]
+    return f"spot_prices_{key}.json"
+
+
+def _compile_excludes(exclude_patterns: List[str]) -> Optional[Callable[[str, str, bool], bool]]:
+    """Compile exclude patterns into one (name, relative_path, is_dir) predicate.
+    
+    With pathspec installed the patterns follow .gitignore rules; otherwise
+    they are globs joined into one regex and tried against both the entry
+    name and its relative path. Returns None if there are no patterns.
+    """
+    if not exclude_patterns:
+        return None
+    
+    if PATHSPEC_AVAILABLE:
+        spec = pathspec.PathSpec.from_lines('gitwildmatch', exclude_patterns)
+        return lambda name, relative_path, is_dir: spec.match_file(
+            relative_path + '/' if is_dir else relative_path
+        )
+    
+    exclude_re = re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in exclude_patterns))
+    return lambda name, relative_path, is_dir: bool(
+        exclude_re.match(name) or exclude_re.match(relative_path)
+    )
+
+
+def _scandir_recursive(root: str,
+                       is_excluded: Optional[Callable[[str, str, bool], bool]] = None) -> Iterator[Tuple[str, str]]:
+    """Yield (path, relative_path) for every file under root.
+    
+    relative_path is a string slice of the entry path, always '/'-separated
+    so it can be used directly in an S3 key. Entries rejected by is_excluded
+    are skipped; excluded directories are pruned without being read.
+    DirEntry type checks reuse the data from the directory read instead of a
+    stat per file.
+    """
+    prefix_len = len(root.rstrip(os.sep)) + 1
+    posix_paths = os.sep == '/'
+    pending = [root]
+    
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                relative_path = entry.path[prefix_len:]
+                if not posix_paths:
+                    relative_path = relative_path.replace(os.sep, '/')
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_excluded is not None and is_excluded(entry.name, relative_path, is_dir):
+                    continue
+                if is_dir:
+                    pending.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path, relative_path
+
+
+@lru_cache(maxsize=4)
+def _get_s3_client(region: Optional[str] = None):
+    """Return a shared S3 client, so every CloudJobManager reuses one connection pool."""
+    return boto3.client('s3', region_name=region, config=S3_CLIENT_CONFIG)
+
 
 class CloudJobManager:
     """Manages cloud job submission with S3 staging."""
     
     def __init__(self, s3_bucket: str, config_file: str = "config.json"):
         self.s3_bucket = s3_bucket
-        self.s3_client = boto3.client('s3')
+        self.s3_client = _get_s3_client()
         self.job_id = str(uuid.uuid4())[:8]
         
         # Load configuration
@@ -33,37 +243,107 @@ class CloudJobManager:
             with open(config_file, 'r') as f:
                 self.config = json.load(f)
     
-    def upload_job_files(self, job_dir: str, exclude_patterns: List[str] = None) -> str:
-        """Upload job directory to S3."""
+    def upload_job_files(self, job_dir: str, exclude_patterns: List[str] = None,
+                         use_async: bool = False) -> str:
+        """Upload job directory to S3.
+        
+        With use_async and aioboto3 installed, uploads run on one asyncio event
+        loop instead of a thread pool.
+        """
         if exclude_patterns is None:
             exclude_patterns = ['*.pyc', '__pycache__', '.git', '*.log']
         
         s3_prefix = f"{self.job_id}/input/"
-        uploaded_files = []
+        upload_tasks = []
         
         logger.info(f"Uploading files from {job_dir} to s3://{self.s3_bucket}/{s3_prefix}")
         
-        job_path = Path(job_dir)
-        for file_path in job_path.rglob('*'):
-            if file_path.is_file():
-                # Check if file matches exclude patterns
-                exclude = False
-                for pattern in exclude_patterns:
-                    if file_path.match(pattern):
-                        exclude = True
-                        break
-                
-                if not exclude:
-                    relative_path = file_path.relative_to(job_path)
-                    s3_key = f"{s3_prefix}{relative_path}"
-                    
-                    logger.info(f"Uploading {relative_path} to {s3_key}")
-                    self.s3_client.upload_file(str(file_path), self.s3_bucket, s3_key)
-                    uploaded_files.append(str(relative_path))
-        
-        logger.info(f"Uploaded {len(uploaded_files)} files to S3")
+        is_excluded = _compile_excludes(exclude_patterns)
+        for file_path, relative_path in _scandir_recursive(job_dir, is_excluded):
+            upload_tasks.append((file_path, relative_path))
+        
+        # One listing of the prefix lets unchanged files be skipped without a HEAD each
+        remote_objects = self._list_remote_objects(s3_prefix)
+        log_each_file = logger.isEnabledFor(logging.DEBUG)
+        
+        def plan(task: Tuple[str, str]) -> Optional[Tuple[str, str, TransferConfig]]:
+            """Return (file_path, s3_key, transfer_config), or None if S3 already has the file."""
+            file_path, relative_path = task
+            s3_key = f"{s3_prefix}{relative_path}"
+            size = os.path.getsize(file_path)
+            remote = remote_objects.get(s3_key)
+            if remote and remote[0] == size and remote[1] == _file_etag(file_path, '-' in remote[1]):
+                if log_each_file:
+                    logger.debug(f"Skipping unchanged {relative_path}")
+                return None
+            if log_each_file:
+                logger.debug(f"Uploading {relative_path} to {s3_key}")
+            if size >= MULTIPART_THRESHOLD:
+                return file_path, s3_key, LARGE_FILE_TRANSFER_CONFIG
+            return file_path, s3_key, FILE_TRANSFER_CONFIG
+        
+        def upload(task: Tuple[str, str]) -> bool:
+            planned = plan(task)
+            if planned is None:
+                return False
+            file_path, s3_key, transfer_config = planned
+            self.s3_client.upload_file(file_path, self.s3_bucket, s3_key, Config=transfer_config)
+            return True
+        
+        logger.info(f"Uploading {len(upload_tasks)} files...")
+        uploaded = 0
+        
+        if use_async and not AIOBOTO3_AVAILABLE:
+            logger.warning("aioboto3 not installed, uploading with threads instead")
+        
+        if use_async and AIOBOTO3_AVAILABLE:
+            # Planning may hash files, which releases the GIL, so it still uses threads
+            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                planned = [p for p in executor.map(plan, upload_tasks) if p is not None]
+            asyncio.run(self._upload_async(planned))
+            uploaded = len(planned)
+        else:
+            # Files upload concurrently over the shared client
+            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                for done, was_uploaded in enumerate(executor.map(upload, upload_tasks), 1):
+                    uploaded += was_uploaded
+                    if done % UPLOAD_PROGRESS_EVERY == 0:
+                        logger.info(f"Uploaded {done}/{len(upload_tasks)} files")
+        
+        if uploaded < len(upload_tasks):
+            logger.info(f"Skipped {len(upload_tasks) - uploaded} files already in S3")
+        logger.info(f"Uploaded {uploaded} files to S3")
         return f"s3://{self.s3_bucket}/{s3_prefix}"
     
+    async def _upload_async(self, uploads: List[Tuple[str, str, TransferConfig]]):
+        """Upload (file_path, s3_key, transfer_config) entries over one aioboto3 client."""
+        semaphore = asyncio.Semaphore(ASYNC_UPLOAD_CONCURRENCY)
+        done = 0
+        
+        async with aioboto3.Session().client('s3', config=S3_CLIENT_CONFIG) as s3:
+            async def upload_one(file_path: str, s3_key: str, transfer_config: TransferConfig):
+                nonlocal done
+                async with semaphore:
+                    await s3.upload_file(file_path, self.s3_bucket, s3_key, Config=transfer_config)
+                done += 1
+                if done % UPLOAD_PROGRESS_EVERY == 0:
+                    logger.info(f"Uploaded {done}/{len(uploads)} files")
+            
+            await asyncio.gather(*(upload_one(*upload) for upload in uploads))
+    
+    def _list_remote_objects(self, s3_prefix: str) -> Dict[str, Tuple[int, str]]:
+        """Map each key under s3_prefix to its (size, ETag); empty if it can't be listed."""
+        remote_objects = {}
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.s3_bucket, Prefix=s3_prefix):
+                for obj in page.get('Contents', []):
+                    remote_objects[obj['Key']] = (obj['Size'], obj['ETag'].strip('"'))
+        except ClientError as e:
+            logger.warning(f"Could not list existing objects, uploading all files: {e}")
+            return {}
+        return remote_objects
+    
     def create_job_metadata(self, job_config: Dict[str, Any], s3_path: str) -> Dict[str, Any]:
         """Create metadata for the job including S3 paths and configuration."""
         metadata = {
@@ -89,7 +369,8 @@ class CloudJobManager:
         
         # Upload files to S3 (unless dry run)
         if not dry_run:
-            s3_path = self.upload_job_files(job_dir, job_config.get('exclude_patterns'))
+            s3_path = self.upload_job_files(job_dir, job_config.get('exclude_patterns'),
+                                            use_async=job_config.get('async_upload', False))
         else:
             s3_path = f"s3://{self.s3_bucket}/{self.job_id}/input/"
             logger.info(f"[DRY RUN] Would upload files from {job_dir} to {s3_path}")
@@ -103,7 +384,7 @@ class CloudJobManager:
             self.s3_client.put_object(
                 Bucket=self.s3_bucket,
                 Key=metadata_key,
-                Body=json.dumps(metadata, indent=2),
+                Body=_json_bytes(metadata),
                 ContentType='application/json'
             )
             logger.info(f"Job metadata saved to s3://{self.s3_bucket}/{metadata_key}")
@@ -138,17 +419,16 @@ class CloudJobManager:
         # Create modified bootstrap script with environment variables
         bootstrap_content = self._create_custom_bootstrap(env_vars, bootstrap_script_name)
         
-        # Save custom bootstrap script
+        # Save custom bootstrap script, created executable so no chmod is needed
         bootstrap_path = f"/tmp/bootstrap_{self.job_id}.sh"
-        with open(bootstrap_path, 'w') as f:
+        fd = os.open(bootstrap_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+        with os.fdopen(fd, 'w') as f:
             f.write(bootstrap_content)
-        os.chmod(bootstrap_path, 0o755)
         
         if not dry_run:
-            # Initialize job manager and create job record
+            # The job record is written once, together with the launch outcome
             jm = get_job_manager()
             
-            # Create initial job record
             initial_job_config = {
                 's3_bucket': self.s3_bucket,  
                 's3_input_path': s3_path,
@@ -164,11 +444,6 @@ class CloudJobManager:
                 'region': region,
                 'job_id': self.job_id
             }
-            
-            # Create job record
-            if not jm.create_job(self.job_id, initial_job_config, initial_launch_result):
-                logger.error("Failed to create job record in database")
-                return {'status': 'failed', 'error': 'Database error'}
         else:
             logger.info(f"[DRY RUN] Would create job record in database for job {self.job_id}")
             logger.info(f"[DRY RUN] Provider: {provider}, Instance: {instance_type}, Region: {region}")
@@ -181,7 +456,8 @@ class CloudJobManager:
                 '--provider', provider,
                 '--instance', instance_type,
                 '--region', region,
-                '--config', 'config.json'
+                '--config', 'config.json',
+                '--bootstrap', bootstrap_path
             ]
             logger.info(f"[DRY RUN] Command: {' '.join(launch_cmd)}")
             logger.info(f"[DRY RUN] Bootstrap script would be created at: {bootstrap_path}")
@@ -193,8 +469,10 @@ class CloudJobManager:
             logger.info(bootstrap_preview[:500] + "..." if len(bootstrap_preview) > 500 else bootstrap_preview)
             
             # Clean up temp files
-            if os.path.exists(bootstrap_path):
+            try:
                 os.remove(bootstrap_path)
+            except FileNotFoundError:
+                pass
             
             # Return mock successful result
             mock_result = {
@@ -212,23 +490,16 @@ class CloudJobManager:
         
         # Normal launch process (not dry run)
         # Launch instance using existing launch_job.py
+        # The custom bootstrap is passed by path, so bootstrap.sh is never touched
         launch_cmd = [
             sys.executable, 'launch_job.py',
             '--provider', provider,
             '--instance', instance_type,
             '--region', region,
-            '--config', 'config.json'
+            '--config', 'config.json',
+            '--bootstrap', bootstrap_path
         ]
         
-        # Temporarily replace bootstrap.sh with our custom version
-        import shutil
-        original_bootstrap = None
-        if os.path.exists('bootstrap.sh'):
-            original_bootstrap = 'bootstrap.sh.bak'
-            shutil.move('bootstrap.sh', original_bootstrap)
-        
-        shutil.copy(bootstrap_path, 'bootstrap.sh')
-        
         # Also copy required Python scripts for job completion
         required_scripts = ['update_job_completion.py', 'job_manager.py', 'cost_tracker.py']
         temp_script_files = []
@@ -240,18 +511,30 @@ class CloudJobManager:
                 temp_script_files.append(temp_name)
                 logger.info(f"Prepared {script} for upload to instance")
         
+        launcher = subprocess.Popen(
+            launch_cmd + ['--emit-json-stdout'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        )
+        
         try:
-            # Run launch command
-            import subprocess
-            result = subprocess.run(launch_cmd, capture_output=True, text=True)
+            # Relay launcher logs as they arrive and act on the result line as
+            # soon as it is printed; any remaining output is drained afterwards
+            launch_result = None
+            output_tail = deque(maxlen=LAUNCH_OUTPUT_TAIL_LINES)
+            for line in launcher.stdout:
+                if line.startswith(LAUNCH_RESULT_PREFIX):
+                    launch_result = json.loads(line[len(LAUNCH_RESULT_PREFIX):])
+                    break
+                line = line.rstrip()
+                logger.info(f"[launch_job] {line}")
+                output_tail.append(line)
             
-            if result.returncode == 0:
+            if launch_result and launch_result.get('status') == 'launched':
                 logger.info("Instance launched successfully")
                 
-                # Parse launch result
-                with open('launch_result.json', 'r') as f:
-                    launch_result = json.load(f)
-                
                 # Add job metadata to launch result
                 launch_result['job_id'] = self.job_id
                 launch_result['s3_path'] = s3_path
@@ -264,7 +547,9 @@ class CloudJobManager:
                     'private_ip': launch_result.get('private_ip')
                 }
                 
-                jm.update_job_status(self.job_id, 'launched', job_update_data)
+                if not jm.record_job_lifecycle(self.job_id, initial_job_config, initial_launch_result,
+                                               'launched', job_update_data):
+                    logger.error(f"Instance launched but job {self.job_id} could not be recorded in database")
                 
                 # Save enhanced result
                 result_path = f"job_{self.job_id}_launch.json"
@@ -276,23 +561,27 @@ class CloudJobManager:
                 
                 return launch_result
             else:
-                logger.error(f"Failed to launch instance: {result.stderr}")
+                error = (launch_result or {}).get('error') or '\n'.join(output_tail)
+                logger.error(f"Failed to launch instance: {error}")
                 
-                # Update job status to failed
-                jm.update_job_status(self.job_id, 'failed', {
-                    'error_message': result.stderr
+                # Record the job as failed
+                jm.record_job_lifecycle(self.job_id, initial_job_config, initial_launch_result, 'failed', {
+                    'error_message': error
                 })
                 
-                return {'status': 'failed', 'error': result.stderr}
+                return {'status': 'failed', 'error': error}
         
         finally:
-            # Restore original bootstrap.sh
-            if original_bootstrap and os.path.exists(original_bootstrap):
-                shutil.move(original_bootstrap, 'bootstrap.sh')
+            for line in launcher.stdout:
+                logger.info(f"[launch_job] {line.rstrip()}")
+            launcher.stdout.close()
+            launcher.wait()
             
             # Clean up temp files
-            if os.path.exists(bootstrap_path):
+            try:
                 os.remove(bootstrap_path)
+            except FileNotFoundError:
+                pass
             
             # Clean up temporary script files
             for temp_file in temp_script_files:
@@ -305,63 +594,21 @@ class CloudJobManager:
         with open(bootstrap_script, 'r') as f:
             bootstrap_content = f.read()
         
-        # Insert environment variables at the beginning
-        env_section = "# Job-specific environment variables\n"
-        for key, value in env_vars.items():
-            env_section += f'export {key}="{value}"\n'
-        env_section += "\n"
-        
-        # Insert after the shebang and initial comments
-        lines = bootstrap_content.split('\n')
-        insert_index = 0
-        for i, line in enumerate(lines):
-            if line.strip() and not line.startswith('#'):
-                insert_index = i
-                break
-        
-        lines.insert(insert_index, env_section)
-        
-        # Modify the S3 download section
-        modified_content = '\n'.join(lines)
-        
-        # Add S3 download command after system setup
-        s3_download = '''
-# --- Download Input Files from S3 ---
-echo "Downloading input files from S3..."
-cd $HOME_DIR
-mkdir -p job_input
-cd job_input
-aws s3 sync "${S3_INPUT_PATH}" . --exclude "*.log"
-cd $HOME_DIR
-
-# Copy run_calculation.py if it exists in job input
-if [ -f job_input/run_calculation.py ]; then
-    cp job_input/run_calculation.py $HOME_DIR/
-fi
-'''
-        
-        # Insert S3 download before the code cloning section
-        modified_content = modified_content.replace(
-            "# --- Get and Build Code ---",
-            s3_download + "\n# --- Get and Build Code ---"
+        # Apply every rewrite in a single pass over the script
+        modified_content = _BOOTSTRAP_REWRITE_RE.sub(
+            lambda match: _BOOTSTRAP_REWRITES[match.group(0)], bootstrap_content
         )
         
-        # Update the rclone sync command to exclude large files
-        modified_content = modified_content.replace(
-            'rclone sync "$OUTPUT_DIR" "${GDRIVE_REMOTE}:${GDRIVE_DEST_DIR}"',
-            'rclone sync "$OUTPUT_DIR" "${GDRIVE_REMOTE}:${GDRIVE_PATH}" --exclude "*.large" --exclude "*.tmp"'
+        # Insert environment variables after the shebang and initial comments
+        env_section = ''.join(
+            ["# Job-specific environment variables\n"]
+            + [f'export {key}="{value}"\n' for key, value in env_vars.items()]
+            + ["\n"]
         )
+        first_command = _FIRST_COMMAND_RE.search(modified_content)
+        insert_at = first_command.start() if first_command else 0
         
-        # Update the output directory path to use GDRIVE_PATH
-        modified_content = modified_content.replace(
-            'GDRIVE_DEST_DIR="${GDRIVE_DEST_DIR:-compute_project/results_$(date +%Y-%m-%d_%H-%M-%S)}"',
-            'GDRIVE_PATH="${GDRIVE_PATH:-compute_project/results_$(date +%Y-%m-%d_%H-%M-%S)}"'
-        )
-        
-        # Replace all instances of GDRIVE_DEST_DIR with GDRIVE_PATH
-        modified_content = modified_content.replace('GDRIVE_DEST_DIR', 'GDRIVE_PATH')
-        
-        return modified_content
+        return modified_content[:insert_at] + env_section + '\n' + modified_content[insert_at:]
 
 
 def main():
@@ -414,6 +661,8 @@ def main():
     
     # Configuration
     parser.add_argument("--config", default="config.json", help="Configuration file")
+    parser.add_argument("--async-upload", action="store_true",
+                       help="Upload input files with asyncio (requires aioboto3)")
     
     # Dry run mode
     parser.add_argument("--dry-run", action="store_true",
@@ -428,8 +677,24 @@ def main():
     
     # Determine instance details
     if args.from_spot_prices or not all([args.provider, args.instance, args.region]):
-        # Check if we need to run find_cheapest_instance.py first
-        if not os.path.exists('spot_prices.json') or hasattr(args, 'hardware_changed'):
+        # Explicit requirements get their own cached discovery results; without
+        # them an existing spot_prices.json (e.g. an interactive pick) is used
+        requirements = (args.min_vcpu, args.max_vcpu, args.min_ram, args.max_ram,
+                        args.budget, args.budget and args.estimated_runtime)
+        spot_prices_path = 'spot_prices.json'
+        run_discovery = not os.path.exists(spot_prices_path)
+        
+        if any(value is not None for value in requirements):
+            spot_prices_path = _spot_prices_cache_path(requirements)
+            try:
+                cache_age = time.time() - os.path.getmtime(spot_prices_path)
+            except FileNotFoundError:
+                cache_age = None
+            run_discovery = cache_age is None or cache_age >= SPOT_PRICES_CACHE_TTL_SECONDS
+            if not run_discovery:
+                logger.info(f"Using cached instance discovery results from {spot_prices_path}")
+        
+        if run_discovery:
             logger.info("Running instance discovery with current hardware requirements...")
             
             # Build find_cheapest_instance.py command
@@ -453,26 +718,27 @@ def main():
             # Run in non-interactive mode
             find_cmd.append('--no-interactive')
             
-            import subprocess
             result = subprocess.run(find_cmd, capture_output=True, text=True)
             
             if result.returncode != 0:
                 logger.error(f"Failed to find instances: {result.stderr}")
                 sys.exit(1)
+            
+            # find_cheapest_instance.py always writes spot_prices.json; keep a keyed copy
+            if spot_prices_path != 'spot_prices.json' and os.path.exists('spot_prices.json'):
+                shutil.copyfile('spot_prices.json', spot_prices_path)
         
-        # Load from spot_prices.json
-        if not os.path.exists('spot_prices.json'):
+        # Load the discovery results
+        if not os.path.exists(spot_prices_path):
             logger.error("spot_prices.json not found. Run find_cheapest_instance.py first.")
             sys.exit(1)
         
-        with open('spot_prices.json', 'r') as f:
-            spot_prices = json.load(f)
+        selected, entries = _select_spot_price(spot_prices_path, args.index)
         
-        if args.index >= len(spot_prices):
-            logger.error(f"Index {args.index} out of range. File has {len(spot_prices)} entries.")
+        if selected is None:
+            logger.error(f"Index {args.index} out of range. File has {entries} entries.")
             sys.exit(1)
         
-        selected = spot_prices[args.index]
         provider = selected['provider']
         instance = selected['instance']
         region = selected['region']
@@ -527,6 +793,9 @@ def main():
     if args.gdrive_path:
         job_config['gdrive_path'] = args.gdrive_path
     
+    if args.async_upload:
+        job_config['async_upload'] = True
+    
     # Initialize job manager
     manager = CloudJobManager(args.s3_bucket, args.config)
     
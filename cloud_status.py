@@ -3,35 +3,83 @@
 Check the status of a running cloud job.
 """
 import argparse
+import asyncio
+import io
 import json
 import sys
-import boto3
 import logging
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
-from job_manager import get_job_manager
-from google.cloud import compute_v1
-from azure.mgmt.compute import ComputeManagementClient
-from azure.identity import DefaultAzureCredential
+from operator import itemgetter
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from job_manager import ACTIVE_STATUSES, get_job_manager
+from cloud_clients import (
+    aws_client_config, azure_compute_client, cache_instance_meta, cached_instance_meta, ec2_describe_batcher,
+    ec2_instance_state, find_gcp_instance, gcp_instances_client, invalidate_instance_cache, s3_client
+)
+
+try:
+    import aioboto3
+    AIOBOTO3_AVAILABLE = True
+except ImportError:
+    AIOBOTO3_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Jobs whose checks are in flight at once in a multi-job status run
+BULK_STATUS_CONCURRENCY = 16
+
+# Concurrent listings used when an S3 prefix is listed shard by shard
+S3_LISTING_SHARD_WORKERS = 8
+
+# Instance fields check_gcp_instance_status reads (GCP partial response mask)
+GCP_INSTANCE_STATUS_FIELDS = (
+    'status,machineType,creationTimestamp,scheduling(preemptible),'
+    'networkInterfaces(networkIP,accessConfigs(natIP))'
+)
+
+# Local `rclone rcd` daemon used for Google Drive listings, how long to wait
+# for one we started, and how long a successful listing is reused
+RCLONE_RC_ADDR = ('127.0.0.1', 5572)
+RCLONE_RC_STARTUP_SECONDS = 3
+GDRIVE_LIST_TTL_SECONDS = 10
+_rclone_rc_state = {'started_at': None}
+_rclone_rc_lock = threading.Lock()
+_gdrive_list_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_gdrive_list_lock = threading.Lock()
+
 
 def check_aws_instance_status(instance_id: str, region: str) -> Dict[str, Any]:
-    """Check AWS instance status."""
+    """Check AWS instance status.
+    
+    While cached details are fresh only the instance state is fetched; the
+    full description is re-read when the state has changed since.
+    """
     try:
-        ec2 = boto3.client('ec2', region_name=region)
+        cached = cached_instance_meta('AWS', instance_id)
+        if cached and ec2_instance_state(region, instance_id) == cached['state']:
+            return cached
         
-        response = ec2.describe_instances(InstanceIds=[instance_id])
+        # Lookups from concurrent status checks share one DescribeInstances call
+        instance = ec2_describe_batcher.get(instance_id, region).result()
         
-        if not response['Reservations']:
+        if instance is None:
+            invalidate_instance_cache(instance_id)
             return {'status': 'not_found', 'state': 'terminated'}
         
-        instance = response['Reservations'][0]['Instances'][0]
-        
-        return {
+        status = {
             'status': 'found',
             'state': instance['State']['Name'],
             'public_ip': instance.get('PublicIpAddress'),
@@ -41,22 +89,33 @@ def check_aws_instance_status(instance_id: str, region: str) -> Dict[str, Any]:
             'availability_zone': instance.get('Placement', {}).get('AvailabilityZone'),
             'spot_instance_request_id': instance.get('SpotInstanceRequestId')
         }
+        cache_instance_meta('AWS', instance_id, status)
+        return status
         
     except Exception as e:
         logger.error(f"Failed to check AWS instance {instance_id}: {e}")
         return {'status': 'error', 'error': str(e)}
 
 
-def check_gcp_instance_status(instance_name: str, project_id: str, zone: str) -> Dict[str, Any]:
-    """Check GCP instance status."""
+def check_gcp_instance_status(instance_name: str, project_id: str, zone: Optional[str] = None) -> Dict[str, Any]:
+    """Check GCP instance status.
+    
+    Without a zone the instance is found with an aggregated (all-zone) list.
+    """
     try:
-        compute_client = compute_v1.InstancesClient()
-        
-        instance = compute_client.get(
-            project=project_id,
-            zone=zone,
-            instance=instance_name
-        )
+        if zone is None:
+            instance = find_gcp_instance(project_id, instance_name)
+            if instance is None:
+                return {'status': 'not_found', 'state': 'terminated'}
+            zone = instance.zone.split('/')[-1]
+        else:
+            # Ask only for the fields read below instead of the full Instance resource
+            instance = gcp_instances_client().get(
+                project=project_id,
+                zone=zone,
+                instance=instance_name,
+                metadata=(('x-goog-fieldmask', GCP_INSTANCE_STATUS_FIELDS),)
+            )
         
         # Get external IP
         external_ip = None
@@ -83,15 +142,29 @@ def check_gcp_instance_status(instance_name: str, project_id: str, zone: str) ->
 
 
 def check_azure_instance_status(vm_name: str, resource_group: str, subscription_id: str) -> Dict[str, Any]:
-    """Check Azure VM status."""
+    """Check Azure VM status.
+    
+    The first check reads the VM model and its instance view in one call.
+    The model (size, location, priority) is then cached, so repeat checks
+    only read the instance view for the current power state.
+    """
     try:
-        credential = DefaultAzureCredential()
-        compute_client = ComputeManagementClient(credential, subscription_id)
-        
-        vm = compute_client.virtual_machines.get(resource_group, vm_name)
-        
-        # Get instance view for power state
-        instance_view = compute_client.virtual_machines.instance_view(resource_group, vm_name)
+        compute_client = azure_compute_client(subscription_id)
+        
+        vm_details = cached_instance_meta('Azure', vm_name)
+        if vm_details is None:
+            vm = compute_client.virtual_machines.get(resource_group, vm_name, expand='instanceView')
+            vm_details = {
+                'vm_size': vm.hardware_profile.vm_size,
+                'location': vm.location,
+                'provisioning_state': vm.provisioning_state,
+                'priority': vm.priority.value if vm.priority else 'Regular'
+            }
+            cache_instance_meta('Azure', vm_name, vm_details)
+            instance_view = vm.instance_view
+        else:
+            # Get instance view for power state
+            instance_view = compute_client.virtual_machines.instance_view(resource_group, vm_name)
         
         power_state = 'unknown'
         for status in instance_view.statuses:
@@ -102,10 +175,7 @@ def check_azure_instance_status(vm_name: str, resource_group: str, subscription_
         return {
             'status': 'found',
             'state': power_state,
-            'vm_size': vm.hardware_profile.vm_size,
-            'location': vm.location,
-            'provisioning_state': vm.provisioning_state,
-            'priority': vm.priority.value if vm.priority else 'Regular'
+            **vm_details
         }
         
     except Exception as e:
@@ -113,44 +183,202 @@ def check_azure_instance_status(vm_name: str, resource_group: str, subscription_
         return {'status': 'error', 'error': str(e)}
 
 
-def check_s3_files(s3_bucket: str, s3_prefix: str) -> Dict[str, Any]:
-    """Check S3 input files."""
+def _sum_s3_listing(pages, shown: int = 10) -> Tuple[int, int, List[Dict[str, Any]]]:
+    """Count and size the objects in list_objects_v2 pages, keeping the first few."""
+    file_count = 0
+    total_size = 0
+    head = []
+    
+    # Only the first few objects (the ones shown) are kept; the rest are summed
+    for page in pages:
+        contents = page.get('Contents', ())
+        file_count += len(contents)
+        total_size += sum(map(itemgetter('Size'), contents))
+        head.extend(contents[:shown - len(head)])
+    
+    return file_count, total_size, head
+
+
+def _list_s3_prefix(s3_bucket: str, s3_prefix: str, **kwargs):
+    """Page through list_objects_v2 for a prefix, 1000 keys per page."""
+    paginator = s3_client().get_paginator('list_objects_v2')
+    return paginator.paginate(
+        Bucket=s3_bucket,
+        Prefix=s3_prefix,
+        PaginationConfig={'PageSize': 1000},
+        **kwargs
+    )
+
+
+def _sum_s3_shards(s3_bucket: str, s3_prefix: str, shown: int = 10) -> Optional[Tuple[int, int, List[Dict[str, Any]]]]:
+    """Sum a prefix by listing its immediate sub-prefixes concurrently.
+    
+    Returns None when the prefix has fewer than two sub-prefixes, since
+    there is nothing to gain over a single listing then.
+    """
+    top_level = []
+    sub_prefixes = []
+    for page in _list_s3_prefix(s3_bucket, s3_prefix, Delimiter='/'):
+        top_level.append(page)
+        sub_prefixes.extend(entry['Prefix'] for entry in page.get('CommonPrefixes', ()))
+    
+    if len(sub_prefixes) < 2:
+        return None
+    
+    # Each sub-prefix is its own ContinuationToken chain; only the running
+    # totals and a few head objects come back from each worker
+    with ThreadPoolExecutor(max_workers=S3_LISTING_SHARD_WORKERS) as executor:
+        shards = list(executor.map(
+            lambda prefix: _sum_s3_listing(_list_s3_prefix(s3_bucket, prefix), shown),
+            sub_prefixes
+        ))
+    shards.append(_sum_s3_listing(top_level, shown))
+    
+    file_count = sum(shard[0] for shard in shards)
+    total_size = sum(shard[1] for shard in shards)
+    head = sorted((obj for shard in shards for obj in shard[2]), key=itemgetter('Key'))[:shown]
+    return file_count, total_size, head
+
+
+def _s3_files_result(file_count: int, total_size: int, head: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the check_s3_files result from listing totals and the first objects."""
+    files = [
+        {
+            'key': obj['Key'],
+            'size': obj['Size'],
+            'last_modified': obj['LastModified'].isoformat()
+        }
+        for obj in head
+    ]
+    
+    return {
+        'status': 'found',
+        'file_count': file_count,
+        'total_size_bytes': total_size,
+        'files': files
+    }
+
+
+def check_s3_files(s3_bucket: str, s3_prefix: str, list_prefix_shards: bool = False,
+                   files_shown: int = 10) -> Dict[str, Any]:
+    """Check S3 input files.
+    
+    Up to files_shown files are returned by name; pass 0 when only the
+    totals are displayed. With list_prefix_shards, the sub-prefixes directly
+    under s3_prefix are listed in parallel instead of walking one listing
+    page by page.
+    """
     try:
-        s3 = boto3.client('s3')
-        
-        response = s3.list_objects_v2(
-            Bucket=s3_bucket,
-            Prefix=s3_prefix
-        )
+        summary = _sum_s3_shards(s3_bucket, s3_prefix, files_shown) if list_prefix_shards else None
         
-        files = []
-        total_size = 0
+        # Walk every page so counts aren't cut off at the first 1000 keys
+        if summary is None:
+            summary = _sum_s3_listing(_list_s3_prefix(s3_bucket, s3_prefix), files_shown)
         
-        for obj in response.get('Contents', []):
-            files.append({
-                'key': obj['Key'],
-                'size': obj['Size'],
-                'last_modified': obj['LastModified'].isoformat()
-            })
-            total_size += obj['Size']
-        
-        return {
-            'status': 'found',
-            'file_count': len(files),
-            'total_size_bytes': total_size,
-            'files': files[:10]  # Show first 10 files
-        }
+        return _s3_files_result(*summary)
         
     except Exception as e:
         logger.error(f"Failed to check S3 files: {e}")
         return {'status': 'error', 'error': str(e)}
 
 
-def check_gdrive_sync_status(gdrive_path: str) -> Dict[str, Any]:
-    """Check Google Drive sync status (requires rclone)."""
+async def check_s3_files_async(s3_bucket: str, s3_prefix: str, files_shown: int = 10) -> Dict[str, Any]:
+    """Check S3 input files over an aioboto3 client (requires aioboto3)."""
     try:
-        import subprocess
+        file_count = 0
+        total_size = 0
+        head = []
+        
+        async with aioboto3.Session().client('s3', config=aws_client_config()) as s3:
+            paginator = s3.get_paginator('list_objects_v2')
+            async for page in paginator.paginate(
+                Bucket=s3_bucket,
+                Prefix=s3_prefix,
+                PaginationConfig={'PageSize': 1000}
+            ):
+                contents = page.get('Contents', ())
+                file_count += len(contents)
+                total_size += sum(map(itemgetter('Size'), contents))
+                head.extend(contents[:files_shown - len(head)])
+        
+        return _s3_files_result(file_count, total_size, head)
         
+    except Exception as e:
+        logger.error(f"Failed to check S3 files: {e}")
+        return {'status': 'error', 'error': str(e)}
+
+
+def _rclone_rc_ready() -> bool:
+    """Make sure an `rclone rcd` daemon is listening, starting one if needed.
+    
+    The daemon is left running so later status checks skip rclone's startup
+    and re-authentication. Returns False if it can't be reached.
+    """
+    def listening() -> bool:
+        try:
+            socket.create_connection(RCLONE_RC_ADDR, timeout=0.2).close()
+            return True
+        except OSError:
+            return False
+    
+    if listening():
+        return True
+    
+    with _rclone_rc_lock:
+        if _rclone_rc_state['started_at'] is None:
+            _rclone_rc_state['started_at'] = time.monotonic()
+            try:
+                subprocess.Popen(
+                    ['rclone', 'rcd', '--rc-no-auth', f'--rc-addr={RCLONE_RC_ADDR[0]}:{RCLONE_RC_ADDR[1]}'],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
+            except OSError:
+                _rclone_rc_state['started_at'] = float('-inf')
+                return False
+    
+    # Only the first caller after a start waits for the daemon to come up
+    deadline = _rclone_rc_state['started_at'] + RCLONE_RC_STARTUP_SECONDS
+    while time.monotonic() < deadline:
+        if listening():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def _list_gdrive_rc(gdrive_path: str) -> Optional[Dict[str, Any]]:
+    """List a Google Drive path through the rclone rc API, or None if unreachable."""
+    import requests
+    
+    try:
+        response = requests.post(
+            f'http://{RCLONE_RC_ADDR[0]}:{RCLONE_RC_ADDR[1]}/operations/list',
+            json={
+                'fs': 'gdrive:',
+                'remote': gdrive_path,
+                'opt': {'filesOnly': True, 'noModTime': True, 'noMimeType': True}
+            },
+            timeout=30
+        )
+    except requests.RequestException:
+        return None
+    
+    if response.status_code != 200:
+        return {'status': 'not_accessible', 'error': response.text}
+    
+    files = [entry['Path'] for entry in response.json().get('list', [])]
+    return {
+        'status': 'accessible',
+        'file_count': len(files),
+        'files': files[:10]  # Show first 10 files
+    }
+
+
+def _list_gdrive_lsf(gdrive_path: str) -> Dict[str, Any]:
+    """List a Google Drive path by running `rclone lsf`."""
+    try:
         # Use rclone to check if path exists and get file count
         result = subprocess.run(
             ['rclone', 'lsf', f'gdrive:{gdrive_path}', '--files-only'],
@@ -176,152 +404,297 @@ def check_gdrive_sync_status(gdrive_path: str) -> Dict[str, Any]:
         return {'status': 'timeout', 'error': 'rclone command timed out'}
     except FileNotFoundError:
         return {'status': 'rclone_not_found', 'error': 'rclone not installed'}
+
+
+def check_gdrive_sync_status(gdrive_path: str) -> Dict[str, Any]:
+    """Check Google Drive sync status (requires rclone).
+    
+    Listings go through a long-lived `rclone rcd` daemon when one can be
+    reached, falling back to `rclone lsf`. Successful listings are reused
+    for GDRIVE_LIST_TTL_SECONDS.
+    """
+    with _gdrive_list_lock:
+        cached = _gdrive_list_cache.get(gdrive_path)
+    if cached and time.monotonic() - cached[0] < GDRIVE_LIST_TTL_SECONDS:
+        return cached[1]
+    
+    try:
+        result = _list_gdrive_rc(gdrive_path) if _rclone_rc_ready() else None
+        if result is None:
+            result = _list_gdrive_lsf(gdrive_path)
     except Exception as e:
         return {'status': 'error', 'error': str(e)}
+    
+    if result['status'] == 'accessible':
+        with _gdrive_list_lock:
+            _gdrive_list_cache[gdrive_path] = (time.monotonic(), result)
+    return result
+
+
+def instance_status_probe(job: Dict[str, Any]) -> Tuple[Callable[..., Dict[str, Any]], tuple]:
+    """Return the provider-specific instance check for a job and its arguments."""
+    metadata = job.get('metadata') or {}
+    job_config = metadata.get('job_config') or {}
+    launch_result = metadata.get('launch_result') or {}
+    
+    if job['provider'] == 'AWS':
+        return check_aws_instance_status, (job['instance_id'], job['region'])
+    elif job['provider'] == 'GCP':
+        # Zone comes from the launch metadata; without it the check searches all zones
+        zone = launch_result.get('zone') or None
+        project_id = job_config.get('project_id', '')
+        return check_gcp_instance_status, (job['instance_id'], project_id, zone)
+    elif job['provider'] == 'Azure':
+        resource_group = job_config.get('resource_group', '')
+        subscription_id = job_config.get('subscription_id', '')
+        return check_azure_instance_status, (job['instance_id'], resource_group, subscription_id)
+    else:
+        return (lambda: {'status': 'unsupported_provider'}), ()
+
+
+async def run_status_probes_async(job: Dict[str, Any], shard_s3_listing: bool = False,
+                                  s3_files_shown: int = 10) -> Dict[str, Dict[str, Any]]:
+    """Run the instance, S3 and Google Drive checks for a job concurrently.
+    
+    Each check is an independent network round-trip, so the total wait is
+    roughly the slowest one. The S3 listing runs on the event loop itself
+    when aioboto3 is installed; the other checks use blocking SDKs and run
+    in worker threads. Results are keyed by 'instance', 's3' and 'gdrive';
+    checks that don't apply to the job are left out.
+    """
+    probes = {}
+    
+    if job.get('instance_id') and job['status'] in ACTIVE_STATUSES:
+        probe, args = instance_status_probe(job)
+        probes['instance'] = asyncio.to_thread(probe, *args)
+    
+    if job.get('s3_input_path'):
+        s3_bucket = job.get('s3_bucket', '')
+        s3_prefix = job['s3_input_path'].replace(f's3://{s3_bucket}/', '')
+        if AIOBOTO3_AVAILABLE and not shard_s3_listing:
+            probes['s3'] = check_s3_files_async(s3_bucket, s3_prefix, s3_files_shown)
+        else:
+            probes['s3'] = asyncio.to_thread(
+                check_s3_files, s3_bucket, s3_prefix, shard_s3_listing, s3_files_shown
+            )
+    
+    if job.get('gdrive_path'):
+        probes['gdrive'] = asyncio.to_thread(check_gdrive_sync_status, job['gdrive_path'])
+    
+    results = await asyncio.gather(*probes.values())
+    return dict(zip(probes, results))
+
+
+def run_status_probes(job: Dict[str, Any], shard_s3_listing: bool = False,
+                      s3_files_shown: int = 10) -> Dict[str, Dict[str, Any]]:
+    """Synchronous wrapper around run_status_probes_async for scripts."""
+    return asyncio.run(run_status_probes_async(job, shard_s3_listing, s3_files_shown))
 
 
-def display_job_status(job: Dict[str, Any], detailed: bool = False):
+def display_job_status(job: Dict[str, Any], detailed: bool = False, shard_s3_listing: bool = False):
     """Display formatted job status."""
-    print("=" * 80)
-    print(f"JOB STATUS: {job['job_id']}")
-    print("=" * 80)
+    # Instance, S3 and Google Drive checks run concurrently
+    # S3 file names are only listed in the detailed view; otherwise just totals
+    probe_results = run_status_probes(job, shard_s3_listing, 10 if detailed else 0)
+    sys.stdout.write(format_job_status(job, probe_results, detailed))
+
+
+async def display_jobs_status(jobs: List[Dict[str, Any]], detailed: bool = False,
+                              shard_s3_listing: bool = False):
+    """Display the status of several jobs, checked concurrently on one event loop.
+    
+    At most BULK_STATUS_CONCURRENCY jobs are probed at once, and each report
+    is written as soon as its checks finish.
+    """
+    semaphore = asyncio.Semaphore(BULK_STATUS_CONCURRENCY)
+    
+    # Blocking checks run via asyncio.to_thread; give them room for up to three
+    # probes per in-flight job instead of the loop's CPU-sized default pool
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=BULK_STATUS_CONCURRENCY * 3)
+    )
+    
+    async def status_for(job: Dict[str, Any]) -> str:
+        async with semaphore:
+            probe_results = await run_status_probes_async(job, shard_s3_listing, 10 if detailed else 0)
+        return format_job_status(job, probe_results, detailed)
+    
+    for report in asyncio.as_completed([status_for(job) for job in jobs]):
+        sys.stdout.write(await report)
+
+
+def format_job_status(job: Dict[str, Any], probe_results: Dict[str, Dict[str, Any]],
+                      detailed: bool = False) -> str:
+    """Format a job's status report from its record and probe results."""
+    # Buffer the whole report and return it as one string rather than printing per line
+    buf = io.StringIO()
+    write = buf.write
+    
+    write("=" * 80 + "\n")
+    write(f"JOB STATUS: {job['job_id']}\n")
+    write("=" * 80 + "\n")
     
     # Basic job info
-    print(f"Status: {job['status'].upper()}")
-    print(f"Provider: {job['provider']}")
-    print(f"Instance: {job['instance_type']} in {job['region']}")
-    print(f"Created: {job['created_at']}")
-    print(f"Updated: {job['updated_at']}")
+    write(f"Status: {job['status'].upper()}\n")
+    write(f"Provider: {job['provider']}\n")
+    write(f"Instance: {job['instance_type']} in {job['region']}\n")
+    write(f"Created: {job['created_at']}\n")
+    write(f"Updated: {job['updated_at']}\n")
     
     if job.get('started_at'):
-        print(f"Started: {job['started_at']}")
+        write(f"Started: {job['started_at']}\n")
     
     if job.get('completed_at'):
-        print(f"Completed: {job['completed_at']}")
+        write(f"Completed: {job['completed_at']}\n")
     
     # Cost information
     jm = get_job_manager()
-    current_cost = jm.calculate_job_cost(job['job_id'])
+    current_cost = jm.calculate_job_cost(job['job_id'], job)
     if current_cost > 0:
-        print(f"Estimated cost: ${current_cost:.4f}")
+        write(f"Estimated cost: ${current_cost:.4f}\n")
     
-    print()
+    write("\n")
     
     # Instance status
-    if job.get('instance_id') and job['status'] in ['launched', 'running']:
-        print("INSTANCE STATUS:")
-        print("-" * 40)
+    if 'instance' in probe_results:
+        write("INSTANCE STATUS:\n")
+        write("-" * 40 + "\n")
         
-        if job['provider'] == 'AWS':
-            instance_status = check_aws_instance_status(job['instance_id'], job['region'])
-        elif job['provider'] == 'GCP':
-            # Need to parse zone from metadata
-            metadata = job.get('metadata', {})
-            zone = metadata.get('launch_result', {}).get('zone', f"{job['region']}-a")
-            project_id = metadata.get('job_config', {}).get('project_id', '')
-            instance_status = check_gcp_instance_status(job['instance_id'], project_id, zone)
-        elif job['provider'] == 'Azure':
-            metadata = job.get('metadata', {})
-            resource_group = metadata.get('job_config', {}).get('resource_group', '')
-            subscription_id = metadata.get('job_config', {}).get('subscription_id', '')
-            instance_status = check_azure_instance_status(job['instance_id'], resource_group, subscription_id)
-        else:
-            instance_status = {'status': 'unsupported_provider'}
+        instance_status = probe_results['instance']
         
         if instance_status['status'] == 'found':
-            print(f"State: {instance_status['state']}")
+            write(f"State: {instance_status['state']}\n")
             if instance_status.get('public_ip'):
-                print(f"Public IP: {instance_status['public_ip']}")
+                write(f"Public IP: {instance_status['public_ip']}\n")
             if instance_status.get('private_ip'):
-                print(f"Private IP: {instance_status['private_ip']}")
+                write(f"Private IP: {instance_status['private_ip']}\n")
         elif instance_status['status'] == 'not_found':
-            print("Instance not found (may have been terminated)")
+            write("Instance not found (may have been terminated)\n")
         else:
-            print(f"Unable to check instance: {instance_status.get('error', 'Unknown error')}")
+            write(f"Unable to check instance: {instance_status.get('error', 'Unknown error')}\n")
         
-        print()
+        write("\n")
     
     # S3 status
-    if job.get('s3_input_path'):
-        print("INPUT FILES (S3):")
-        print("-" * 40)
+    if 's3' in probe_results:
+        write("INPUT FILES (S3):\n")
+        write("-" * 40 + "\n")
         
-        s3_bucket = job.get('s3_bucket', '')
-        s3_prefix = job['s3_input_path'].replace(f's3://{s3_bucket}/', '')
-        s3_status = check_s3_files(s3_bucket, s3_prefix)
+        s3_status = probe_results['s3']
         
         if s3_status['status'] == 'found':
-            print(f"Files: {s3_status['file_count']}")
-            print(f"Total size: {s3_status['total_size_bytes']:,} bytes")
+            write(f"Files: {s3_status['file_count']}\n")
+            write(f"Total size: {s3_status['total_size_bytes']:,} bytes\n")
             if detailed and s3_status['files']:
-                print("Recent files:")
+                write("Recent files:\n")
                 for file_info in s3_status['files']:
-                    print(f"  {file_info['key'].split('/')[-1]} ({file_info['size']:,} bytes)")
+                    write(f"  {file_info['key'].split('/')[-1]} ({file_info['size']:,} bytes)\n")
         else:
-            print(f"Unable to check S3 files: {s3_status.get('error', 'Unknown error')}")
+            write(f"Unable to check S3 files: {s3_status.get('error', 'Unknown error')}\n")
         
-        print()
+        write("\n")
     
     # Google Drive status
-    if job.get('gdrive_path'):
-        print("RESULTS (Google Drive):")
-        print("-" * 40)
+    if 'gdrive' in probe_results:
+        write("RESULTS (Google Drive):\n")
+        write("-" * 40 + "\n")
         
-        gdrive_status = check_gdrive_sync_status(job['gdrive_path'])
+        gdrive_status = probe_results['gdrive']
         
         if gdrive_status['status'] == 'accessible':
-            print(f"Synced files: {gdrive_status['file_count']}")
+            write(f"Synced files: {gdrive_status['file_count']}\n")
             if detailed and gdrive_status['files']:
-                print("Files:")
+                write("Files:\n")
                 for filename in gdrive_status['files']:
-                    print(f"  {filename}")
+                    write(f"  {filename}\n")
         elif gdrive_status['status'] == 'not_accessible':
-            print("No results synced yet (or path not accessible)")
+            write("No results synced yet (or path not accessible)\n")
         elif gdrive_status['status'] == 'rclone_not_found':
-            print("Cannot check Google Drive (rclone not installed)")
+            write("Cannot check Google Drive (rclone not installed)\n")
         else:
-            print(f"Unable to check Google Drive: {gdrive_status.get('error', 'Unknown error')}")
+            write(f"Unable to check Google Drive: {gdrive_status.get('error', 'Unknown error')}\n")
         
-        print()
+        write("\n")
     
     # Additional details
     if detailed and job.get('metadata'):
-        print("CONFIGURATION:")
-        print("-" * 40)
-        metadata = job['metadata']
-        job_config = metadata.get('job_config', {})
+        write("CONFIGURATION:\n")
+        write("-" * 40 + "\n")
+        job_config = job['metadata'].get('job_config') or {}
         
         if job_config.get('basis_set'):
-            print(f"Basis set: {job_config['basis_set']}")
+            write(f"Basis set: {job_config['basis_set']}\n")
         if job_config.get('shci_executable'):
-            print(f"SHCI executable: {job_config['shci_executable']}")
+            write(f"SHCI executable: {job_config['shci_executable']}\n")
         
-        print()
+        write("\n")
+    
+    return buf.getvalue()
+
+
+def write_job_json(data: Any):
+    """Write a job (or list of jobs) to stdout as indented JSON, encoded with orjson when installed."""
+    if ORJSON_AVAILABLE:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        sys.stdout.buffer.flush()
+    else:
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write('\n')
 
 
 def main():
     """Main function for cloud_status.py"""
-    parser = argparse.ArgumentParser(description="Check status of a cloud job")
-    parser.add_argument("job_id", help="Job ID to check")
+    parser = argparse.ArgumentParser(description="Check status of cloud jobs")
+    parser.add_argument("job_ids", nargs='*', metavar="job_id", help="Job ID(s) to check")
+    parser.add_argument("--all-active", action="store_true",
+                       help="Check every launched or running job")
     parser.add_argument("--detailed", "-d", action="store_true", 
                        help="Show detailed information")
     parser.add_argument("--json", action="store_true",
                        help="Output raw JSON instead of formatted display")
+    parser.add_argument("--shard-s3-listing", action="store_true",
+                       help="List large S3 input prefixes sub-prefix by sub-prefix in parallel")
     
     args = parser.parse_args()
     
-    # Get job from database
+    if not args.job_ids and not args.all_active:
+        parser.error("give at least one job_id or --all-active")
+    
+    # Get jobs from database
     jm = get_job_manager()
-    job = jm.get_job(args.job_id)
+    jobs = []
+    failed = False
     
-    if not job:
-        print(f"Job {args.job_id} not found")
-        sys.exit(1)
+    if args.all_active:
+        # One query for every active job; SQLite treats a negative LIMIT as none
+        jobs = jm.list_jobs(statuses=ACTIVE_STATUSES, limit=-1)
+    
+    listed = {job['job_id'] for job in jobs}
+    for job_id in dict.fromkeys(args.job_ids):
+        if job_id in listed:
+            continue
+        
+        job = jm.get_job(job_id)
+        if not job:
+            print(f"Job {job_id} not found")
+            failed = True
+            continue
+        
+        jobs.append(job)
     
     if args.json:
-        print(json.dumps(job, indent=2))
-    else:
-        display_job_status(job, args.detailed)
+        if jobs:
+            write_job_json(jobs[0] if len(args.job_ids) == 1 and not args.all_active else jobs)
+    elif len(jobs) == 1:
+        display_job_status(jobs[0], args.detailed, args.shard_s3_listing)
+    elif jobs:
+        asyncio.run(display_jobs_status(jobs, args.detailed, args.shard_s3_listing))
+    elif args.all_active:
+        print("No active jobs")
+    
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -5,48 +5,67 @@ Terminate a running cloud job instance.
 import argparse
 import json
 import sys
-import boto3
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
-from job_manager import get_job_manager
-from google.cloud import compute_v1
-from azure.mgmt.compute import ComputeManagementClient
-from azure.identity import DefaultAzureCredential
+from botocore.exceptions import ClientError
+from job_manager import ACTIVE_STATUSES, TERMINAL_STATUSES, get_job_manager
+from cloud_clients import (
+    azure_compute_client, ec2_client, find_ec2_instance, gcp_instances_client, invalidate_instance_cache
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Minutes until the OS shutdown scheduled alongside the final sync; longer
+# than the SSH sync's own 120 s timeout, so it never cuts a sync short
+FINAL_SYNC_SHUTDOWN_MINUTES = 5
 
-def terminate_aws_instance(instance_id: str, region: str) -> Dict[str, Any]:
-    """Terminate AWS instance."""
+
+def terminate_aws_instance(instance_id: str, region: str, *, skip_precheck: bool = False) -> Dict[str, Any]:
+    """Terminate AWS instance.
+    
+    terminate_instances is idempotent and reports the previous state, so
+    with skip_precheck the describe call beforehand is left out.
+    """
     try:
-        ec2 = boto3.client('ec2', region_name=region)
+        ec2 = ec2_client(region)
         
         # First check if instance exists
-        try:
-            response = ec2.describe_instances(InstanceIds=[instance_id])
-            if not response['Reservations']:
-                return {'status': 'not_found', 'message': 'Instance not found'}
+        if not skip_precheck:
+            try:
+                instance = find_ec2_instance(region, instance_id)
+                if instance is None:
+                    return {'status': 'not_found', 'message': 'Instance not found'}
+                
+                current_state = instance['State']['Name']
+                
+                if current_state in ['terminated', 'terminating']:
+                    return {'status': 'already_terminated', 'message': f'Instance is already {current_state}'}
             
-            instance = response['Reservations'][0]['Instances'][0]
-            current_state = instance['State']['Name']
-            
-            if current_state in ['terminated', 'terminating']:
-                return {'status': 'already_terminated', 'message': f'Instance is already {current_state}'}
-        
-        except Exception as e:
-            return {'status': 'error', 'message': f'Could not check instance status: {str(e)}'}
+            except Exception as e:
+                return {'status': 'error', 'message': f'Could not check instance status: {str(e)}'}
         
         # Terminate the instance
-        response = ec2.terminate_instances(InstanceIds=[instance_id])
+        try:
+            response = ec2.terminate_instances(InstanceIds=[instance_id])
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'InvalidInstanceID.NotFound':
+                return {'status': 'not_found', 'message': 'Instance not found'}
+            raise
         
         if response['TerminatingInstances']:
             terminating_instance = response['TerminatingInstances'][0]
+            previous_state = terminating_instance['PreviousState']['Name']
+            
+            if previous_state in ['terminated', 'terminating']:
+                return {'status': 'already_terminated', 'message': f'Instance is already {previous_state}'}
+            
             return {
                 'status': 'success',
                 'message': 'Instance termination initiated',
-                'previous_state': terminating_instance['PreviousState']['Name'],
+                'previous_state': previous_state,
                 'current_state': terminating_instance['CurrentState']['Name']
             }
         else:
@@ -60,14 +79,15 @@ def terminate_aws_instance(instance_id: str, region: str) -> Dict[str, Any]:
 def terminate_gcp_instance(instance_name: str, project_id: str, zone: str) -> Dict[str, Any]:
     """Terminate GCP instance."""
     try:
-        compute_client = compute_v1.InstancesClient()
+        compute_client = gcp_instances_client()
         
         # Check if instance exists
         try:
             instance = compute_client.get(
                 project=project_id,
                 zone=zone,
-                instance=instance_name
+                instance=instance_name,
+                metadata=(('x-goog-fieldmask', 'status'),)
             )
             
             if instance.status.lower() in ['terminated', 'stopping']:
@@ -97,16 +117,13 @@ def terminate_gcp_instance(instance_name: str, project_id: str, zone: str) -> Di
 def terminate_azure_instance(vm_name: str, resource_group: str, subscription_id: str) -> Dict[str, Any]:
     """Terminate Azure VM."""
     try:
-        credential = DefaultAzureCredential()
-        compute_client = ComputeManagementClient(credential, subscription_id)
+        compute_client = azure_compute_client(subscription_id)
         
         # Check if VM exists
         try:
-            vm = compute_client.virtual_machines.get(resource_group, vm_name)
-            
-            # Get power state
-            instance_view = compute_client.virtual_machines.instance_view(resource_group, vm_name)
-            for status in instance_view.statuses:
+            # The expanded model carries the power state, so one call covers both
+            vm = compute_client.virtual_machines.get(resource_group, vm_name, expand='instanceView')
+            for status in vm.instance_view.statuses:
                 if status.code.startswith('PowerState/'):
                     current_state = status.code.split('/')[-1]
                     if current_state in ['deallocated', 'stopped']:
@@ -116,13 +133,13 @@ def terminate_azure_instance(vm_name: str, resource_group: str, subscription_id:
         except Exception as e:
             return {'status': 'not_found', 'message': 'VM not found'}
         
-        # Delete (deallocate and delete) the VM
-        poller = compute_client.virtual_machines.begin_delete(resource_group, vm_name)
+        # Delete (deallocate and delete) the VM; the long-running operation is
+        # started but not waited on, as with the AWS and GCP calls
+        compute_client.virtual_machines.begin_delete(resource_group, vm_name)
         
         return {
             'status': 'success',
-            'message': 'VM deletion initiated',
-            'operation_id': poller.result().name if hasattr(poller.result(), 'name') else 'unknown'
+            'message': 'VM deletion initiated'
         }
     
     except Exception as e:
@@ -133,7 +150,7 @@ def terminate_azure_instance(vm_name: str, resource_group: str, subscription_id:
 def cleanup_spot_instance_request(instance_id: str, region: str) -> Dict[str, Any]:
     """Cancel AWS spot instance request if it exists."""
     try:
-        ec2 = boto3.client('ec2', region_name=region)
+        ec2 = ec2_client(region)
         
         # Find spot instance request associated with this instance
         response = ec2.describe_spot_instance_requests(
@@ -184,6 +201,25 @@ def final_resync_before_termination(job: Dict[str, Any]) -> bool:
         return False
 
 
+def schedule_instance_shutdown(job: Dict[str, Any], minutes: int = FINAL_SYNC_SHUTDOWN_MINUTES) -> bool:
+    """Schedule an OS shutdown on the instance, as a backstop should termination fail."""
+    try:
+        from cloud_resync import trigger_resync_via_ssh
+        
+        result = trigger_resync_via_ssh(job, f'sudo shutdown -h +{minutes}')
+        
+        if result['status'] == 'success':
+            print(f"✓ Instance shutdown scheduled in {minutes} minutes")
+            return True
+        else:
+            print(f"⚠ Could not schedule shutdown: {result['message']}")
+            return False
+    
+    except Exception as e:
+        print(f"⚠ Could not schedule shutdown: {str(e)}")
+        return False
+
+
 def main():
     """Main function for cloud_terminate.py"""
     parser = argparse.ArgumentParser(description="Terminate a cloud job instance")
@@ -211,14 +247,14 @@ def main():
     print(f"Instance ID: {job.get('instance_id', 'Not available')}")
     
     # Calculate current cost
-    current_cost = jm.calculate_job_cost(args.job_id)
+    current_cost = jm.calculate_job_cost(args.job_id, job)
     if current_cost > 0:
         print(f"Estimated cost so far: ${current_cost:.4f}")
     
     print()
     
     # Check if job is already terminated
-    if job['status'] in ['completed', 'failed', 'terminated']:
+    if job['status'] in TERMINAL_STATUSES:
         print(f"Job is already in {job['status']} state.")
         if not args.force:
             print("Use --force to attempt termination anyway.")
@@ -236,15 +272,26 @@ def main():
             print("Termination cancelled")
             sys.exit(0)
     
-    # Attempt final sync unless disabled
-    if not args.no_final_sync and job.get('public_ip') and job['status'] in ['launched', 'running']:
-        final_resync_before_termination(job)
+    # Attempt final sync unless disabled; a delayed shutdown is scheduled over a
+    # second SSH session meanwhile, and termination proceeds once the sync returns
+    if not args.no_final_sync and job.get('public_ip') and job['status'] in ACTIVE_STATUSES:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sync = executor.submit(final_resync_before_termination, job)
+            executor.submit(schedule_instance_shutdown, job)
+            sync.result()
     
     # Terminate based on provider
     print(f"Terminating {job['provider']} instance...")
     
+    metadata = job.get('metadata') or {}
+    job_config = metadata.get('job_config') or {}
+    launch_result = metadata.get('launch_result') or {}
+    
     if job['provider'] == 'AWS':
-        result = terminate_aws_instance(job['instance_id'], job['region'])
+        # A forced run, or a job the database still has as live, goes straight
+        # to terminate_instances; its response says if it was already gone
+        skip_precheck = args.force or job['status'] in ACTIVE_STATUSES
+        result = terminate_aws_instance(job['instance_id'], job['region'], skip_precheck=skip_precheck)
         
         # Also cleanup spot instance request if applicable
         if result['status'] == 'success':
@@ -253,9 +300,8 @@ def main():
                 print(f"Also cancelled spot instance request")
     
     elif job['provider'] == 'GCP':
-        metadata = job.get('metadata', {})
-        project_id = metadata.get('job_config', {}).get('project_id', '')
-        zone = metadata.get('launch_result', {}).get('zone', f"{job['region']}-a")
+        project_id = job_config.get('project_id', '')
+        zone = launch_result.get('zone', f"{job['region']}-a")
         
         if not project_id:
             print("Error: No GCP project ID found in job metadata")
@@ -264,9 +310,8 @@ def main():
         result = terminate_gcp_instance(job['instance_id'], project_id, zone)
     
     elif job['provider'] == 'Azure':
-        metadata = job.get('metadata', {})
-        resource_group = metadata.get('job_config', {}).get('resource_group', '')
-        subscription_id = metadata.get('job_config', {}).get('subscription_id', '')
+        resource_group = job_config.get('resource_group', '')
+        subscription_id = job_config.get('subscription_id', '')
         
         if not resource_group or not subscription_id:
             print("Error: No Azure resource group or subscription ID found in job metadata")
@@ -278,6 +323,9 @@ def main():
         print(f"Unsupported provider: {job['provider']}")
         sys.exit(1)
     
+    # Cached status details no longer describe this instance
+    invalidate_instance_cache(job['instance_id'])
+    
     # Handle result
     if result['status'] == 'success':
         print(f"✓ {result['message']}")
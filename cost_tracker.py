@@ -3,14 +3,38 @@
 Cost Tracker - Integrates with cloud provider billing APIs to retrieve actual costs.
 Supports AWS Cost Explorer, GCP Cloud Billing, and Azure Cost Management APIs.
 """
+import asyncio
 import boto3
+import io
 import json
 import logging
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from functools import lru_cache, partial
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from botocore.config import Config
 from job_manager import get_job_manager
 
+try:
+    import aioboto3
+    AIOBOTO3_AVAILABLE = True
+except ImportError:
+    AIOBOTO3_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 try:
     from google.cloud import billing_v1
     from google.cloud import asset_v1
@@ -28,9 +52,116 @@ except ImportError:
     AZURE_AVAILABLE = False
     logging.warning("Azure libraries not available. Azure cost tracking disabled.")
 
+try:
+    from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+    from azure.mgmt.costmanagement.aio import CostManagementClient as AsyncCostManagementClient
+    AZURE_AIO_AVAILABLE = True
+except ImportError:
+    AZURE_AIO_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Most instance IDs one batched Cost Explorer request filters on, and most
+# VM resource IDs one batched Cost Management query filters on
+AWS_COST_BATCH_SIZE = 100
+AZURE_COST_BATCH_SIZE = 50
+
+# Billing days this recent may still change, so their cached costs are
+# refetched once older than the TTL; earlier days are cached for good
+COST_CACHE_SETTLING_DAYS = 2
+COST_CACHE_RECENT_TTL_SECONDS = 6 * 3600
+
+# Constant part of every Cost Management query: daily cost summed per resource
+AZURE_COST_DATASET = {
+    "granularity": "Daily",
+    "aggregation": {
+        "totalCost": {
+            "name": "Cost",
+            "function": "Sum"
+        }
+    },
+    "grouping": [
+        {
+            "type": "Dimension",
+            "name": "ResourceId"
+        }
+    ]
+}
+
+# Cost Management results with at least this many rows have their cost column
+# converted and filtered by numpy when it is installed
+AZURE_VECTORIZE_MIN_ROWS = 1000
+
+# Metadata JSON longer than this is streamed for launch_result when ijson is installed
+METADATA_STREAM_THRESHOLD_BYTES = 4096
+
+# Cost Explorer client settings: enough pooled connections for concurrent
+# batch queries, adaptive client-side retries and bounded timeouts
+COST_EXPLORER_CONFIG = Config(
+    max_pool_connections=32,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    connect_timeout=5,
+    read_timeout=30
+)
+
+# Billing API (requests per second, burst) per provider. Azure Cost Management
+# allows roughly 15 queries a minute per scope
+COST_API_RATE_LIMITS = {
+    'AWS': (5.0, 5),
+    'GCP': (5.0, 5),
+    'AZURE': (0.25, 5)
+}
+
+# Worker threads for synchronous SDK calls when no async client is installed
+COST_API_THREADS = 16
+
+# Throttled billing calls are retried with full-jitter exponential backoff
+COST_API_MAX_ATTEMPTS = 5
+COST_API_BACKOFF_BASE_SECONDS = 1.0
+THROTTLING_ERROR_CODES = ('LimitExceededException', 'ThrottlingException', 'Throttling',
+                          'TooManyRequestsException', 'RequestLimitExceeded')
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> datetime:
+    """datetime.fromisoformat, memoized; batches parse the same timestamps and days repeatedly."""
+    return datetime.fromisoformat(value)
+
+
+@lru_cache(maxsize=1024)
+def _usage_day(value: Any) -> str:
+    """Turn a Cost Management UsageDate (a yyyymmdd number) into an ISO day."""
+    return datetime.strptime(str(value), '%Y%m%d').date().isoformat()
+
+
+class AsyncRateLimiter:
+    """Token bucket for asyncio: `async with limiter:` waits for a token.
+    
+    Tokens refill at `rate` per second up to `burst`. A caller that finds
+    the bucket empty reserves the next token and sleeps until it is due, so
+    waiting callers are served in arrival order.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+    
+    async def __aenter__(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
 
 class CloudCostTracker:
     """Retrieves actual costs from cloud provider billing APIs."""
@@ -39,12 +170,38 @@ class CloudCostTracker:
         self.config = self._load_config(config_file)
         self.job_manager = get_job_manager()
         
+        # Provider payloads behind each cost entry are kept only when asked for
+        self.store_raw_breakdown = self.config.get('cost_tracker', {}).get('store_raw_breakdown', False)
+        
         # Initialize cloud clients
         self.aws_cost_client = None
         self.aws_ec2_client = None
         self.gcp_billing_client = None
         self.azure_cost_client = None
         
+        # One aioboto3 session for every async Cost Explorer call
+        self._aio_session = aioboto3.Session() if AIOBOTO3_AVAILABLE else None
+        
+        # Synchronous SDK calls made from async code run here; the SDKs release
+        # the GIL while waiting on the network, so threads give real overlap
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.get('cost_tracker', {}).get('threads', COST_API_THREADS),
+            thread_name_prefix='cost-api'
+        )
+        
+        self._rate_limiters = {
+            provider: AsyncRateLimiter(rate, burst)
+            for provider, (rate, burst) in COST_API_RATE_LIMITS.items()
+        }
+        
+        # Per provider: the builder of its lookup arguments from a job record, and
+        # the names of its sync and async lookups, resolved at call time
+        self._cost_handlers = {
+            'AWS': (self._aws_cost_args, 'get_aws_spot_cost', 'get_aws_spot_cost_async'),
+            'GCP': (self._gcp_cost_args, 'get_gcp_spot_cost', 'get_gcp_spot_cost_async'),
+            'AZURE': (self._azure_cost_args, 'get_azure_spot_cost', 'get_azure_spot_cost_async'),
+        }
+        
         self._init_aws_clients()
         self._init_gcp_clients()
         self._init_azure_clients()
@@ -68,13 +225,18 @@ class CloudCostTracker:
             region = aws_config.get('region', 'us-east-1')
             
             # Cost Explorer is only available in us-east-1
-            self.aws_cost_client = boto3.client('ce', region_name='us-east-1')
+            self.aws_cost_client = boto3.client('ce', region_name='us-east-1', config=COST_EXPLORER_CONFIG)
             self.aws_ec2_client = boto3.client('ec2', region_name=region)
             
             logger.info("AWS clients initialized successfully")
         except Exception as e:
             logger.warning(f"Failed to initialize AWS clients: {e}")
     
+    def _aio_cost_explorer_client(self):
+        """Return an aioboto3 Cost Explorer client context from the shared session."""
+        # Cost Explorer is only available in us-east-1
+        return self._aio_session.client('ce', region_name='us-east-1', config=COST_EXPLORER_CONFIG)
+    
     def _init_gcp_clients(self):
         """Initialize GCP clients."""
         if not GOOGLE_AVAILABLE:
@@ -104,90 +266,314 @@ class CloudCostTracker:
         except Exception as e:
             logger.warning(f"Failed to initialize Azure clients: {e}")
     
+    async def _run_in_thread(self, func: Callable[..., Any], *args) -> Any:
+        """Run a synchronous billing call on the tracker's thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args))
+    
+    async def _call_cost_api(self, provider: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await call() under the provider's rate limit, retrying it while throttled.
+        
+        Each attempt takes a token; between attempts the wait is drawn
+        uniformly from zero to a doubling ceiling. Other errors propagate.
+        """
+        for attempt in range(1, COST_API_MAX_ATTEMPTS + 1):
+            async with self._rate_limiters[provider]:
+                try:
+                    return await call()
+                except Exception as e:
+                    if attempt == COST_API_MAX_ATTEMPTS or not self._is_throttling_error(e):
+                        raise
+            
+            delay = random.uniform(0, COST_API_BACKOFF_BASE_SECONDS * 2 ** attempt)
+            logger.warning(f"{provider} billing API throttled; retrying in {delay:.1f}s "
+                           f"(attempt {attempt}/{COST_API_MAX_ATTEMPTS})")
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _is_throttling_error(error: Exception) -> bool:
+        """Return True if error is a provider rate-limit rejection."""
+        # botocore errors carry the parsed error body, Azure ones the HTTP status
+        response = getattr(error, 'response', None)
+        if isinstance(response, dict):
+            return response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+        return getattr(error, 'status_code', None) == 429
+    
     def get_aws_spot_cost(self, job_id: str, instance_id: str, region: str, 
                          start_date: datetime, end_date: datetime) -> Optional[Dict[str, Any]]:
-        """Retrieve AWS spot instance cost using Cost Explorer API."""
+        """Retrieve AWS spot instance cost using Cost Explorer API.
+        
+        Days already in the cost cache are not queried again.
+        """
         if not self.aws_cost_client:
             logger.error("AWS Cost Explorer client not available")
             return None
         
         try:
-            # Format dates for Cost Explorer API
-            start_str = start_date.strftime('%Y-%m-%d')
-            end_str = end_date.strftime('%Y-%m-%d')
-            
-            logger.info(f"Querying AWS costs for instance {instance_id} from {start_str} to {end_str}")
-            
-            # Query costs with resource-level granularity
-            response = self.aws_cost_client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_str,
-                    'End': end_str
-                },
-                Granularity='DAILY',
-                Metrics=['BlendedCost', 'UsageQuantity'],
-                GroupBy=[
-                    {'Type': 'DIMENSION', 'Key': 'RESOURCE_ID'},
-                    {'Type': 'DIMENSION', 'Key': 'USAGE_TYPE'}
-                ],
-                Filter={
-                    'And': [
-                        {
-                            'Dimensions': {
-                                'Key': 'RESOURCE_ID',
-                                'Values': [instance_id]
-                            }
-                        },
-                        {
-                            'Dimensions': {
-                                'Key': 'USAGE_TYPE',
-                                'Values': ['*SpotUsage*'],
-                                'MatchOptions': ['CONTAINS']
-                            }
-                        }
-                    ]
-                }
-            )
+            entries, span = self._cached_cost_days('AWS', instance_id, start_date, end_date)
             
-            total_cost = 0.0
-            cost_breakdown = []
-            
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    cost_amount = float(group['Metrics']['BlendedCost']['Amount'])
-                    usage_amount = float(group['Metrics']['UsageQuantity']['Amount'])
-                    
-                    if cost_amount > 0:
-                        total_cost += cost_amount
-                        
-                        cost_breakdown.append({
-                            'provider': 'AWS',
-                            'cost_type': 'spot_compute',
-                            'amount': cost_amount,
-                            'currency': group['Metrics']['BlendedCost']['Unit'],
-                            'usage_quantity': usage_amount,
-                            'usage_unit': group['Metrics']['UsageQuantity']['Unit'],
-                            'billing_period_start': result['TimePeriod']['Start'],
-                            'billing_period_end': result['TimePeriod']['End'],
-                            'raw_data': group
-                        })
-            
-            if total_cost > 0:
-                logger.info(f"Retrieved AWS cost for job {job_id}: ${total_cost:.4f}")
-                return {
-                    'total_cost': total_cost,
-                    'breakdown': cost_breakdown,
-                    'currency': 'USD',
-                    'provider': 'AWS'
-                }
-            else:
-                logger.warning(f"No cost data found for AWS instance {instance_id}")
-                return None
+            if span:
+                query = self._aws_cost_query([instance_id], *span)
+                logger.info(f"Querying AWS costs for instance {instance_id} from "
+                            f"{query['TimePeriod']['Start']} to {query['TimePeriod']['End']}")
+                
+                breakdowns = self._fetch_aws_costs([query])
+                entries += self._cache_cost_days('AWS', instance_id, span, breakdowns.get(instance_id, []))
+            
+            return self._aws_cost_data(job_id, instance_id, entries)
             
         except Exception as e:
             logger.error(f"Failed to retrieve AWS costs for job {job_id}: {e}")
             return None
     
+    async def get_aws_spot_cost_async(self, job_id: str, instance_id: str, region: str,
+                                      start_date: datetime, end_date: datetime) -> Optional[Dict[str, Any]]:
+        """Retrieve AWS spot instance cost without blocking the event loop.
+        
+        Uses an aioboto3 Cost Explorer client when installed; otherwise the
+        synchronous call runs in a worker thread.
+        """
+        if not AIOBOTO3_AVAILABLE:
+            return await self._call_cost_api('AWS', lambda: self._run_in_thread(
+                self.get_aws_spot_cost, job_id, instance_id, region, start_date, end_date
+            ))
+        
+        if not self.aws_cost_client:
+            logger.error("AWS Cost Explorer client not available")
+            return None
+        
+        try:
+            entries, span = self._cached_cost_days('AWS', instance_id, start_date, end_date)
+            
+            if span:
+                query = self._aws_cost_query([instance_id], *span)
+                logger.info(f"Querying AWS costs for instance {instance_id} from "
+                            f"{query['TimePeriod']['Start']} to {query['TimePeriod']['End']}")
+                
+                async with self._aio_cost_explorer_client() as ce:
+                    breakdowns = await self._fetch_aws_costs_async(ce, [query])
+                entries += self._cache_cost_days('AWS', instance_id, span, breakdowns.get(instance_id, []))
+            
+            return self._aws_cost_data(job_id, instance_id, entries)
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve AWS costs for job {job_id}: {e}")
+            return None
+    
+    def get_aws_spot_costs_batch(self, jobs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve AWS spot instance costs for several jobs in one Cost Explorer query.
+        
+        The query spans every job's uncached days and filters on all their
+        instance IDs; results are grouped by resource ID and keyed by job_id.
+        Jobs with no cost data are absent from the result.
+        """
+        if not self.aws_cost_client:
+            logger.error("AWS Cost Explorer client not available")
+            return {}
+        
+        try:
+            pending, queries = self._aws_batch_queries(jobs)
+            breakdowns = self._fetch_aws_costs(queries)
+            return self._aws_batch_results(pending, breakdowns)
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve AWS costs for {len(jobs)} jobs: {e}")
+            return {}
+    
+    async def get_aws_spot_costs_batch_async(self, jobs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve AWS spot instance costs for several jobs without blocking the event loop."""
+        if not AIOBOTO3_AVAILABLE:
+            return await self._call_cost_api('AWS', lambda: self._run_in_thread(self.get_aws_spot_costs_batch, jobs))
+        
+        if not self.aws_cost_client:
+            logger.error("AWS Cost Explorer client not available")
+            return {}
+        
+        try:
+            pending, queries = self._aws_batch_queries(jobs)
+            breakdowns = {}
+            
+            if queries:
+                async with self._aio_cost_explorer_client() as ce:
+                    breakdowns = await self._fetch_aws_costs_async(ce, queries)
+            
+            return self._aws_batch_results(pending, breakdowns)
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve AWS costs for {len(jobs)} jobs: {e}")
+            return {}
+    
+    def _aws_batch_queries(self, jobs: List[Dict[str, Any]]) -> Tuple[Dict[str, Tuple], List[Dict[str, Any]]]:
+        """Plan a batched cost lookup.
+        
+        Returns (job_id, cached entries, uncached span) keyed by instance ID,
+        and the Cost Explorer requests covering every uncached span.
+        """
+        pending = {}
+        for job in jobs:
+            if job.get('instance_id'):
+                entries, span = self._cached_cost_days('AWS', job['instance_id'], *self._cost_window(job))
+                pending[job['instance_id']] = (job['job_id'], entries, span)
+        
+        spans = [span for _, _, span in pending.values() if span]
+        if not spans:
+            return pending, []
+        
+        start_date = min(start for start, _ in spans)
+        end_date = max(end for _, end in spans)
+        
+        instance_ids = [instance_id for instance_id, (_, _, span) in pending.items() if span]
+        queries = [
+            self._aws_cost_query(instance_ids[i:i + AWS_COST_BATCH_SIZE], start_date, end_date)
+            for i in range(0, len(instance_ids), AWS_COST_BATCH_SIZE)
+        ]
+        logger.info(f"Querying AWS costs for {len(instance_ids)} instances from "
+                    f"{start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
+        return pending, queries
+    
+    def _aws_batch_results(self, pending: Dict[str, Tuple],
+                           breakdowns: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """Combine cached and fetched cost entries into cost data keyed by job_id."""
+        results = {}
+        
+        for instance_id, (job_id, entries, span) in pending.items():
+            if span:
+                # The batch query spans every job's window; keep only this instance's uncached days
+                entries = entries + self._cache_cost_days('AWS', instance_id, span, breakdowns.get(instance_id, []))
+            
+            cost_data = self._aws_cost_data(job_id, instance_id, entries)
+            if cost_data:
+                results[job_id] = cost_data
+        
+        return results
+    
+    def _fetch_aws_costs(self, queries: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Run Cost Explorer requests, following pagination, and collect cost entries by resource ID."""
+        breakdowns: Dict[str, List[Dict[str, Any]]] = {}
+        
+        for query in queries:
+            while True:
+                response = self.aws_cost_client.get_cost_and_usage(**query)
+                self._collect_aws_costs(breakdowns, response, self.store_raw_breakdown)
+                
+                next_token = response.get('NextPageToken')
+                if not next_token:
+                    break
+                query = {**query, 'NextPageToken': next_token}
+        
+        return breakdowns
+    
+    async def _fetch_aws_costs_async(self, ce, queries: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Run Cost Explorer requests on an aioboto3 client and collect cost entries by resource ID."""
+        breakdowns: Dict[str, List[Dict[str, Any]]] = {}
+        
+        for query in queries:
+            while True:
+                response = await self._call_cost_api('AWS', lambda: ce.get_cost_and_usage(**query))
+                self._collect_aws_costs(breakdowns, response, self.store_raw_breakdown)
+                
+                next_token = response.get('NextPageToken')
+                if not next_token:
+                    break
+                query = {**query, 'NextPageToken': next_token}
+        
+        return breakdowns
+    
+    @staticmethod
+    def _aws_cost_query(instance_ids: List[str], start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Build the Cost Explorer request for the given instances' spot usage."""
+        # Format dates for Cost Explorer API
+        start_str = start_date.strftime('%Y-%m-%d')
+        end_str = end_date.strftime('%Y-%m-%d')
+        
+        # Query costs with resource-level granularity
+        return {
+            'TimePeriod': {
+                'Start': start_str,
+                'End': end_str
+            },
+            'Granularity': 'DAILY',
+            'Metrics': ['BlendedCost', 'UsageQuantity'],
+            'GroupBy': [
+                {'Type': 'DIMENSION', 'Key': 'RESOURCE_ID'},
+                {'Type': 'DIMENSION', 'Key': 'USAGE_TYPE'}
+            ],
+            'Filter': {
+                'And': [
+                    {
+                        'Dimensions': {
+                            'Key': 'RESOURCE_ID',
+                            'Values': list(instance_ids)
+                        }
+                    },
+                    {
+                        'Dimensions': {
+                            'Key': 'USAGE_TYPE',
+                            'Values': ['*SpotUsage*'],
+                            'MatchOptions': ['CONTAINS']
+                        }
+                    }
+                ]
+            }
+        }
+    
+    @staticmethod
+    def _aws_cost_data(job_id: str, instance_id: str,
+                       cost_breakdown: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Turn an instance's cost entries into the job's cost data, or None if it has none."""
+        total_cost = sum(entry['amount'] for entry in cost_breakdown)
+        
+        if total_cost > 0:
+            logger.info(f"Retrieved AWS cost for job {job_id}: ${total_cost:.4f}")
+            return {
+                'total_cost': total_cost,
+                'breakdown': cost_breakdown,
+                'currency': 'USD',
+                'provider': 'AWS'
+            }
+        else:
+            logger.warning(f"No cost data found for AWS instance {instance_id}")
+            return None
+    
+    @classmethod
+    def _collect_aws_costs(cls, breakdowns: Dict[str, List[Dict[str, Any]]], response: Dict[str, Any],
+                           store_raw: bool = False):
+        """Add a Cost Explorer response's cost entries to breakdowns, keyed by resource ID."""
+        for resource_id, entry in cls._aws_cost_entries(response, store_raw):
+            breakdowns.setdefault(resource_id, []).append(entry)
+    
+    @staticmethod
+    def _aws_cost_entries(response: Dict[str, Any],
+                          store_raw: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (resource_id, breakdown entry) for each Cost Explorer group that cost anything.
+        
+        Zero-cost groups are skipped after one float conversion, before any
+        entry is built. With store_raw the group itself is kept as raw_data.
+        """
+        for result in response.get('ResultsByTime', ()):
+            period = result['TimePeriod']
+            
+            for group in result.get('Groups', ()):
+                metrics = group['Metrics']
+                blended_cost = metrics['BlendedCost']
+                cost_amount = float(blended_cost['Amount'])
+                if cost_amount <= 0:
+                    continue
+                
+                usage = metrics['UsageQuantity']
+                entry = {
+                    'provider': 'AWS',
+                    'cost_type': 'spot_compute',
+                    'amount': cost_amount,
+                    'currency': blended_cost['Unit'],
+                    'usage_quantity': float(usage['Amount']),
+                    'usage_unit': usage['Unit'],
+                    'billing_period_start': period['Start'],
+                    'billing_period_end': period['End']
+                }
+                if store_raw:
+                    entry['raw_data'] = group
+                yield group['Keys'][0], entry
+    
     def get_gcp_spot_cost(self, job_id: str, instance_name: str, project_id: str, zone: str,
                          start_date: datetime, end_date: datetime) -> Optional[Dict[str, Any]]:
         """Retrieve GCP preemptible instance cost."""
@@ -207,17 +593,20 @@ class CloudCostTracker:
             estimated_cost = self._estimate_gcp_cost(instance_name, project_id, zone, start_date, end_date)
             
             if estimated_cost:
+                entry = {
+                    'provider': 'GCP',
+                    'cost_type': 'preemptible_compute_estimated',
+                    'amount': estimated_cost,
+                    'currency': 'USD',
+                    'billing_period_start': start_date.isoformat(),
+                    'billing_period_end': end_date.isoformat()
+                }
+                if self.store_raw_breakdown:
+                    entry['raw_data'] = {'note': 'Estimated cost - requires BigQuery export for actual costs'}
+                
                 return {
                     'total_cost': estimated_cost,
-                    'breakdown': [{
-                        'provider': 'GCP',
-                        'cost_type': 'preemptible_compute_estimated',
-                        'amount': estimated_cost,
-                        'currency': 'USD',
-                        'billing_period_start': start_date.isoformat(),
-                        'billing_period_end': end_date.isoformat(),
-                        'raw_data': {'note': 'Estimated cost - requires BigQuery export for actual costs'}
-                    }],
+                    'breakdown': [entry],
                     'currency': 'USD',
                     'provider': 'GCP',
                     'estimated': True
@@ -227,6 +616,13 @@ class CloudCostTracker:
         
         return None
     
+    async def get_gcp_spot_cost_async(self, job_id: str, instance_name: str, project_id: str, zone: str,
+                                      start_date: datetime, end_date: datetime) -> Optional[Dict[str, Any]]:
+        """Retrieve GCP preemptible instance cost, running the synchronous client in a worker thread."""
+        return await self._call_cost_api('GCP', lambda: self._run_in_thread(
+            self.get_gcp_spot_cost, job_id, instance_name, project_id, zone, start_date, end_date
+        ))
+    
     def get_azure_spot_cost(self, job_id: str, vm_name: str, resource_group: str,
                            start_date: datetime, end_date: datetime) -> Optional[Dict[str, Any]]:
         """Retrieve Azure spot VM cost using Cost Management API."""
@@ -235,88 +631,316 @@ class CloudCostTracker:
             return None
         
         try:
-            azure_config = self.config.get('azure', {})
-            subscription_id = azure_config.get('subscription_id')
-            
-            if not subscription_id:
+            scope = self._azure_cost_scope()
+            if not scope:
                 logger.error("Azure subscription_id not configured")
                 return None
             
-            # Format scope for subscription-level query
-            scope = f"/subscriptions/{subscription_id}"
-            
-            # Prepare query definition
-            query_definition = {
-                "type": "Usage",
-                "timeframe": "Custom",
-                "timePeriod": {
-                    "from": start_date.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
-                    "to": end_date.strftime('%Y-%m-%dT%H:%M:%S.000Z')
-                },
-                "dataset": {
-                    "granularity": "Daily",
-                    "aggregation": {
-                        "totalCost": {
-                            "name": "Cost",
-                            "function": "Sum"
-                        }
-                    },
-                    "grouping": [
-                        {
-                            "type": "Dimension",
-                            "name": "ResourceId"
-                        }
-                    ],
-                    "filter": {
-                        "dimensions": {
-                            "name": "ResourceId",
-                            "operator": "Contains",
-                            "values": [vm_name]
-                        }
-                    }
-                }
-            }
+            query_definition = self._azure_cost_query(vm_name, start_date, end_date)
             
             logger.info(f"Querying Azure costs for VM {vm_name} in resource group {resource_group}")
             
             # Execute query
             response = self.azure_cost_client.query.usage(scope, query_definition)
+            return self._parse_azure_cost_response(
+                job_id, vm_name, start_date, end_date, response, self.store_raw_breakdown
+            )
             
-            total_cost = 0.0
-            cost_breakdown = []
+        except Exception as e:
+            logger.error(f"Failed to retrieve Azure costs for job {job_id}: {e}")
+            return None
+    
+    async def get_azure_spot_cost_async(self, job_id: str, vm_name: str, resource_group: str,
+                                        start_date: datetime, end_date: datetime) -> Optional[Dict[str, Any]]:
+        """Retrieve Azure spot VM cost without blocking the event loop.
+        
+        Uses the async Cost Management client when installed; otherwise the
+        synchronous call runs in a worker thread.
+        """
+        if not AZURE_AIO_AVAILABLE:
+            return await self._call_cost_api('AZURE', lambda: self._run_in_thread(
+                self.get_azure_spot_cost, job_id, vm_name, resource_group, start_date, end_date
+            ))
+        
+        if not self.azure_cost_client:
+            logger.error("Azure cost client not available")
+            return None
+        
+        try:
+            scope = self._azure_cost_scope()
+            if not scope:
+                logger.error("Azure subscription_id not configured")
+                return None
+            
+            query_definition = self._azure_cost_query(vm_name, start_date, end_date)
+            
+            logger.info(f"Querying Azure costs for VM {vm_name} in resource group {resource_group}")
+            
+            async with AsyncDefaultAzureCredential() as credential:
+                async with AsyncCostManagementClient(credential) as client:
+                    response = await self._call_cost_api(
+                        'AZURE', lambda: client.query.usage(scope, query_definition)
+                    )
+            return self._parse_azure_cost_response(
+                job_id, vm_name, start_date, end_date, response, self.store_raw_breakdown
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve Azure costs for job {job_id}: {e}")
+            return None
+    
+    def get_azure_spot_costs_batch(self, jobs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve Azure spot VM costs for several jobs in one Cost Management query.
+        
+        The query spans every job's billing window and filters on all their
+        VMs' resource IDs; rows are mapped back to jobs by resource ID and,
+        where the result gives it, usage day. Jobs with no cost data are
+        absent from the result.
+        """
+        if not self.azure_cost_client:
+            logger.error("Azure cost client not available")
+            return {}
+        
+        try:
+            scope = self._azure_cost_scope()
+            if not scope:
+                logger.error("Azure subscription_id not configured")
+                return {}
+            
+            owners, queries = self._azure_batch_queries(jobs)
+            rows = []
+            for query in queries:
+                response = self.azure_cost_client.query.usage(scope, query)
+                rows.extend(self._azure_cost_rows(response))
+            
+            return self._azure_batch_results(owners, rows, self.store_raw_breakdown)
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve Azure costs for {len(jobs)} jobs: {e}")
+            return {}
+    
+    async def get_azure_spot_costs_batch_async(self, jobs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve Azure spot VM costs for several jobs without blocking the event loop."""
+        if not AZURE_AIO_AVAILABLE:
+            return await self._call_cost_api('AZURE', lambda: self._run_in_thread(self.get_azure_spot_costs_batch, jobs))
+        
+        if not self.azure_cost_client:
+            logger.error("Azure cost client not available")
+            return {}
+        
+        try:
+            scope = self._azure_cost_scope()
+            if not scope:
+                logger.error("Azure subscription_id not configured")
+                return {}
+            
+            owners, queries = self._azure_batch_queries(jobs)
+            rows = []
+            
+            if queries:
+                async with AsyncDefaultAzureCredential() as credential:
+                    async with AsyncCostManagementClient(credential) as client:
+                        for query in queries:
+                            response = await self._call_cost_api(
+                                'AZURE', lambda: client.query.usage(scope, query)
+                            )
+                            rows.extend(self._azure_cost_rows(response))
+            
+            return self._azure_batch_results(owners, rows, self.store_raw_breakdown)
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve Azure costs for {len(jobs)} jobs: {e}")
+            return {}
+    
+    def _azure_batch_queries(self, jobs: List[Dict[str, Any]]) -> Tuple[Dict[str, List[Tuple]], List[Dict[str, Any]]]:
+        """Plan a batched Azure cost lookup.
+        
+        Returns (job_id, vm_name, start, end, first_day, last_day) entries
+        keyed by lowercased VM resource ID, since VM names can repeat across
+        jobs, and the query definitions covering them.
+        """
+        subscription_id = self.config.get('azure', {}).get('subscription_id')
+        owners: Dict[str, List[Tuple]] = {}
+        
+        for job in jobs:
+            launch_result = self._launch_result(job)
+            vm_name = launch_result.get('vm_name')
+            resource_group = launch_result.get('resource_group')
+            if vm_name and resource_group:
+                resource_id = (f"/subscriptions/{subscription_id}/resourceGroups/{resource_group}"
+                               f"/providers/Microsoft.Compute/virtualMachines/{vm_name}").lower()
+                start_date, end_date = self._cost_window(job)
+                owners.setdefault(resource_id, []).append((
+                    job['job_id'], vm_name, start_date, end_date,
+                    start_date.date().isoformat(), end_date.date().isoformat()
+                ))
+        
+        if not owners:
+            return owners, []
+        
+        windows = [(entry[2], entry[3]) for entries in owners.values() for entry in entries]
+        start_date = min(start for start, _ in windows)
+        end_date = max(end for _, end in windows)
+        
+        resource_ids = list(owners)
+        queries = [
+            self._azure_query_definition(start_date, end_date, {
+                "name": "ResourceId",
+                "operator": "In",
+                "values": resource_ids[i:i + AZURE_COST_BATCH_SIZE]
+            })
+            for i in range(0, len(resource_ids), AZURE_COST_BATCH_SIZE)
+        ]
+        logger.info(f"Querying Azure costs for {len(resource_ids)} VMs from "
+                    f"{start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
+        return owners, queries
+    
+    @staticmethod
+    def _azure_batch_results(owners: Dict[str, List[Tuple]], rows: List[Tuple[float, str, Optional[str], List[Any]]],
+                             store_raw: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Attribute Cost Management rows to jobs and build each job's cost data."""
+        breakdowns: Dict[str, List[Dict[str, Any]]] = {}
+        
+        for cost_amount, resource_id, usage_day, row in rows:
+            candidates = owners.get(resource_id.lower(), [])
+            if usage_day:
+                candidates = [entry for entry in candidates if entry[4] <= usage_day <= entry[5]]
+            if len(candidates) != 1:
+                logger.warning(f"Cannot attribute Azure cost row for {resource_id} to a single job")
+                continue
             
-            for row in response.rows:
-                cost_amount = float(row[0])  # Cost column
-                resource_id = row[1]  # ResourceId column
+            job_id, _, start_date, end_date, _, _ = candidates[0]
+            entry = {
+                'provider': 'Azure',
+                'cost_type': 'spot_compute',
+                'amount': cost_amount,
+                'currency': 'USD',  # Azure Cost Management typically returns USD
+                'resource_id': resource_id,
+                'billing_period_start': start_date.isoformat(),
+                'billing_period_end': end_date.isoformat()
+            }
+            if store_raw:
+                entry['raw_data'] = {'row': row}
+            breakdowns.setdefault(job_id, []).append(entry)
+        
+        results = {}
+        for entries in owners.values():
+            for job_id, vm_name, *_ in entries:
+                cost_breakdown = breakdowns.get(job_id)
+                if not cost_breakdown:
+                    logger.warning(f"No cost data found for Azure VM {vm_name}")
+                    continue
                 
-                if cost_amount > 0:
-                    total_cost += cost_amount
-                    
-                    cost_breakdown.append({
-                        'provider': 'Azure',
-                        'cost_type': 'spot_compute',
-                        'amount': cost_amount,
-                        'currency': 'USD',  # Azure Cost Management typically returns USD
-                        'resource_id': resource_id,
-                        'billing_period_start': start_date.isoformat(),
-                        'billing_period_end': end_date.isoformat(),
-                        'raw_data': {'row': row}
-                    })
-            
-            if total_cost > 0:
+                total_cost = sum(entry['amount'] for entry in cost_breakdown)
                 logger.info(f"Retrieved Azure cost for job {job_id}: ${total_cost:.4f}")
-                return {
+                results[job_id] = {
                     'total_cost': total_cost,
                     'breakdown': cost_breakdown,
                     'currency': 'USD',
                     'provider': 'Azure'
                 }
-            else:
-                logger.warning(f"No cost data found for Azure VM {vm_name}")
-                return None
+        
+        return results
+    
+    def _azure_cost_scope(self) -> Optional[str]:
+        """Return the subscription-level Cost Management scope, or None if unconfigured."""
+        azure_config = self.config.get('azure', {})
+        subscription_id = azure_config.get('subscription_id')
+        
+        # Format scope for subscription-level query
+        return f"/subscriptions/{subscription_id}" if subscription_id else None
+    
+    @classmethod
+    def _azure_cost_query(cls, vm_name: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Build the Cost Management query definition for one VM."""
+        return cls._azure_query_definition(start_date, end_date, {
+            "name": "ResourceId",
+            "operator": "Contains",
+            "values": [vm_name]
+        })
+    
+    @staticmethod
+    def _azure_query_definition(start_date: datetime, end_date: datetime,
+                                dimension_filter: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a daily Cost Management query grouped by ResourceId, filtered on one dimension.
+        
+        Only the time period and filter are new per call; the rest is shared
+        from AZURE_COST_DATASET, which nothing mutates.
+        """
+        return {
+            "type": "Usage",
+            "timeframe": "Custom",
+            "timePeriod": {
+                "from": start_date.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                "to": end_date.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+            },
+            "dataset": {**AZURE_COST_DATASET, "filter": {"dimensions": dimension_filter}}
+        }
+    
+    @staticmethod
+    def _azure_cost_rows(response) -> Iterator[Tuple[float, str, Optional[str], List[Any]]]:
+        """Yield (cost, resource_id, usage_day, row) for each Cost Management row that cost anything.
+        
+        Columns are found by name when the result lists them; otherwise cost
+        and ResourceId are taken as the first two columns and the day is None.
+        Zero-cost rows are dropped after one float conversion, before the day
+        is parsed; for large results numpy converts and filters the whole
+        cost column at once.
+        """
+        names = [getattr(column, 'name', None) for column in (getattr(response, 'columns', None) or [])]
+        cost_index = names.index('totalCost') if 'totalCost' in names else 0
+        resource_index = names.index('ResourceId') if 'ResourceId' in names else 1
+        day_index = names.index('UsageDate') if 'UsageDate' in names else None
+        
+        rows = response.rows
+        if NUMPY_AVAILABLE and len(rows) >= AZURE_VECTORIZE_MIN_ROWS:
+            costs = np.array([row[cost_index] for row in rows], dtype=np.float64)
+            positive = costs > 0
+            costed = zip(costs[positive].tolist(), (rows[i] for i in np.flatnonzero(positive).tolist()))
+        else:
+            costed = ((float(row[cost_index]), row) for row in rows)
+        
+        for cost_amount, row in costed:
+            if cost_amount <= 0:
+                continue
+            usage_day = _usage_day(row[day_index]) if day_index is not None else None
+            yield cost_amount, row[resource_index], usage_day, row
+    
+    @classmethod
+    def _parse_azure_cost_response(cls, job_id: str, vm_name: str, start_date: datetime, end_date: datetime,
+                                   response, store_raw: bool = False) -> Optional[Dict[str, Any]]:
+        """Turn a Cost Management query result into the job's cost data, or None if it has none."""
+        total_cost = 0.0
+        cost_breakdown = []
+        period_start = start_date.isoformat()
+        period_end = end_date.isoformat()
+        
+        for cost_amount, resource_id, _, row in cls._azure_cost_rows(response):
+            total_cost += cost_amount
             
-        except Exception as e:
-            logger.error(f"Failed to retrieve Azure costs for job {job_id}: {e}")
+            entry = {
+                'provider': 'Azure',
+                'cost_type': 'spot_compute',
+                'amount': cost_amount,
+                'currency': 'USD',  # Azure Cost Management typically returns USD
+                'resource_id': resource_id,
+                'billing_period_start': period_start,
+                'billing_period_end': period_end
+            }
+            if store_raw:
+                entry['raw_data'] = {'row': row}
+            cost_breakdown.append(entry)
+        
+        if total_cost > 0:
+            logger.info(f"Retrieved Azure cost for job {job_id}: ${total_cost:.4f}")
+            return {
+                'total_cost': total_cost,
+                'breakdown': cost_breakdown,
+                'currency': 'USD',
+                'provider': 'Azure'
+            }
+        else:
+            logger.warning(f"No cost data found for Azure VM {vm_name}")
             return None
     
     def _estimate_gcp_cost(self, instance_name: str, project_id: str, zone: str,
@@ -329,6 +953,157 @@ class CloudCostTracker:
     def retrieve_job_cost(self, job_id: str, force_refresh: bool = False) -> bool:
         """Retrieve actual cost for a completed job."""
         job = self.job_manager.get_job(job_id)
+        outcome = self._cost_retrieval_outcome(job_id, job, force_refresh)
+        if outcome is not None:
+            return outcome
+        
+        provider = job['provider'].upper()
+        handler = self._cost_handlers.get(provider)
+        if handler is None:
+            logger.error(f"Unsupported provider: {provider}")
+            return False
+        
+        build_args, lookup, _ = handler
+        
+        try:
+            cost_data = getattr(self, lookup)(*build_args(job, *self._cost_window(job)))
+            return self._store_job_cost(job_id, cost_data)
+            
+        except Exception as e:
+            logger.error(f"Error retrieving cost for job {job_id}: {e}")
+            return False
+    
+    async def retrieve_job_cost_async(self, job_id: str, force_refresh: bool = False) -> bool:
+        """Retrieve actual cost for a completed job, awaiting the billing API call."""
+        job = self.job_manager.get_job(job_id)
+        outcome = self._cost_retrieval_outcome(job_id, job, force_refresh)
+        if outcome is not None:
+            return outcome
+        
+        try:
+            return self._store_job_cost(job_id, await self._job_cost_data_async(job))
+            
+        except Exception as e:
+            logger.error(f"Error retrieving cost for job {job_id}: {e}")
+            return False
+    
+    async def _job_cost_data_async(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Query the billing API for one job's cost data, or return None if there is none."""
+        provider = job['provider'].upper()
+        handler = self._cost_handlers.get(provider)
+        if handler is None:
+            logger.error(f"Unsupported provider: {provider}")
+            return None
+        
+        build_args, _, lookup = handler
+        return await getattr(self, lookup)(*build_args(job, *self._cost_window(job)))
+    
+    @staticmethod
+    def _aws_cost_args(job: Dict[str, Any], start_date: datetime, end_date: datetime) -> Tuple:
+        """Return the AWS cost lookup arguments for a job."""
+        return job['job_id'], job['instance_id'], job['region'], start_date, end_date
+    
+    @classmethod
+    def _gcp_cost_args(cls, job: Dict[str, Any], start_date: datetime, end_date: datetime) -> Tuple:
+        """Return the GCP cost lookup arguments for a job."""
+        launch_result = cls._launch_result(job)
+        return (job['job_id'], launch_result.get('instance_name', ''), launch_result.get('project_id', ''),
+                launch_result.get('zone', ''), start_date, end_date)
+    
+    @classmethod
+    def _azure_cost_args(cls, job: Dict[str, Any], start_date: datetime, end_date: datetime) -> Tuple:
+        """Return the Azure cost lookup arguments for a job."""
+        launch_result = cls._launch_result(job)
+        return (job['job_id'], launch_result.get('vm_name', ''), launch_result.get('resource_group', ''),
+                start_date, end_date)
+    
+    @staticmethod
+    def _billing_days(start_date: datetime, end_date: datetime) -> List[str]:
+        """Return the billing days a query from start_date to end_date covers (end exclusive)."""
+        first, last = start_date.date(), end_date.date()
+        return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days)]
+    
+    def _cached_cost_days(self, provider: str, resource_id: str, start_date: datetime,
+                          end_date: datetime) -> Tuple[List[Dict[str, Any]], Optional[Tuple[datetime, datetime]]]:
+        """Split a billing window into cached cost entries and the span still to query.
+        
+        Returns the cached entries outside the span, and the (start, end) span
+        covering every day missing from the cache or still settling and older
+        than COST_CACHE_RECENT_TTL_SECONDS, or None if nothing needs querying.
+        """
+        days = self._billing_days(start_date, end_date)
+        if not days:
+            return [], (start_date, end_date)
+        
+        cached = self.job_manager.get_cached_costs(provider, resource_id, days[0], days[-1])
+        settling_from = (datetime.now().date() - timedelta(days=COST_CACHE_SETTLING_DAYS)).isoformat()
+        now = time.time()
+        
+        missing = [
+            day for day in days
+            if day not in cached
+            or (day >= settling_from and now - cached[day]['fetched_at'] > COST_CACHE_RECENT_TTL_SECONDS)
+        ]
+        if not missing:
+            return [entry for day in days for entry in cached[day]['entries']], None
+        
+        entries = [
+            entry for day in days if day < missing[0] or day > missing[-1]
+            for entry in cached[day]['entries']
+        ]
+        span = (_parse_iso(missing[0]), _parse_iso(missing[-1]) + timedelta(days=1))
+        return entries, span
+    
+    def _cache_cost_days(self, provider: str, resource_id: str, span: Tuple[datetime, datetime],
+                         entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Cache fetched cost entries for every day in span and return those falling in it."""
+        days = {day: [] for day in self._billing_days(*span)}
+        if not days:
+            return entries
+        
+        for entry in entries:
+            day = entry['billing_period_start'][:10]
+            if day in days:
+                days[day].append(entry)
+        
+        self.job_manager.cache_costs(provider, resource_id, days)
+        return [entry for day_entries in days.values() for entry in day_entries]
+    
+    @classmethod
+    def _launch_result(cls, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the launch_result recorded in a job's metadata.
+        
+        Large metadata still held as JSON text is streamed with ijson, which
+        stops once launch_result has been read instead of parsing the rest.
+        """
+        metadata = job.get('metadata')
+        if (IJSON_AVAILABLE and isinstance(metadata, str) and '_metadata_parsed' not in job
+                and len(metadata) > METADATA_STREAM_THRESHOLD_BYTES):
+            for launch_result in ijson.items(io.BytesIO(metadata.encode()), 'launch_result', use_float=True):
+                return launch_result
+            return {}
+        
+        return cls._job_metadata(job).get('launch_result', {})
+    
+    @staticmethod
+    def _job_metadata(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a job's metadata as a dict.
+        
+        JobManager reads return it parsed already; a record still holding the
+        JSON text is parsed once and the result kept on the record.
+        """
+        metadata = job.get('metadata')
+        if isinstance(metadata, dict):
+            return metadata
+        
+        if '_metadata_parsed' not in job:
+            job['_metadata_parsed'] = json.loads(metadata or '{}')
+        return job['_metadata_parsed']
+    
+    @staticmethod
+    def _cost_retrieval_outcome(job_id: str, job: Optional[Dict[str, Any]],
+                                force_refresh: bool) -> Optional[bool]:
+        """Return the result for a job whose cost shouldn't be queried, or None to query it."""
         if not job:
             logger.error(f"Job {job_id} not found")
             return False
@@ -343,79 +1118,74 @@ class CloudCostTracker:
             logger.warning(f"Job {job_id} is not completed (status: {job['status']})")
             return False
         
+        return None
+    
+    @staticmethod
+    def _cost_window(job: Dict[str, Any]) -> Tuple[datetime, datetime]:
+        """Return the (start, end) datetimes to query billing data for a job."""
         # Determine date range for cost query
-        start_date = datetime.fromisoformat(job.get('started_at') or job['created_at'])
-        end_date = datetime.fromisoformat(job.get('completed_at') or datetime.now().isoformat())
+        start_date = _parse_iso(job.get('started_at') or job['created_at'])
+        end_date = _parse_iso(job['completed_at']) if job.get('completed_at') else datetime.now()
         
         # Add buffer to account for billing delays
-        start_date = start_date - timedelta(hours=1)
-        end_date = end_date + timedelta(hours=1)
+        return start_date - timedelta(hours=1), end_date + timedelta(hours=1)
+    
+    def _store_job_cost(self, job_id: str, cost_data: Optional[Dict[str, Any]]) -> bool:
+        """Record retrieved cost data on the job; False if there was none or the update failed."""
+        if not cost_data:
+            logger.warning(f"No cost data retrieved for job {job_id}")
+            return False
         
-        cost_data = None
-        provider = job['provider'].upper()
+        # Update job record with actual cost
+        success = self.job_manager.update_actual_cost(
+            job_id, cost_data['total_cost'], cost_data['breakdown']
+        )
         
-        try:
-            if provider == 'AWS':
-                cost_data = self.get_aws_spot_cost(
-                    job_id, job['instance_id'], job['region'], start_date, end_date
-                )
-            elif provider == 'GCP':
-                metadata = json.loads(job.get('metadata', '{}'))
-                launch_result = metadata.get('launch_result', {})
-                cost_data = self.get_gcp_spot_cost(
-                    job_id, launch_result.get('instance_name', ''), 
-                    launch_result.get('project_id', ''), launch_result.get('zone', ''),
-                    start_date, end_date
-                )
-            elif provider == 'AZURE':
-                metadata = json.loads(job.get('metadata', '{}'))
-                launch_result = metadata.get('launch_result', {})
-                cost_data = self.get_azure_spot_cost(
-                    job_id, launch_result.get('vm_name', ''), 
-                    launch_result.get('resource_group', ''),
-                    start_date, end_date
-                )
-            else:
-                logger.error(f"Unsupported provider: {provider}")
-                return False
-            
+        if success:
+            logger.info(f"Successfully updated cost for job {job_id}: ${cost_data['total_cost']:.4f}")
+            return True
+        else:
+            logger.error(f"Failed to update cost in database for job {job_id}")
+            return False
+    
+    def _store_job_costs(self, costs: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, bool]:
+        """Record retrieved cost data for several jobs in one database transaction.
+        
+        Returns whether each job's cost was stored; False where there was no
+        data or the update failed.
+        """
+        rows = []
+        for job_id, cost_data in costs.items():
             if cost_data:
-                # Update job record with actual cost
-                success = self.job_manager.update_actual_cost(
-                    job_id, cost_data['total_cost'], cost_data['breakdown']
-                )
-                
-                if success:
-                    logger.info(f"Successfully updated cost for job {job_id}: ${cost_data['total_cost']:.4f}")
-                    return True
-                else:
-                    logger.error(f"Failed to update cost in database for job {job_id}")
-                    return False
+                rows.append((job_id, cost_data['total_cost'], cost_data['breakdown']))
             else:
                 logger.warning(f"No cost data retrieved for job {job_id}")
-                return False
-            
-        except Exception as e:
-            logger.error(f"Error retrieving cost for job {job_id}: {e}")
-            return False
-    
-    def batch_retrieve_costs(self, max_jobs: int = 10, days_back: int = 7) -> Dict[str, Any]:
-        """Retrieve costs for multiple completed jobs."""
-        # Get completed jobs without cost data
-        jobs = self.job_manager.list_jobs(limit=max_jobs * 2)  # Get more to filter
         
-        cutoff_date = datetime.now() - timedelta(days=days_back)
-        eligible_jobs = []
+        success = self.job_manager.update_actual_costs_bulk(rows) if rows else True
+        if not success:
+            logger.error(f"Failed to update costs in database for {len(rows)} jobs")
         
-        for job in jobs:
-            # Only process jobs that are completed and don't have cost data
-            if (job['status'] in ['completed', 'failed', 'terminated'] and 
-                job.get('actual_cost') is None and
-                datetime.fromisoformat(job['created_at']) >= cutoff_date):
-                eligible_jobs.append(job)
+        return {job_id: bool(cost_data) and success for job_id, cost_data in costs.items()}
+    
+    def batch_retrieve_costs(self, max_jobs: int = 10, days_back: int = 7,
+                             max_workers: int = 1) -> Dict[str, Any]:
+        """Retrieve costs for multiple completed jobs, up to max_workers at a time."""
+        return asyncio.run(self.batch_retrieve_costs_async(max_jobs, days_back, max_workers))
+    
+    async def batch_retrieve_costs_async(self, max_jobs: int = 10, days_back: int = 7,
+                                         max_workers: int = 1) -> Dict[str, Any]:
+        """Retrieve costs for multiple completed jobs on one event loop.
         
-        # Limit to max_jobs
-        eligible_jobs = eligible_jobs[:max_jobs]
+        AWS jobs share a single Cost Explorer query and Azure jobs a single
+        Cost Management query; GCP jobs are queried one by one. Each provider
+        has its own semaphore, sized from cost_tracker.concurrency in the
+        config or else max_workers, so a slow provider never holds up the
+        others' queries. Retrieved costs are written in one transaction
+        once every query has finished.
+        """
+        # Get completed jobs without cost data
+        cutoff_date = datetime.now() - timedelta(days=days_back)
+        eligible_jobs = self.job_manager.list_jobs_eligible_for_cost(cutoff_date.isoformat(), max_jobs)
         
         results = {
             'processed': 0,
@@ -424,11 +1194,52 @@ class CloudCostTracker:
             'jobs': []
         }
         
+        batch_lookups = {
+            'AWS': self.get_aws_spot_costs_batch_async,
+            'AZURE': self.get_azure_spot_costs_batch_async
+        }
+        by_provider: Dict[str, List[Dict[str, Any]]] = {}
         for job in eligible_jobs:
+            by_provider.setdefault(job['provider'].upper(), []).append(job)
+        
+        configured = {
+            provider.upper(): limit
+            for provider, limit in self.config.get('cost_tracker', {}).get('concurrency', {}).items()
+        }
+        semaphores = {
+            provider: asyncio.Semaphore(max(1, configured.get(provider, max_workers)))
+            for provider in by_provider
+        }
+        
+        async def process_batch(provider: str, jobs: List[Dict[str, Any]]) -> List[Tuple[str, Optional[Dict]]]:
+            logger.info(f"Processing cost retrieval for {len(jobs)} {provider} jobs")
+            async with semaphores[provider]:
+                costs = await batch_lookups[provider](jobs)
+            return [(job['job_id'], costs.get(job['job_id'])) for job in jobs]
+        
+        async def process_job(provider: str, job: Dict[str, Any]) -> List[Tuple[str, Optional[Dict]]]:
             job_id = job['job_id']
-            logger.info(f"Processing cost retrieval for job {job_id}")
-            
-            success = self.retrieve_job_cost(job_id)
+            async with semaphores[provider]:
+                logger.info(f"Processing cost retrieval for job {job_id}")
+                try:
+                    return [(job_id, await self._job_cost_data_async(job))]
+                except Exception as e:
+                    logger.error(f"Error retrieving cost for job {job_id}: {e}")
+                    return [(job_id, None)]
+        
+        tasks = []
+        for provider, jobs in by_provider.items():
+            if provider in batch_lookups:
+                tasks.append(process_batch(provider, jobs))
+            else:
+                tasks.extend(process_job(provider, job) for job in jobs)
+        
+        batches = await asyncio.gather(*tasks)
+        outcomes = self._store_job_costs(dict(cost for batch in batches for cost in batch))
+        
+        for job in eligible_jobs:
+            job_id = job['job_id']
+            success = outcomes[job_id]
             results['processed'] += 1
             
             if success:
@@ -437,9 +1248,6 @@ class CloudCostTracker:
             else:
                 results['failed'] += 1
                 results['jobs'].append({'job_id': job_id, 'status': 'failed'})
-            
-            # Add delay to respect rate limits
-            time.sleep(1)
         
         logger.info(f"Batch cost retrieval completed: {results['successful']}/{results['processed']} successful")
         return results
@@ -454,6 +1262,7 @@ def main():
     parser.add_argument("--batch", action="store_true", help="Process multiple jobs")
     parser.add_argument("--max-jobs", type=int, default=10, help="Maximum jobs to process in batch")
     parser.add_argument("--days-back", type=int, default=7, help="How many days back to look for jobs")
+    parser.add_argument("--concurrency", type=int, default=4, help="Cost queries in flight at once in batch mode")
     parser.add_argument("--force-refresh", action="store_true", help="Force refresh existing cost data")
     parser.add_argument("--config", default="config.json", help="Configuration file")
     
@@ -472,7 +1281,7 @@ def main():
     
     elif args.batch:
         # Process multiple jobs
-        results = tracker.batch_retrieve_costs(args.max_jobs, args.days_back)
+        results = tracker.batch_retrieve_costs(args.max_jobs, args.days_back, args.concurrency)
         logger.info(f"Batch processing results: {results}")
     
     else:
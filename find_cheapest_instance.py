@@ -13,6 +13,8 @@ import time
 from functools import wraps
 from typing import List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.oauth2 import service_account
 import os
 
@@ -26,6 +28,23 @@ DEFAULT_MAX_VCPU = 32
 DEFAULT_MIN_RAM_GB = 64
 DEFAULT_MAX_RAM_GB = 256
 
+# Most VM sizes named in one Azure Retail Prices filter, keeping the URL short
+AZURE_PRICE_SKUS_PER_QUERY = 20
+
+AZURE_PRICES_API = "https://prices.azure.com/api/retail/prices"
+
+# (connect, read) timeouts in seconds for Retail Prices requests
+AZURE_PRICES_TIMEOUT = (3, 10)
+
+# One pooled session for every Retail Prices request, so parallel region
+# queries reuse their connections; throttling and server errors are retried
+_AZURE_SESSION = requests.Session()
+_AZURE_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
 # Rate limiting decorator
 def rate_limit(calls_per_second=5, burst_limit=10):
     """Rate limiting decorator with exponential backoff."""
@@ -233,10 +252,9 @@ def get_azure_instance_types_fallback(min_vcpu: int = 1, max_vcpu: int = 128,
                                      min_ram_gb: int = 1, max_ram_gb: int = 1024) -> Dict[str, tuple]:
     """Fallback method using retail prices API (less reliable but no auth required)."""
     try:
-        retail_api = "https://prices.azure.com/api/retail/prices"
-        query = "$filter=serviceName eq 'Virtual Machines' and priceType eq 'Consumption'"
+        params = {'$filter': "serviceName eq 'Virtual Machines' and priceType eq 'Consumption'"}
         
-        response = requests.get(f"{retail_api}?{query}", timeout=30)
+        response = _AZURE_SESSION.get(AZURE_PRICES_API, params=params, timeout=30)
         if response.status_code != 200:
             raise Exception(f"Failed to query Azure API: {response.status_code}")
         
@@ -448,9 +466,6 @@ def get_azure_spot_prices(hw_config: Dict[str, int]) -> List[Dict[str, Any]]:
         return instances
     
     try:
-        # Azure Retail Prices API
-        api_url = "https://prices.azure.com/api/retail/prices"
-        
         # Azure regions
         regions = [
             'eastus', 'eastus2', 'westus', 'westus2', 'centralus',
@@ -458,36 +473,20 @@ def get_azure_spot_prices(hw_config: Dict[str, int]) -> List[Dict[str, Any]]:
             'eastasia', 'southeastasia', 'japaneast', 'japanwest'
         ]
         
-        for region in regions:
-            # Query for each instance type
-            for instance_name, (vcpu, ram_gb) in azure_instance_specs.items():
-                query = (
-                    f"$filter=serviceName eq 'Virtual Machines' "
-                    f"and priceType eq 'Spot' "
-                    f"and armRegionName eq '{region}' "
-                    f"and armSkuName eq '{instance_name}'"
-                )
-                
+        # Query each region in parallel
+        with ThreadPoolExecutor(max_workers=len(regions)) as executor:
+            future_to_region = {}
+            
+            for region in regions:
+                future = executor.submit(query_azure_region_spot_prices, region, azure_instance_specs)
+                future_to_region[future] = region
+            
+            for future in as_completed(future_to_region):
+                region = future_to_region[future]
                 try:
-                    response = requests.get(f"{api_url}?{query}")
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        for item in data.get('Items', []):
-                            # Only Linux prices
-                            if 'Windows' not in item.get('productName', ''):
-                                instances.append({
-                                    'provider': 'Azure',
-                                    'instance': instance_name,
-                                    'region': region,
-                                    'price_hr': item['retailPrice'],
-                                    'vcpu': vcpu,
-                                    'ram_gb': ram_gb
-                                })
-                                break  # Only need one price per instance/region
-                
+                    instances.extend(future.result())
                 except Exception as e:
-                    logger.debug(f"Failed to query Azure price for {instance_name} in {region}: {e}")
+                    logger.debug(f"Failed to query Azure prices in {region}: {e}")
     
     except Exception as e:
         logger.error(f"Failed to query Azure prices: {e}")
@@ -495,6 +494,57 @@ def get_azure_spot_prices(hw_config: Dict[str, int]) -> List[Dict[str, Any]]:
     return instances
 
 
+def query_azure_region_spot_prices(region: str, azure_instance_specs: Dict[str, tuple]) -> List[Dict[str, Any]]:
+    """Query Linux spot prices for the given Azure VM sizes in one region."""
+    instance_names = list(azure_instance_specs.keys())
+    instances = []
+    
+    # Several VM sizes per request, OR-ed together in one filter
+    for i in range(0, len(instance_names), AZURE_PRICE_SKUS_PER_QUERY):
+        batch_names = instance_names[i:i + AZURE_PRICE_SKUS_PER_QUERY]
+        sku_filter = ' or '.join(f"armSkuName eq '{name}'" for name in batch_names)
+        params = {'$filter': (
+            f"serviceName eq 'Virtual Machines' "
+            f"and priceType eq 'Spot' "
+            f"and armRegionName eq '{region}' "
+            f"and ({sku_filter})"
+        )}
+        
+        seen_names = set()
+        next_url = AZURE_PRICES_API
+        while next_url:
+            response = _AZURE_SESSION.get(next_url, params=params, timeout=AZURE_PRICES_TIMEOUT)
+            params = None  # NextPageLink already carries the filter
+            if response.status_code != 200:
+                break
+            data = response.json()
+            
+            for item in data.get('Items', []):
+                instance_name = item.get('armSkuName')
+                
+                # Only Linux prices, and only one price per instance/region
+                if instance_name not in azure_instance_specs or instance_name in seen_names:
+                    continue
+                if 'Windows' in item.get('productName', ''):
+                    continue
+                seen_names.add(instance_name)
+                
+                vcpu, ram_gb = azure_instance_specs[instance_name]
+                instances.append({
+                    'provider': 'Azure',
+                    'instance': instance_name,
+                    'region': region,
+                    'price_hr': item['retailPrice'],
+                    'vcpu': vcpu,
+                    'ram_gb': ram_gb
+                })
+            
+            # Later pages are only needed while some VM size still has no price
+            next_url = data.get('NextPageLink') if len(seen_names) < len(batch_names) else None
+    
+    return instances
+
+
 def load_hardware_config(config_file: str) -> Dict[str, int]:
     """Load hardware requirements from config file."""
     config = {
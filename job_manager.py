@@ -7,14 +7,55 @@ import json
 import os
 import sqlite3
 import logging
+import time
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Statuses after which a job no longer accrues cost
+TERMINAL_STATUSES = ('completed', 'failed', 'terminated')
+
+# Statuses in which a job's instance is expected to be up
+ACTIVE_STATUSES = ('launched', 'running')
+
+# raw_data payloads at least this long are stored zstd-compressed when zstandard
+# is installed; below it the frame overhead outweighs the saving
+RAW_DATA_COMPRESS_MIN_BYTES = 256
+
+if ZSTD_AVAILABLE:
+    _ZSTD_COMPRESSOR = zstandard.ZstdCompressor(level=3)
+    _ZSTD_DECOMPRESSOR = zstandard.ZstdDecompressor()
+
+
+def _encode_raw_data(raw_data: Any) -> Tuple[Optional[str], Optional[bytes]]:
+    """Serialize a breakdown item's raw_data as (text, None), or (None, zstd blob) when worth compressing."""
+    payload = json.dumps(raw_data)
+    if ZSTD_AVAILABLE and len(payload) >= RAW_DATA_COMPRESS_MIN_BYTES:
+        return None, _ZSTD_COMPRESSOR.compress(payload.encode())
+    return payload, None
+
+
+def _decode_cost_row(row: sqlite3.Row) -> Dict[str, Any]:
+    """Return a cost_tracking row as a dict, with compressed raw_data restored to its JSON text."""
+    item = dict(row)
+    blob = item.pop('raw_data_zstd', None)
+    if blob is not None:
+        if ZSTD_AVAILABLE:
+            item['raw_data'] = _ZSTD_DECOMPRESSOR.decompress(blob).decode()
+        else:
+            logger.warning(f"zstandard not installed; cannot read compressed raw_data of cost record {item.get('id')}")
+    return item
+
 
 class JobManager:
     """Manages job state and provides job control operations."""
@@ -72,6 +113,19 @@ class JobManager:
                 )
             ''')
             
+            # Billing API results per resource and day, so finalized days are fetched once
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_cache (
+                    provider TEXT NOT NULL,
+                    resource_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    cost REAL NOT NULL,
+                    raw TEXT,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (provider, resource_id, day)
+                )
+            ''')
+            
             conn.execute('''
                 CREATE INDEX IF NOT EXISTS idx_status ON jobs(status)
             ''')
@@ -80,6 +134,41 @@ class JobManager:
                 CREATE INDEX IF NOT EXISTS idx_created_at ON jobs(created_at)
             ''')
             
+            columns = {row[1] for row in conn.execute('PRAGMA table_xinfo(jobs)')}
+            
+            # Runtime cost frozen when a job reaches a terminal status
+            if 'final_cost' not in columns:
+                conn.execute('ALTER TABLE jobs ADD COLUMN final_cost REAL')
+            
+            # Best-known cost per job, derived once so report scans read it from the index
+            if 'effective_cost' not in columns:
+                conn.execute('''
+                    ALTER TABLE jobs ADD COLUMN effective_cost REAL
+                    GENERATED ALWAYS AS (COALESCE(actual_cost, estimated_cost, 0)) VIRTUAL
+                ''')
+            
+            # zstd-compressed raw_data, used in place of the text column for large payloads
+            cost_columns = {row[1] for row in conn.execute('PRAGMA table_info(cost_tracking)')}
+            if 'raw_data_zstd' not in cost_columns:
+                conn.execute('ALTER TABLE cost_tracking ADD COLUMN raw_data_zstd BLOB')
+            
+            # Report queries range-scan created_at, group by provider and sum effective_cost
+            conn.execute('DROP INDEX IF EXISTS idx_jobs_created_provider')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_jobs_created_eff ON jobs(created_at, provider, effective_cost)
+            ''')
+
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_jobs_budget ON jobs(budget_limit)
+                WHERE budget_limit IS NOT NULL
+            ''')
+
+            # Cost retrieval looks for recent finished jobs that have no actual cost yet
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_jobs_cost_pending ON jobs(created_at)
+                WHERE actual_cost IS NULL
+            ''')
+
             conn.execute('''
                 CREATE INDEX IF NOT EXISTS idx_cost_tracking_job_id ON cost_tracking(job_id)
             ''')
@@ -95,37 +184,7 @@ class JobManager:
             now = datetime.now().isoformat()
             
             with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
-                    INSERT INTO jobs (
-                        job_id, status, provider, instance_type, instance_id,
-                        region, public_ip, private_ip, s3_bucket, s3_input_path,
-                        gdrive_path, basis_set, created_at, updated_at,
-                        price_per_hour, budget_limit, spot_request_id, billing_tags, metadata
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    job_id,
-                    launch_result.get('status', 'unknown'),
-                    launch_result.get('provider', ''),
-                    launch_result.get('instance_type', ''),
-                    launch_result.get('instance_id', ''),
-                    launch_result.get('region', ''),
-                    launch_result.get('public_ip', ''),
-                    launch_result.get('private_ip', ''),
-                    job_config.get('s3_bucket', ''),
-                    job_config.get('s3_input_path', ''),
-                    job_config.get('gdrive_path', ''),
-                    job_config.get('basis_set', ''),
-                    now,
-                    now,
-                    job_config.get('price_per_hour', 0.0),
-                    job_config.get('budget_limit'),
-                    launch_result.get('spot_request_id', ''),
-                    json.dumps(job_config.get('billing_tags', {})),
-                    json.dumps({
-                        'launch_result': launch_result,
-                        'job_config': job_config
-                    })
-                ))
+                self._insert_job(conn, job_id, job_config, launch_result, now)
             
             logger.info(f"Created job record: {job_id}")
             return True
@@ -134,6 +193,94 @@ class JobManager:
             logger.error(f"Failed to create job {job_id}: {e}")
             return False
     
+    @staticmethod
+    def _insert_job(conn: sqlite3.Connection, job_id: str, job_config: Dict[str, Any],
+                    launch_result: Dict[str, Any], now: str, upsert: bool = False):
+        """Insert a job row; with upsert, an existing row takes the new status and addresses."""
+        sql = '''
+            INSERT INTO jobs (
+                job_id, status, provider, instance_type, instance_id,
+                region, public_ip, private_ip, s3_bucket, s3_input_path,
+                gdrive_path, basis_set, created_at, updated_at,
+                price_per_hour, budget_limit, spot_request_id, billing_tags, metadata
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        if upsert:
+            sql += '''
+            ON CONFLICT(job_id) DO UPDATE SET
+                status = excluded.status, updated_at = excluded.updated_at,
+                instance_id = COALESCE(NULLIF(excluded.instance_id, ''), jobs.instance_id),
+                public_ip = COALESCE(NULLIF(excluded.public_ip, ''), jobs.public_ip),
+                private_ip = COALESCE(NULLIF(excluded.private_ip, ''), jobs.private_ip),
+                metadata = excluded.metadata
+            '''
+        
+        conn.execute(sql, (
+            job_id,
+            launch_result.get('status', 'unknown'),
+            launch_result.get('provider', ''),
+            launch_result.get('instance_type', ''),
+            launch_result.get('instance_id', ''),
+            launch_result.get('region', ''),
+            launch_result.get('public_ip', ''),
+            launch_result.get('private_ip', ''),
+            job_config.get('s3_bucket', ''),
+            job_config.get('s3_input_path', ''),
+            job_config.get('gdrive_path', ''),
+            job_config.get('basis_set', ''),
+            now,
+            now,
+            job_config.get('price_per_hour', 0.0),
+            job_config.get('budget_limit'),
+            launch_result.get('spot_request_id', ''),
+            json.dumps(job_config.get('billing_tags', {})),
+            json.dumps({
+                'launch_result': launch_result,
+                'job_config': job_config
+            })
+        ))
+    
+    @staticmethod
+    def _stamp_status_times(conn: sqlite3.Connection, job_id: str, status: str, now: str):
+        """Set started_at, or completed_at and final_cost, for the given status."""
+        if status == 'running':
+            conn.execute('''
+                UPDATE jobs SET started_at = ? WHERE job_id = ?
+            ''', (now, job_id))
+        elif status in TERMINAL_STATUSES:
+            conn.execute('''
+                UPDATE jobs SET completed_at = ?,
+                    final_cost = COALESCE(price_per_hour, 0) * 24 *
+                        (julianday(?) - julianday(COALESCE(started_at, created_at)))
+                WHERE job_id = ?
+            ''', (now, now, job_id))
+    
+    def record_job_lifecycle(self, job_id: str, job_config: Dict[str, Any],
+                             launch_result: Dict[str, Any], final_status: str,
+                             final_data: Optional[Dict[str, Any]] = None) -> bool:
+        """Record a submitted job and the outcome of its launch in one transaction.
+        
+        Equivalent to create_job followed by update_job_status, but with a
+        single commit. final_data may carry instance_id, public_ip and private_ip.
+        """
+        try:
+            now = datetime.now().isoformat()
+            outcome = dict(launch_result, status=final_status)
+            for key, value in (final_data or {}).items():
+                if key in ['public_ip', 'private_ip', 'instance_id']:
+                    outcome[key] = value
+            
+            with sqlite3.connect(self.db_path) as conn:
+                self._insert_job(conn, job_id, job_config, outcome, now, upsert=True)
+                self._stamp_status_times(conn, job_id, final_status, now)
+            
+            logger.info(f"Recorded job {job_id} with status {final_status}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to record job {job_id}: {e}")
+            return False
+    
     def update_job_status(self, job_id: str, status: str, 
                          additional_data: Optional[Dict[str, Any]] = None) -> bool:
         """Update job status and optional additional data."""
@@ -147,14 +294,7 @@ class JobManager:
                 ''', (status, now, job_id))
                 
                 # Update specific status timestamps
-                if status == 'running':
-                    conn.execute('''
-                        UPDATE jobs SET started_at = ? WHERE job_id = ?
-                    ''', (now, job_id))
-                elif status in ['completed', 'failed', 'terminated']:
-                    conn.execute('''
-                        UPDATE jobs SET completed_at = ? WHERE job_id = ?
-                    ''', (now, job_id))
+                self._stamp_status_times(conn, job_id, status, now)
                 
                 # Update additional data if provided
                 if additional_data:
@@ -195,17 +335,30 @@ class JobManager:
             return None
     
     def list_jobs(self, status: Optional[str] = None, 
-                  limit: int = 50) -> List[Dict[str, Any]]:
-        """List jobs, optionally filtered by status."""
+                  limit: int = 50, include_cost: bool = False,
+                  statuses: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """List jobs, optionally filtered by status.
+        
+        `status` and `statuses` both filter in SQL; a job matches if its status
+        is any of those given. With include_cost, each job also carries its
+        runtime `current_cost`, priced from the row already fetched rather
+        than a query per job.
+        """
         try:
+            now = datetime.now().isoformat()
+            wanted = list(statuses or ())
+            if status:
+                wanted.append(status)
+            
             with sqlite3.connect(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 
-                if status:
-                    cursor = conn.execute('''
-                        SELECT * FROM jobs WHERE status = ? 
+                if wanted:
+                    placeholders = ','.join('?' * len(wanted))
+                    cursor = conn.execute(f'''
+                        SELECT * FROM jobs WHERE status IN ({placeholders})
                         ORDER BY created_at DESC LIMIT ?
-                    ''', (status, limit))
+                    ''', (*wanted, limit))
                 else:
                     cursor = conn.execute('''
                         SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?
@@ -214,6 +367,8 @@ class JobManager:
                 jobs = []
                 for row in cursor.fetchall():
                     job = dict(row)
+                    if include_cost:
+                        job['current_cost'] = self._runtime_cost(job, now)
                     # Parse metadata JSON for summary
                     if job['metadata']:
                         try:
@@ -228,22 +383,129 @@ class JobManager:
             logger.error(f"Failed to list jobs: {e}")
             return []
     
-    def calculate_job_cost(self, job_id: str) -> float:
-        """Calculate current cost of a running job."""
-        job = self.get_job(job_id)
-        if not job or not job['price_per_hour']:
-            return 0.0
+    def list_jobs_eligible_for_cost(self, cutoff_iso: str, limit: int) -> List[Dict[str, Any]]:
+        """List finished jobs created since cutoff_iso that have no actual cost yet, newest first."""
+        try:
+            placeholders = ','.join('?' * len(TERMINAL_STATUSES))
+            
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.execute(f'''
+                    SELECT * FROM jobs
+                    WHERE actual_cost IS NULL AND created_at >= ? AND status IN ({placeholders})
+                    ORDER BY created_at DESC LIMIT ?
+                ''', (cutoff_iso, *TERMINAL_STATUSES, limit))
+                
+                # Rows are turned into dicts as SQLite steps through them
+                jobs = []
+                for row in cursor:
+                    job = dict(row)
+                    if job['metadata']:
+                        try:
+                            job['metadata'] = json.loads(job['metadata'])
+                        except:
+                            job['metadata'] = {}
+                    jobs.append(job)
+                
+                return jobs
+                
+        except Exception as e:
+            logger.error(f"Failed to list jobs pending cost retrieval: {e}")
+            return []
+    
+    @staticmethod
+    def _runtime_cost(job, now: str) -> float:
+        """Price a job row by its runtime, using `now` as the end of unfinished jobs.
         
-        start_time = job.get('started_at') or job['created_at']
-        end_time = job.get('completed_at') or datetime.now().isoformat()
+        Terminal jobs return the final_cost stored when they finished.
+        """
+        if job['status'] in TERMINAL_STATUSES and job['final_cost'] is not None:
+            return job['final_cost']
         
+        if not job['price_per_hour']:
+            return 0.0
+
+        start_time = job['started_at'] or job['created_at']
+        end_time = job['completed_at'] or now
+
         try:
             start = datetime.fromisoformat(start_time)
             end = datetime.fromisoformat(end_time)
             hours = (end - start).total_seconds() / 3600
             return hours * job['price_per_hour']
-        except:
+        except (TypeError, ValueError):
             return 0.0
+
+    def calculate_job_cost(self, job_id: str, job: Optional[Dict[str, Any]] = None) -> float:
+        """Calculate current cost of a running job.
+        
+        Pass the job if it has already been fetched to skip reading it again.
+        """
+        if job is None:
+            job = self.get_job(job_id)
+        if not job:
+            return 0.0
+
+        return self._runtime_cost(job, datetime.now().isoformat())
+
+    def calculate_job_costs(self, job_ids: List[str]) -> Dict[str, float]:
+        """Calculate current costs for several jobs with one query per chunk of IDs."""
+        costs = {}
+        if not job_ids:
+            return costs
+
+        now = datetime.now().isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                # Stay well under SQLite's bound-parameter limit
+                for i in range(0, len(job_ids), 500):
+                    chunk = job_ids[i:i + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor = conn.execute(f'''
+                        SELECT job_id, status, price_per_hour, final_cost,
+                               created_at, started_at, completed_at
+                        FROM jobs WHERE job_id IN ({placeholders})
+                    ''', chunk)
+                    for row in cursor:
+                        costs[row['job_id']] = self._runtime_cost(row, now)
+
+        except Exception as e:
+            logger.error(f"Failed to calculate job costs: {e}")
+
+        return costs
+
+    def iter_old_jobs(self, cutoff_iso: str,
+                      statuses: Iterable[str] = TERMINAL_STATUSES,
+                      batch_size: int = 200) -> Iterator[Dict[str, Any]]:
+        """Yield jobs created before cutoff_iso in the given statuses, newest first.
+        
+        Rows are fetched a page at a time using (created_at, job_id) as the
+        keyset, so memory stays bounded by batch_size.
+        """
+        statuses = tuple(statuses)
+        placeholders = ','.join('?' * len(statuses))
+        query = f'''
+            SELECT job_id, status, provider, created_at FROM jobs
+            WHERE created_at < ? AND status IN ({placeholders})
+            AND (created_at, job_id) < (?, ?)
+            ORDER BY created_at DESC, job_id DESC LIMIT ?
+        '''
+        last_created, last_id = cutoff_iso, ''
+        
+        while True:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                rows = conn.execute(
+                    query, (cutoff_iso, *statuses, last_created, last_id, batch_size)
+                ).fetchall()
+            
+            for row in rows:
+                yield dict(row)
+            
+            if len(rows) < batch_size:
+                return
+            last_created, last_id = rows[-1]['created_at'], rows[-1]['job_id']
     
     def cleanup_completed_jobs(self, days_old: int = 30) -> int:
         """Remove job records older than specified days."""
@@ -253,11 +515,12 @@ class JobManager:
             cutoff_str = cutoff_date.isoformat()
             
             with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute('''
+                placeholders = ','.join('?' * len(TERMINAL_STATUSES))
+                cursor = conn.execute(f'''
                     DELETE FROM jobs 
-                    WHERE status IN ('completed', 'failed', 'terminated') 
+                    WHERE status IN ({placeholders}) 
                     AND created_at < ?
-                ''', (cutoff_str,))
+                ''', (*TERMINAL_STATUSES, cutoff_str))
                 
                 deleted_count = cursor.rowcount
                 logger.info(f"Cleaned up {deleted_count} old job records")
@@ -270,34 +533,8 @@ class JobManager:
     def update_actual_cost(self, job_id: str, actual_cost: float, cost_breakdown: List[Dict[str, Any]] = None) -> bool:
         """Update the actual cost of a completed job."""
         try:
-            now = datetime.now().isoformat()
-            
             with sqlite3.connect(self.db_path) as conn:
-                # Update main job record
-                conn.execute('''
-                    UPDATE jobs SET actual_cost = ?, cost_retrieved_at = ?, updated_at = ?
-                    WHERE job_id = ?
-                ''', (actual_cost, now, now, job_id))
-                
-                # Insert detailed cost breakdown if provided
-                if cost_breakdown:
-                    for cost_item in cost_breakdown:
-                        conn.execute('''
-                            INSERT INTO cost_tracking (
-                                job_id, provider, cost_type, amount, currency,
-                                billing_period_start, billing_period_end, retrieved_at, raw_data
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            job_id,
-                            cost_item.get('provider', ''),
-                            cost_item.get('cost_type', 'compute'),
-                            cost_item.get('amount', 0.0),
-                            cost_item.get('currency', 'USD'),
-                            cost_item.get('billing_period_start', ''),
-                            cost_item.get('billing_period_end', ''),
-                            now,
-                            json.dumps(cost_item.get('raw_data', {}))
-                        ))
+                self._write_actual_costs(conn, [(job_id, actual_cost, cost_breakdown)])
             
             logger.info(f"Updated actual cost for job {job_id}: ${actual_cost:.4f}")
             return True
@@ -306,6 +543,96 @@ class JobManager:
             logger.error(f"Failed to update actual cost for job {job_id}: {e}")
             return False
     
+    def update_actual_costs_bulk(self, costs: List[Tuple[str, float, Optional[List[Dict[str, Any]]]]]) -> bool:
+        """Update the actual costs of several jobs in one transaction.
+        
+        Takes (job_id, actual_cost, cost_breakdown) tuples; either every job
+        is updated or, on error, none is.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                self._write_actual_costs(conn, costs)
+            
+            logger.info(f"Updated actual costs for {len(costs)} jobs")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to update actual costs for {len(costs)} jobs: {e}")
+            return False
+    
+    @staticmethod
+    def _write_actual_costs(conn: sqlite3.Connection,
+                            costs: List[Tuple[str, float, Optional[List[Dict[str, Any]]]]]):
+        """Record actual costs and their breakdown rows; the caller's connection commits."""
+        now = datetime.now().isoformat()
+        
+        # Update main job records
+        conn.executemany('''
+            UPDATE jobs SET actual_cost = ?, cost_retrieved_at = ?, updated_at = ?
+            WHERE job_id = ?
+        ''', [(actual_cost, now, now, job_id) for job_id, actual_cost, _ in costs])
+        
+        # Insert detailed cost breakdowns where provided
+        conn.executemany('''
+            INSERT INTO cost_tracking (
+                job_id, provider, cost_type, amount, currency,
+                billing_period_start, billing_period_end, retrieved_at, raw_data, raw_data_zstd
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (
+                job_id,
+                cost_item.get('provider', ''),
+                cost_item.get('cost_type', 'compute'),
+                cost_item.get('amount', 0.0),
+                cost_item.get('currency', 'USD'),
+                cost_item.get('billing_period_start', ''),
+                cost_item.get('billing_period_end', ''),
+                now,
+                *(_encode_raw_data(cost_item['raw_data']) if 'raw_data' in cost_item else (None, None))
+            )
+            for job_id, _, cost_breakdown in costs
+            for cost_item in cost_breakdown or ()
+        ])
+    
+    def get_cached_costs(self, provider: str, resource_id: str,
+                         first_day: str, last_day: str) -> Dict[str, Dict[str, Any]]:
+        """Return cached billing results for a resource between two days inclusive, keyed by day."""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute('''
+                    SELECT day, cost, raw, fetched_at FROM cost_cache
+                    WHERE provider = ? AND resource_id = ? AND day BETWEEN ? AND ?
+                ''', (provider, resource_id, first_day, last_day)).fetchall()
+            
+            return {
+                day: {'cost': cost, 'entries': json.loads(raw) if raw else [], 'fetched_at': fetched_at}
+                for day, cost, raw, fetched_at in rows
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to read cost cache for {provider} {resource_id}: {e}")
+            return {}
+    
+    def cache_costs(self, provider: str, resource_id: str, days: Dict[str, List[Dict[str, Any]]]) -> bool:
+        """Cache billing entries for a resource, keyed by day; a day with no entries cost nothing."""
+        try:
+            now = time.time()
+            
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO cost_cache (provider, resource_id, day, cost, raw, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [
+                    (provider, resource_id, day, sum(entry.get('amount', 0.0) for entry in entries),
+                     json.dumps(entries), now)
+                    for day, entries in days.items()
+                ])
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to write cost cache for {provider} {resource_id}: {e}")
+            return False
+    
     def check_budget_limit(self, job_id: str, estimated_cost: float) -> Dict[str, Any]:
         """Check if estimated cost exceeds budget limit."""
         job = self.get_job(job_id)
@@ -345,7 +672,7 @@ class JobManager:
                     SELECT * FROM cost_tracking WHERE job_id = ? 
                     ORDER BY billing_period_start DESC
                 ''', (job_id,))
-                cost_breakdown = [dict(row) for row in cost_cursor.fetchall()]
+                cost_breakdown = [_decode_cost_row(row) for row in cost_cursor.fetchall()]
                 
                 # Calculate runtime cost if job is running
                 current_runtime_cost = self.calculate_job_cost(job_id)
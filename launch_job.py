@@ -22,9 +22,8 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
-def read_bootstrap_script() -> str:
+def read_bootstrap_script(bootstrap_path: str = "bootstrap.sh") -> str:
     """Read the bootstrap script from file."""
-    bootstrap_path = "bootstrap.sh"
     if not os.path.exists(bootstrap_path):
         logger.error(f"Bootstrap script not found: {bootstrap_path}")
         sys.exit(1)
@@ -33,10 +32,11 @@ def read_bootstrap_script() -> str:
         return f.read()
 
 
-def launch_aws_spot(instance_type: str, region: str, config: Dict[str, Any]) -> Dict[str, Any]:
+def launch_aws_spot(instance_type: str, region: str, config: Dict[str, Any],
+                    bootstrap_path: str = "bootstrap.sh") -> Dict[str, Any]:
     """Launch an AWS spot instance with the bootstrap script."""
     try:
-        bootstrap_script = read_bootstrap_script()
+        bootstrap_script = read_bootstrap_script(bootstrap_path)
         ec2 = boto3.client("ec2", region_name=region)
         
         # Get the latest Amazon Linux 2 AMI
@@ -148,10 +148,11 @@ def launch_aws_spot(instance_type: str, region: str, config: Dict[str, Any]) ->
         return {'status': 'failed', 'error': str(e)}
 
 
-def launch_gcp_spot(instance_type: str, region: str, config: Dict[str, Any]) -> Dict[str, Any]:
+def launch_gcp_spot(instance_type: str, region: str, config: Dict[str, Any],
+                    bootstrap_path: str = "bootstrap.sh") -> Dict[str, Any]:
     """Launch a GCP spot instance with the bootstrap script."""
     try:
-        bootstrap_script = read_bootstrap_script()
+        bootstrap_script = read_bootstrap_script(bootstrap_path)
         
         # Initialize the Compute Engine client
         compute_client = compute_v1.InstancesClient()
@@ -251,10 +252,11 @@ def launch_gcp_spot(instance_type: str, region: str, config: Dict[str, Any]) ->
         return {'status': 'failed', 'error': str(e)}
 
 
-def launch_azure_spot(instance_type: str, region: str, config: Dict[str, Any]) -> Dict[str, Any]:
+def launch_azure_spot(instance_type: str, region: str, config: Dict[str, Any],
+                      bootstrap_path: str = "bootstrap.sh") -> Dict[str, Any]:
     """Launch an Azure spot instance with the bootstrap script."""
     try:
-        bootstrap_script = read_bootstrap_script()
+        bootstrap_script = read_bootstrap_script(bootstrap_path)
         
         # Azure credentials
         credential = DefaultAzureCredential()
@@ -417,6 +419,11 @@ def main():
                        help="Load instance details from spot_prices.json result")
     parser.add_argument("--index", type=int, default=0,
                        help="Index of instance to launch from spot_prices.json (default: 0)")
+    parser.add_argument("--bootstrap", default="bootstrap.sh",
+                       help="Bootstrap script to run on the instance (default: bootstrap.sh)")
+    parser.add_argument("--emit-json-stdout", action="store_true",
+                       help="Print the launch result to stdout as a 'RESULT: <json>' line "
+                            "instead of writing launch_result.json")
     
     args = parser.parse_args()
     
@@ -440,19 +447,24 @@ def main():
     
     # Launch instance based on provider
     if args.provider == 'AWS':
-        result = launch_aws_spot(args.instance, args.region, provider_config)
+        result = launch_aws_spot(args.instance, args.region, provider_config, args.bootstrap)
     elif args.provider == 'GCP':
-        result = launch_gcp_spot(args.instance, args.region, provider_config)
+        result = launch_gcp_spot(args.instance, args.region, provider_config, args.bootstrap)
     elif args.provider == 'Azure':
-        result = launch_azure_spot(args.instance, args.region, provider_config)
+        result = launch_azure_spot(args.instance, args.region, provider_config, args.bootstrap)
     
-    # Save result
-    with open('launch_result.json', 'w') as f:
-        json.dump(result, f, indent=2)
+    # Save result (logging goes to stderr, so stdout carries only the result line)
+    if args.emit_json_stdout:
+        sys.stdout.write(f"RESULT: {json.dumps(result)}\n")
+        sys.stdout.flush()
+    else:
+        with open('launch_result.json', 'w') as f:
+            json.dump(result, f, indent=2)
     
     if result.get('status') == 'launched':
         logger.info("Instance launched successfully!")
-        logger.info(f"Results saved to launch_result.json")
+        if not args.emit_json_stdout:
+            logger.info(f"Results saved to launch_result.json")
     else:
         logger.error("Failed to launch instance")
         sys.exit(1)
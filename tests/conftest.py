@@ -7,6 +7,15 @@ from unittest.mock import patch, MagicMock
 from pathlib import Path
 
 
+@pytest.fixture(autouse=True)
+def reset_s3_client_cache():
+    """Drop the cached S3 client so patched boto3 clients don't leak between tests."""
+    import cloud_run
+    cloud_run._get_s3_client.cache_clear()
+    yield
+    cloud_run._get_s3_client.cache_clear()
+
+
 @pytest.fixture
 def temp_dir():
     """Create a temporary directory for test files."""
@@ -112,6 +112,126 @@ rclone sync "$OUTPUT_DIR" "${GDRIVE_REMOTE}:${GDRIVE_DEST_DIR}"
         assert 'GDRIVE_DEST_DIR' not in custom_bootstrap  # Should be replaced
 
 
+    @patch('boto3.client')
+    def test_upload_prunes_excluded_directories(self, mock_boto_client, job_input_dir):
+        """Test excluded directories are skipped and nested keys keep their paths."""
+        mock_s3 = MagicMock()
+        mock_boto_client.return_value = mock_s3
+        
+        os.makedirs(os.path.join(job_input_dir, '__pycache__'))
+        with open(os.path.join(job_input_dir, '__pycache__', 'module.cpython-311.opt'), 'w') as f:
+            f.write('cached')
+        os.makedirs(os.path.join(job_input_dir, 'data', 'nested'))
+        with open(os.path.join(job_input_dir, 'data', 'nested', 'basis.txt'), 'w') as f:
+            f.write('basis')
+        with open(os.path.join(job_input_dir, 'data', 'run.log'), 'w') as f:
+            f.write('log')
+        
+        manager = CloudJobManager('test-bucket')
+        manager.upload_job_files(job_input_dir)
+        
+        uploaded_keys = {call[0][2] for call in mock_s3.upload_file.call_args_list}
+        prefix = f'{manager.job_id}/input/'
+        assert f'{prefix}data/nested/basis.txt' in uploaded_keys
+        assert f'{prefix}input.inp' in uploaded_keys
+        assert not any('__pycache__' in key for key in uploaded_keys)
+        assert not any(key.endswith('.log') for key in uploaded_keys)
+    
+    @patch('boto3.client')
+    def test_upload_excludes_relative_path_patterns(self, mock_boto_client, job_input_dir):
+        """Test exclude patterns containing a directory match against the relative path."""
+        mock_s3 = MagicMock()
+        mock_boto_client.return_value = mock_s3
+        
+        os.makedirs(os.path.join(job_input_dir, 'scratch'))
+        with open(os.path.join(job_input_dir, 'scratch', 'tmp.dat'), 'w') as f:
+            f.write('scratch')
+        
+        manager = CloudJobManager('test-bucket')
+        manager.upload_job_files(job_input_dir, exclude_patterns=['scratch/*'])
+        
+        uploaded_keys = {call[0][2] for call in mock_s3.upload_file.call_args_list}
+        assert f'{manager.job_id}/input/input.inp' in uploaded_keys
+        assert not any('scratch' in key for key in uploaded_keys)
+
+
+    @patch('boto3.client')
+    def test_large_files_use_multipart_transfer(self, mock_boto_client, job_input_dir):
+        """Test only files over the multipart threshold get the concurrent part config."""
+        import cloud_run
+        mock_s3 = MagicMock()
+        mock_boto_client.return_value = mock_s3
+        
+        with open(os.path.join(job_input_dir, 'big.bin'), 'wb') as f:
+            f.truncate(cloud_run.MULTIPART_THRESHOLD)
+        
+        manager = CloudJobManager('test-bucket')
+        manager.upload_job_files(job_input_dir)
+        
+        configs = {call[0][2].rsplit('/', 1)[-1]: call[1]['Config']
+                   for call in mock_s3.upload_file.call_args_list}
+        assert configs['big.bin'] is cloud_run.LARGE_FILE_TRANSFER_CONFIG
+        assert configs['input.inp'] is cloud_run.FILE_TRANSFER_CONFIG
+    
+    @patch('boto3.client')
+    def test_upload_skips_unchanged_files(self, mock_boto_client, job_input_dir):
+        """Test files already in S3 with the same size and MD5 are not uploaded again."""
+        import hashlib
+        mock_s3 = MagicMock()
+        mock_boto_client.return_value = mock_s3
+        
+        manager = CloudJobManager('test-bucket')
+        with open(os.path.join(job_input_dir, 'input.inp'), 'rb') as f:
+            content = f.read()
+        mock_s3.get_paginator.return_value.paginate.return_value = [{'Contents': [{
+            'Key': f'{manager.job_id}/input/input.inp',
+            'Size': len(content),
+            'ETag': f'"{hashlib.md5(content).hexdigest()}"'
+        }]}]
+        
+        manager.upload_job_files(job_input_dir)
+        
+        uploaded_keys = {call[0][2] for call in mock_s3.upload_file.call_args_list}
+        assert uploaded_keys
+        assert f'{manager.job_id}/input/input.inp' not in uploaded_keys
+    
+    @patch('boto3.client')
+    def test_upload_skips_unchanged_multipart_files(self, mock_boto_client, job_input_dir):
+        """Test large files are compared against the multipart ETag S3 reports."""
+        import hashlib
+        import cloud_run
+        mock_s3 = MagicMock()
+        mock_boto_client.return_value = mock_s3
+        
+        chunk_size = cloud_run.LARGE_FILE_TRANSFER_CONFIG.multipart_chunksize
+        content = b'a' * chunk_size + b'b' * 1024
+        with open(os.path.join(job_input_dir, 'big.bin'), 'wb') as f:
+            f.write(content)
+        part_digests = hashlib.md5(content[:chunk_size]).digest() + hashlib.md5(content[chunk_size:]).digest()
+        
+        manager = CloudJobManager('test-bucket')
+        mock_s3.get_paginator.return_value.paginate.return_value = [{'Contents': [{
+            'Key': f'{manager.job_id}/input/big.bin',
+            'Size': len(content),
+            'ETag': f'"{hashlib.md5(part_digests).hexdigest()}-2"'
+        }]}]
+        
+        manager.upload_job_files(job_input_dir)
+        
+        uploaded_keys = {call[0][2] for call in mock_s3.upload_file.call_args_list}
+        assert f'{manager.job_id}/input/input.inp' in uploaded_keys
+        assert f'{manager.job_id}/input/big.bin' not in uploaded_keys
+    
+    @patch('boto3.client')
+    def test_managers_share_s3_client(self, mock_boto_client):
+        """Test that CloudJobManager instances reuse one S3 client."""
+        manager1 = CloudJobManager('test-bucket')
+        manager2 = CloudJobManager('test-bucket')
+        
+        assert manager1.s3_client is manager2.s3_client
+        mock_boto_client.assert_called_once()
+
+
 class TestJobConfigurationHandling:
     """Test job configuration processing."""
     
@@ -260,4 +380,23 @@ echo "Building"
         # Check order: S3 download should come before "Get and Build Code"
         s3_pos = modified.find('aws s3 sync')
         build_pos = modified.find('# --- Get and Build Code ---')
-        assert s3_pos < build_pos, "S3 download should come before code building"
\ No newline at end of file
+        assert s3_pos < build_pos, "S3 download should come before code building"
+
+class TestSpotPriceSelection:
+    """Test reading a single entry from spot_prices.json."""
+    
+    def test_select_spot_price(self, temp_dir):
+        """Test the requested entry is returned and out-of-range indexes report the length."""
+        from cloud_run import _select_spot_price
+        
+        spot_prices = [
+            {'provider': 'AWS', 'instance': 'r5.large', 'region': 'us-east-1', 'price_hr': 0.1},
+            {'provider': 'GCP', 'instance': 'n2-highmem-4', 'region': 'us-central1', 'price_hr': 0.2}
+        ]
+        path = os.path.join(temp_dir, 'spot_prices.json')
+        with open(path, 'w') as f:
+            json.dump(spot_prices, f)
+        
+        selected, _ = _select_spot_price(path, 1)
+        assert selected == spot_prices[1]
+        assert _select_spot_price(path, 5) == (None, 2)
@@ -332,6 +332,33 @@ class TestCostReporter:
             comparison = cost_reporter.generate_provider_comparison()
             assert 'error' in comparison
     
+    def test_connection_reused_across_reports(self, cost_reporter, sample_jobs):
+        """Test that report methods share one lazily opened connection."""
+        cost_reporter.generate_cost_trends(days=30)
+        conn = cost_reporter._conn
+        assert conn is not None
+
+        cost_reporter.generate_budget_analysis()
+        cost_reporter.generate_provider_comparison(days=30)
+        assert cost_reporter._conn is conn
+
+        cost_reporter.close()
+        assert cost_reporter._conn is None
+
+    def test_report_cache_hit_and_invalidation(self, cost_reporter, sample_jobs, job_manager, temp_dir):
+        """Test that cached reports are reused until the jobs DB changes."""
+        cost_reporter.cache_dir = temp_dir
+
+        # A fresh report would carry a new end_date, so equality means a cache hit
+        first = cost_reporter.generate_provider_comparison(days=30)
+        assert cost_reporter.generate_provider_comparison(30) == first
+
+        # Writing to the DB changes its state and so the cache key
+        job_manager.update_actual_cost('aws-job-1', 9.0)
+        updated = cost_reporter.generate_provider_comparison(days=30)
+        aws_stats = next(s for s in updated['provider_stats'] if s['provider'] == 'AWS')
+        assert aws_stats['total_cost'] == 9.0
+
     def test_empty_database(self, cost_reporter):
         """Test reports with empty database."""
         trends = cost_reporter.generate_cost_trends()
@@ -1,4 +1,5 @@
 """Tests for cost_tracker.py"""
+import asyncio
 import json
 import pytest
 import sqlite3
@@ -86,6 +87,9 @@ class TestCloudCostTracker:
             cost_tracker._init_aws_clients()
             assert mock_client.call_count >= 1
             assert cost_tracker.aws_cost_client is not None
+            
+            ce_call = next(call for call in mock_client.call_args_list if call.args[0] == 'ce')
+            assert ce_call.kwargs['config'].max_pool_connections == 32
     
     def test_init_gcp_clients(self, cost_tracker):
         """Test GCP client initialization."""
@@ -145,6 +149,11 @@ class TestCloudCostTracker:
         assert result['provider'] == 'AWS'
         assert len(result['breakdown']) == 1
         assert result['breakdown'][0]['amount'] == 1.024
+        assert 'raw_data' not in result['breakdown'][0]
+        
+        # The raw Cost Explorer group is kept only when configured
+        [(_, entry)] = cost_tracker._aws_cost_entries(mock_response, store_raw=True)
+        assert entry['raw_data'] == mock_response['ResultsByTime'][0]['Groups'][0]
     
     def test_get_aws_spot_cost_no_data(self, cost_tracker, sample_job):
         """Test AWS cost retrieval with no data."""
@@ -176,6 +185,96 @@ class TestCloudCostTracker:
         
         assert result is None
     
+    def test_get_aws_spot_costs_batch(self, cost_tracker, job_manager):
+        """Test one paginated Cost Explorer query split across jobs."""
+        jobs = []
+        for i in range(2):
+            launch_result = {'status': 'completed', 'provider': 'AWS', 'instance_id': f'i-{i}', 'region': 'us-east-1'}
+            job_manager.create_job(f'aws-batch-{i}', {'s3_bucket': 'test'}, launch_result)
+            jobs.append(job_manager.get_job(f'aws-batch-{i}'))
+        
+        def group(instance_id, amount):
+            return {
+                'Keys': [instance_id, 'SpotUsage:r5.large'],
+                'Metrics': {
+                    'BlendedCost': {'Amount': amount, 'Unit': 'USD'},
+                    'UsageQuantity': {'Amount': '1.0', 'Unit': 'Hrs'}
+                }
+            }
+        
+        today = datetime.now().date()
+        period = {'Start': today.isoformat(), 'End': (today + timedelta(days=1)).isoformat()}
+        cost_tracker.aws_cost_client = MagicMock()
+        cost_tracker.aws_cost_client.get_cost_and_usage.side_effect = [
+            {'ResultsByTime': [{'TimePeriod': period, 'Groups': [group('i-0', '1.5'), group('i-1', '0')]}],
+             'NextPageToken': 'page-2'},
+            {'ResultsByTime': [{'TimePeriod': period, 'Groups': [group('i-0', '0.5')]}]}
+        ]
+        
+        results = cost_tracker.get_aws_spot_costs_batch(jobs)
+        
+        assert set(results) == {'aws-batch-0'}
+        assert results['aws-batch-0']['total_cost'] == 2.0
+        assert len(results['aws-batch-0']['breakdown']) == 2
+        
+        calls = cost_tracker.aws_cost_client.get_cost_and_usage.call_args_list
+        assert len(calls) == 2
+        assert calls[0].kwargs['Filter']['And'][0]['Dimensions']['Values'] == ['i-0', 'i-1']
+        assert calls[1].kwargs['NextPageToken'] == 'page-2'
+    
+    def test_get_aws_spot_cost_cached(self, cost_tracker, sample_job):
+        """Test that finalized days are served from the cost cache."""
+        mock_response = {
+            'ResultsByTime': [{
+                'TimePeriod': {'Start': '2024-01-01', 'End': '2024-01-02'},
+                'Groups': [{
+                    'Keys': ['i-123456789', 'SpotUsage:r5.4xlarge'],
+                    'Metrics': {
+                        'BlendedCost': {'Amount': '1.024', 'Unit': 'USD'},
+                        'UsageQuantity': {'Amount': '2.0', 'Unit': 'Hrs'}
+                    }
+                }]
+            }]
+        }
+        
+        cost_tracker.aws_cost_client = MagicMock()
+        cost_tracker.aws_cost_client.get_cost_and_usage.return_value = mock_response
+        
+        for _ in range(2):
+            result = cost_tracker.get_aws_spot_cost(
+                sample_job, 'i-123456789', 'us-east-1', datetime(2024, 1, 1), datetime(2024, 1, 3)
+            )
+            assert result['total_cost'] == 1.024
+        
+        # The second call found both days cached; the empty 2024-01-02 included
+        cost_tracker.aws_cost_client.get_cost_and_usage.assert_called_once()
+        
+        # Widening the window queries only the new day
+        cost_tracker.get_aws_spot_cost(
+            sample_job, 'i-123456789', 'us-east-1', datetime(2024, 1, 1), datetime(2024, 1, 4)
+        )
+        query = cost_tracker.aws_cost_client.get_cost_and_usage.call_args.kwargs
+        assert query['TimePeriod'] == {'Start': '2024-01-03', 'End': '2024-01-04'}
+    
+    def test_call_cost_api_retries_throttling(self, cost_tracker):
+        """Test throttled billing calls are retried and other errors are not."""
+        from botocore.exceptions import ClientError
+        
+        throttled = ClientError({'Error': {'Code': 'LimitExceededException'}}, 'GetCostAndUsage')
+        call = MagicMock(side_effect=[throttled, throttled, 'ok'])
+        
+        async def attempt():
+            return call()
+        
+        with patch('cost_tracker.random.uniform', return_value=0):
+            assert asyncio.run(cost_tracker._call_cost_api('AWS', attempt)) == 'ok'
+        assert call.call_count == 3
+        
+        call = MagicMock(side_effect=ValueError('bad request'))
+        with pytest.raises(ValueError):
+            asyncio.run(cost_tracker._call_cost_api('AWS', attempt))
+        assert call.call_count == 1
+    
     def test_get_azure_spot_cost_success(self, cost_tracker, sample_job):
         """Test successful Azure cost retrieval."""
         mock_response = MagicMock()
@@ -198,6 +297,46 @@ class TestCloudCostTracker:
         assert result['provider'] == 'Azure'
         assert len(result['breakdown']) == 1
     
+    def test_get_azure_spot_costs_batch(self, cost_tracker, job_manager):
+        """Test one Cost Management query split across jobs by resource ID and day."""
+        jobs = []
+        for i, day in enumerate(('2024-01-01', '2024-01-03')):
+            launch_result = {'status': 'completed', 'provider': 'Azure', 'region': 'eastus',
+                             'vm_name': 'cloud-scheduler-vm', 'resource_group': 'rg'}
+            job_manager.create_job(f'azure-batch-{i}', {'s3_bucket': 'test'}, launch_result)
+            job = job_manager.get_job(f'azure-batch-{i}')
+            job.update(created_at=f'{day}T01:00:00', started_at=None, completed_at=f'{day}T05:00:00')
+            jobs.append(job)
+        
+        resource_id = ('/subscriptions/test-subscription/resourcegroups/rg'
+                       '/providers/microsoft.compute/virtualmachines/cloud-scheduler-vm')
+        columns = []
+        for name in ('totalCost', 'UsageDate', 'ResourceId', 'Currency'):
+            column = MagicMock()
+            column.name = name
+            columns.append(column)
+        mock_response = MagicMock()
+        mock_response.columns = columns
+        mock_response.rows = [
+            [1.5, 20240101, resource_id, 'USD'],
+            [2.5, 20240103, resource_id, 'USD'],
+            [9.0, 20240103, '/subscriptions/test-subscription/other-vm', 'USD']
+        ]
+        
+        cost_tracker.azure_cost_client = MagicMock()
+        cost_tracker.azure_cost_client.query.usage.return_value = mock_response
+        
+        results = cost_tracker.get_azure_spot_costs_batch(jobs)
+        
+        assert results['azure-batch-0']['total_cost'] == 1.5
+        assert results['azure-batch-1']['total_cost'] == 2.5
+        
+        cost_tracker.azure_cost_client.query.usage.assert_called_once()
+        query = cost_tracker.azure_cost_client.query.usage.call_args[0][1]
+        assert query['dataset']['filter']['dimensions'] == {
+            'name': 'ResourceId', 'operator': 'In', 'values': [resource_id]
+        }
+    
     def test_retrieve_job_cost_aws(self, cost_tracker, sample_job, job_manager):
         """Test job cost retrieval for AWS."""
         # Mock AWS cost retrieval
@@ -225,6 +364,16 @@ class TestCloudCostTracker:
         assert job['actual_cost'] == 1.5
         assert job['cost_retrieved_at'] is not None
     
+    def test_retrieve_job_cost_async(self, cost_tracker, sample_job, job_manager):
+        """Test async job cost retrieval stores the cost like the sync path."""
+        mock_cost_data = {'total_cost': 1.25, 'breakdown': [], 'provider': 'AWS'}
+        
+        with patch.object(cost_tracker, 'get_aws_spot_cost', return_value=mock_cost_data):
+            result = asyncio.run(cost_tracker.retrieve_job_cost_async(sample_job))
+        
+        assert result is True
+        assert job_manager.get_job(sample_job)['actual_cost'] == 1.25
+    
     def test_retrieve_job_cost_not_completed(self, cost_tracker, job_manager):
         """Test job cost retrieval for non-completed job."""
         # Create running job
@@ -291,9 +440,15 @@ class TestCloudCostTracker:
             'provider': 'AWS'
         }
         
-        with patch.object(cost_tracker, 'get_aws_spot_cost', return_value=mock_cost_data):
+        batch_costs = {job_id: mock_cost_data for job_id in job_ids}
+        
+        with patch.object(cost_tracker, 'get_aws_spot_costs_batch', return_value=batch_costs) as mock_batch:
             results = cost_tracker.batch_retrieve_costs(max_jobs=5, days_back=1)
         
+        # All AWS jobs share one Cost Explorer query
+        mock_batch.assert_called_once()
+        assert {job['job_id'] for job in mock_batch.call_args[0][0]} == set(job_ids)
+        
         assert results['processed'] == 3
         assert results['successful'] == 3
         assert results['failed'] == 0
@@ -319,17 +474,65 @@ class TestCloudCostTracker:
             job_manager.update_job_status(job_id, 'completed')
         
         # Mock one success, one failure
-        def mock_get_cost(job_id, *args):
-            if 'batch-job-0' in job_id:
-                return {'total_cost': 1.0, 'breakdown': [], 'provider': 'AWS'}
-            return None
+        batch_costs = {'batch-job-0': {'total_cost': 1.0, 'breakdown': [], 'provider': 'AWS'}}
         
-        with patch.object(cost_tracker, 'get_aws_spot_cost', side_effect=mock_get_cost):
+        with patch.object(cost_tracker, 'get_aws_spot_costs_batch', return_value=batch_costs):
             results = cost_tracker.batch_retrieve_costs(max_jobs=5, days_back=1)
         
         assert results['processed'] == 2
         assert results['successful'] == 1
         assert results['failed'] == 1
+
+    def test_batch_retrieve_costs_parallel(self, cost_tracker, job_manager):
+        """Test batch cost retrieval with several workers."""
+        for i in range(4):
+            launch_result = {
+                'status': 'completed',
+                'provider': 'AWS',
+                'instance_type': 'r5.large',
+                'instance_id': f'i-{i}',
+                'region': 'us-east-1'
+            }
+            job_manager.create_job(f'parallel-job-{i}', {'s3_bucket': 'test'}, launch_result)
+            job_manager.update_job_status(f'parallel-job-{i}', 'completed')
+
+        mock_cost_data = {'total_cost': 1.0, 'breakdown': [], 'provider': 'AWS'}
+        batch_costs = {f'parallel-job-{i}': mock_cost_data for i in range(4)}
+
+        with patch.object(cost_tracker, 'get_aws_spot_costs_batch', return_value=batch_costs), \
+             patch('cost_tracker.time.sleep'):
+            results = cost_tracker.batch_retrieve_costs(max_jobs=5, days_back=1, max_workers=3)
+
+        assert results['processed'] == 4
+        assert results['successful'] == 4
+        assert len({job['job_id'] for job in results['jobs']}) == 4
+        assert job_manager.get_job('parallel-job-0')['actual_cost'] == 1.0
+
+    def test_batch_retrieve_costs_provider_concurrency(self, cost_tracker, job_manager):
+        """Test each provider's queries are limited by its configured concurrency."""
+        for i in range(4):
+            launch_result = {'status': 'completed', 'provider': 'GCP', 'instance_type': 'n2-highmem-16',
+                             'region': 'us-central1'}
+            job_manager.create_job(f'gcp-job-{i}', {'s3_bucket': 'test'}, launch_result)
+            job_manager.update_job_status(f'gcp-job-{i}', 'completed')
+        
+        cost_tracker.config['cost_tracker'] = {'concurrency': {'gcp': 2}}
+        in_flight = []
+        peak = []
+        
+        async def mock_cost_data(job):
+            in_flight.append(job['job_id'])
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(job['job_id'])
+            return {'total_cost': 1.0, 'breakdown': [], 'provider': 'GCP'}
+        
+        with patch.object(cost_tracker, '_job_cost_data_async', side_effect=mock_cost_data):
+            results = cost_tracker.batch_retrieve_costs(max_jobs=5, days_back=1, max_workers=10)
+        
+        assert results['successful'] == 4
+        assert max(peak) == 2
+        assert job_manager.get_job('gcp-job-0')['actual_cost'] == 1.0
     
     def test_estimate_gcp_cost(self, cost_tracker):
         """Test GCP cost estimation (placeholder)."""
@@ -378,6 +581,41 @@ class TestCloudCostTracker:
         result = cost_tracker.retrieve_job_cost(job_id)
         assert result is False
     
+    def test_retrieve_job_cost_azure(self, cost_tracker, job_manager):
+        """Test Azure job cost retrieval reads the VM from parsed metadata."""
+        launch_result = {
+            'status': 'completed',
+            'provider': 'Azure',
+            'instance_type': 'Standard_E16s_v3',
+            'region': 'eastus',
+            'vm_name': 'vm-test-123',
+            'resource_group': 'rg-test'
+        }
+        job_manager.create_job('azure-job', {'s3_bucket': 'test'}, launch_result)
+        job_manager.update_job_status('azure-job', 'completed')
+        
+        mock_cost_data = {'total_cost': 2.0, 'breakdown': [], 'provider': 'Azure'}
+        
+        with patch.object(cost_tracker, 'get_azure_spot_cost', return_value=mock_cost_data) as mock_get:
+            assert cost_tracker.retrieve_job_cost('azure-job') is True
+        
+        assert mock_get.call_args[0][1:3] == ('vm-test-123', 'rg-test')
+    
+    def test_job_metadata(self, cost_tracker):
+        """Test metadata is taken as stored or parsed once from JSON."""
+        assert cost_tracker._job_metadata({'metadata': {'a': 1}}) == {'a': 1}
+        assert cost_tracker._job_metadata({'metadata': None}) == {}
+        
+        job = {'metadata': '{"a": 1}'}
+        with patch('cost_tracker.json.loads', wraps=json.loads) as mock_loads:
+            cost_tracker._job_metadata(job)
+            assert cost_tracker._job_metadata(job) == {'a': 1}
+        mock_loads.assert_called_once()
+        
+        job = {'metadata': json.dumps({'launch_result': {'vm_name': 'vm-1'}, 'log': 'x' * 8192})}
+        assert cost_tracker._launch_result(job) == {'vm_name': 'vm-1'}
+        assert cost_tracker._launch_result({'metadata': None}) == {}
+    
     def test_gcp_cost_with_no_client(self, cost_tracker, sample_job):
         """Test GCP cost retrieval when client is not available."""
         cost_tracker.gcp_billing_client = None
@@ -3,7 +3,7 @@ import os
 import sqlite3
 import tempfile
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest.mock import patch
 import sys
 
@@ -141,7 +141,130 @@ class TestJobManager:
             # Should be approximately $0.512 * 2 hours = $1.024
             assert cost is not None
             assert abs(cost - 1.024) < 0.1  # Allow some tolerance for timing
-    
+
+    def test_calculate_job_costs_batch(self, temp_dir):
+        """Test batched cost calculation matches the per-job calculation."""
+        db_path = os.path.join(temp_dir, 'test_jobs.db')
+        jm = JobManager(db_path)
+
+        launch_result = {'status': 'launched', 'provider': 'AWS'}
+        jm.create_job('batch-1', {'price_per_hour': 1.0}, launch_result)
+        jm.create_job('batch-2', {'price_per_hour': 0.0}, launch_result)
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''
+                UPDATE jobs SET created_at = '2024-01-01T00:00:00',
+                                completed_at = '2024-01-01T03:00:00'
+                WHERE job_id = 'batch-1'
+            ''')
+
+        costs = jm.calculate_job_costs(['batch-1', 'batch-2', 'missing'])
+
+        assert costs == {'batch-1': 3.0, 'batch-2': 0.0}
+        assert costs['batch-1'] == jm.calculate_job_cost('batch-1')
+        assert costs['batch-1'] == jm.calculate_job_cost('batch-1', jm.get_job('batch-1'))
+        assert jm.calculate_job_costs([]) == {}
+
+        listed = {job['job_id']: job for job in jm.list_jobs(include_cost=True)}
+        assert listed['batch-1']['current_cost'] == 3.0
+        assert 'current_cost' not in jm.list_jobs()[0]
+
+    def test_final_cost_frozen_on_completion(self, temp_dir):
+        """Test terminal jobs report the cost stored when they finished."""
+        db_path = os.path.join(temp_dir, 'test_jobs.db')
+        jm = JobManager(db_path)
+
+        jm.create_job('final-1', {'price_per_hour': 2.0}, {'status': 'running', 'provider': 'AWS'})
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE jobs SET created_at = ? WHERE job_id = 'final-1'",
+                         ((datetime.now().replace(microsecond=0) - timedelta(hours=1)).isoformat(),))
+
+        jm.update_job_status('final-1', 'completed')
+        job = jm.get_job('final-1')
+        assert abs(job['final_cost'] - 2.0) < 0.01
+
+        # Later edits to the row do not change the frozen cost
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE jobs SET price_per_hour = 100 WHERE job_id = 'final-1'")
+
+        assert jm.calculate_job_cost('final-1') == job['final_cost']
+        assert jm.calculate_job_costs(['final-1']) == {'final-1': job['final_cost']}
+
+    def test_record_job_lifecycle(self, temp_dir):
+        """Test a job and its launch outcome are recorded together."""
+        db_path = os.path.join(temp_dir, 'test_jobs.db')
+        jm = JobManager(db_path)
+
+        launch_result = {'status': 'launching', 'provider': 'AWS', 'instance_type': 'r5.large'}
+        assert jm.record_job_lifecycle('life-1', {'s3_bucket': 'bucket'}, launch_result, 'launched',
+                                       {'instance_id': 'i-123', 'public_ip': '1.2.3.4', 'error_message': 'x'})
+        job = jm.get_job('life-1')
+        assert job['status'] == 'launched'
+        assert job['instance_id'] == 'i-123'
+        assert job['public_ip'] == '1.2.3.4'
+        assert job['s3_bucket'] == 'bucket'
+
+        # An existing record is updated in place and terminal outcomes are stamped
+        assert jm.record_job_lifecycle('life-1', {'s3_bucket': 'bucket'}, launch_result, 'failed')
+        job = jm.get_job('life-1')
+        assert job['status'] == 'failed'
+        assert job['completed_at'] is not None
+        assert job['instance_id'] == 'i-123'
+        assert len(jm.list_jobs()) == 1
+
+    def test_iter_old_jobs_pages_through_matches(self, temp_dir):
+        """Test keyset pagination yields every old terminal job exactly once."""
+        db_path = os.path.join(temp_dir, 'test_jobs.db')
+        jm = JobManager(db_path)
+
+        launch_result = {'status': 'completed', 'provider': 'AWS'}
+        for i in range(5):
+            jm.create_job(f'old-{i}', {}, launch_result)
+        jm.create_job('old-running', {}, {'status': 'running', 'provider': 'AWS'})
+        jm.create_job('new-done', {}, launch_result)
+
+        with sqlite3.connect(db_path) as conn:
+            # Two jobs share a timestamp to exercise the job_id tiebreak
+            conn.execute("UPDATE jobs SET created_at = '2024-01-01T00:00:00' WHERE job_id LIKE 'old-%'")
+            conn.execute("UPDATE jobs SET created_at = '2024-01-02T00:00:00' WHERE job_id IN ('old-3', 'old-4')")
+
+        jobs = list(jm.iter_old_jobs('2024-06-01T00:00:00', batch_size=2))
+
+        assert [job['job_id'] for job in jobs] == ['old-4', 'old-3', 'old-2', 'old-1', 'old-0']
+
+    def test_list_jobs_multiple_statuses(self, temp_dir):
+        """Test filtering the job list by several statuses at once."""
+        db_path = os.path.join(temp_dir, 'test_jobs.db')
+        jm = JobManager(db_path)
+
+        for status in ('running', 'completed', 'failed'):
+            jm.create_job(f'job-{status}', {}, {'status': status, 'provider': 'AWS'})
+
+        jobs = jm.list_jobs(statuses=['completed', 'failed'])
+        assert sorted(job['job_id'] for job in jobs) == ['job-completed', 'job-failed']
+
+        jobs = jm.list_jobs(status='running', statuses=['failed'])
+        assert sorted(job['job_id'] for job in jobs) == ['job-failed', 'job-running']
+
+    def test_list_jobs_eligible_for_cost(self, temp_dir):
+        """Test only recent finished jobs without an actual cost are listed."""
+        db_path = os.path.join(temp_dir, 'test_jobs.db')
+        jm = JobManager(db_path)
+
+        for job_id, status in (('done', 'completed'), ('costed', 'completed'),
+                               ('old', 'failed'), ('live', 'running')):
+            jm.create_job(job_id, {}, {'status': status, 'provider': 'AWS'})
+        jm.update_actual_cost('costed', 1.0)
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE jobs SET created_at = '2024-01-01T00:00:00' WHERE job_id = 'old'")
+
+        jobs = jm.list_jobs_eligible_for_cost('2025-01-01T00:00:00', limit=10)
+        assert [job['job_id'] for job in jobs] == ['done']
+        assert isinstance(jobs[0]['metadata'], dict)
+
+        assert len(jm.list_jobs_eligible_for_cost('2000-01-01T00:00:00', limit=1)) == 1
+
     def test_delete_job(self, temp_dir):
         """Test job deletion."""
         db_path = os.path.join(temp_dir, 'test_jobs.db')
@@ -329,4 +329,45 @@ class TestJobManagerCost:
         
         # Should still return True (no strict error checking in current implementation)
         # but the actual cost won't be set since job doesn't exist
-        assert result is True
\ No newline at end of file
+        assert result is True
+    
+    def test_update_actual_costs_bulk(self, job_manager):
+        """Test several jobs' costs are written in one call."""
+        for job_id in ('bulk-1', 'bulk-2'):
+            job_manager.create_job(job_id, {'s3_bucket': 'test'}, {'status': 'completed', 'provider': 'AWS'})
+        
+        breakdown = [{
+            'provider': 'AWS',
+            'cost_type': 'spot_compute',
+            'amount': 1.5,
+            'billing_period_start': '2024-01-01',
+            'billing_period_end': '2024-01-02'
+        }]
+        result = job_manager.update_actual_costs_bulk([('bulk-1', 1.5, breakdown), ('bulk-2', 2.0, None)])
+        assert result is True
+        
+        assert job_manager.get_job('bulk-1')['actual_cost'] == 1.5
+        assert job_manager.get_job('bulk-2')['actual_cost'] == 2.0
+        
+        import sqlite3
+        with sqlite3.connect(job_manager.db_path) as conn:
+            rows = conn.execute('SELECT job_id, amount, raw_data FROM cost_tracking').fetchall()
+        assert rows == [('bulk-1', 1.5, None)]
+    
+    def test_cost_summary_restores_raw_data(self, job_manager, sample_job_with_budget):
+        """Test large raw_data payloads come back intact whether or not they were compressed."""
+        raw_data = {'groups': [{'Keys': [f'i-{n:017d}'], 'Amount': '0.1'} for n in range(20)]}
+        breakdown = [{
+            'provider': 'AWS',
+            'cost_type': 'spot_compute',
+            'amount': 2.0,
+            'billing_period_start': '2024-01-01',
+            'billing_period_end': '2024-01-02',
+            'raw_data': raw_data
+        }]
+        assert job_manager.update_actual_cost(sample_job_with_budget, 2.0, breakdown) is True
+        
+        summary = job_manager.get_cost_summary(sample_job_with_budget)
+        item = summary['cost_breakdown'][0]
+        assert json.loads(item['raw_data']) == raw_data
+        assert 'raw_data_zstd' not in item